@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""Benchmark filtered spell queries over a large synthetic catalog.
+
+Builds a catalog of random homebrew-style spells in a temporary folder
+and reports, for several multi-facet filters:
+
+1. a per-spell Python predicate over the decoded spell list (the old
+   `matches_filters` approach)
+2. the bitmap filter alone (`SpellTable.select`)
+3. a full `SpellCatalog.query` with a 50-spell limit, warm
+
+the same for a few filter expressions (compiled once, then evaluated),
+and the time to merge three overlapping sources of growing size.
+
+Usage:
+    python scripts/bench_catalog.py [--count 100000] [--repeat 20]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.catalog.filters import compile_filter  # noqa: E402
+from src.catalog.merge import merge_sources  # noqa: E402
+from src.catalog.spells import SpellCatalog  # noqa: E402
+from src.utils.console import banner, console  # noqa: E402
+
+CLASSES = ["Bard", "Cleric", "Druid", "Paladin", "Ranger", "Sorcerer", "Warlock"]
+CLASSES += ["Wizard", "Artificer"]
+SCHOOLS = ["Abjuration", "Conjuration", "Divination", "Enchantment", "Evocation"]
+SCHOOLS += ["Illusion", "Necromancy", "Transmutation"]
+
+FILTERS = {
+    "class": {"classes": ["wizard"]},
+    "class+level": {"classes": ["wizard"], "levels": [3]},
+    "class+level+school": {
+        "classes": ["wizard", "sorcerer"],
+        "levels": [1, 2, 3],
+        "schools": ["evocation"],
+    },
+    "school+concentration": {"schools": ["enchantment"], "concentration": True},
+    "level+ritual": {"levels": [1], "ritual": True},
+}
+EXPRESSIONS = [
+    "level<=3 and not concentration and components!~M",
+    "(class=wizard,sorcerer or school~evoc) and casting_time~action",
+    "not (level>=5 or ritual) and class!=cleric",
+]
+
+
+def make_spells(count: int) -> list[dict]:
+    rng = random.Random(5)
+    return [
+        {
+            "index": f"spell-{i}",
+            "name": f"Spell {i}",
+            "level": rng.randint(0, 9),
+            "school": rng.choice(SCHOOLS),
+            "classes": rng.sample(CLASSES, rng.randint(1, 4)),
+            "concentration": rng.random() < 0.4,
+            "ritual": rng.random() < 0.1,
+            "components": rng.sample("VSM", rng.randint(1, 3)),
+            "casting_time": rng.choice(["1 action", "1 bonus action", "1 minute"]),
+            "desc": ["A homebrew spell."],
+        }
+        for i in range(count)
+    ]
+
+
+def matches(spell: dict, classes=(), levels=(), schools=(), **flags) -> bool:
+    """Per-spell predicate in the style of the old `matches_filters`."""
+    if classes and not {c.lower() for c in spell["classes"]} & set(classes):
+        return False
+    if levels and spell["level"] not in levels:
+        return False
+    if schools and spell["school"].lower() not in schools:
+        return False
+    return all(spell[name] == value for name, value in flags.items())
+
+
+def best(fn, repeat: int) -> float:
+    """Return the best of `repeat` runs of `fn`, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    banner("⏱ Catalog Benchmark", f"{args.count} synthetic spells")
+    spells = make_spells(args.count)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "spells.json"
+        source.write_text(json.dumps(spells), encoding="utf-8")
+
+        start = time.perf_counter()
+        catalog = SpellCatalog.open(source)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        table = catalog.table
+        loaded = time.perf_counter() - start
+        console.print(
+            f"Catalog built in {built:.2f}s, bitmap table loaded in {loaded:.2f}s"
+        )
+
+        results = Table("filter", "matches", "predicate ms", "bitmap ms", "query ms")
+        for name, filters in FILTERS.items():
+            mask = table.select(**filters)
+            catalog.query(limit=50, **filters)  # warm the record cache
+            results.add_row(
+                name,
+                str(mask.bit_count()),
+                f"{best(lambda: [s for s in spells if matches(s, **filters)], 3):.1f}",
+                f"{best(lambda: table.select(**filters), args.repeat):.3f}",
+                f"{best(lambda: catalog.query(limit=50, **filters), args.repeat):.3f}",
+            )
+        console.print(results)
+
+        expressions = Table("expression", "matches", "bitmap ms", "query ms")
+        for expression in EXPRESSIONS:
+            compiled = compile_filter(expression)
+            catalog.query(limit=50, where=expression)
+            expressions.add_row(
+                expression,
+                str(compiled(table).bit_count()),
+                f"{best(lambda: compiled(table), args.repeat):.3f}",
+                f"{best(lambda: catalog.query(limit=50, where=expression), args.repeat):.3f}",
+            )
+        console.print(expressions)
+        catalog.close()
+
+    merges = Table("records per source", "merged", "seconds")
+    for size in (10_000, 20_000, 40_000):
+        base = make_spells(size)
+        sources = [
+            ("homebrew", [{**s, "name": s["name"].upper()} for s in base[::2]]),
+            ("5etools", [{**s, "desc": ["Other text."]} for s in base[size // 4 :]]),
+            ("srd", base),
+        ]
+        start = time.perf_counter()
+        merged = merge_sources(sources, {"desc": ["srd"]})
+        merges.add_row(
+            str(size), str(len(merged)), f"{time.perf_counter() - start:.2f}"
+        )
+    console.print(merges)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Benchmark the SRD fetch engine against a local stub server.
+
+Starts a keep-alive HTTP server on localhost that mimics the dnd5eapi
+spell endpoints (REST index, REST detail and GraphQL, each with a
+configurable per-request latency) and reports:
+
+1. requests/sec for a naive serial `requests.get` loop and for the
+   pooled engine at several concurrency levels
+2. wall-clock time for the REST N+1 transport versus paged GraphQL
+3. a REST fetch recorded into the HTTP response cache, then replayed
+   with the stub server stopped
+
+Usage:
+    python scripts/bench_fetch.py [--count 319] [--latency-ms 20]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import src.fetch.srd as srd  # noqa: E402
+from src.utils import http_cache  # noqa: E402
+from src.utils.console import banner, console  # noqa: E402
+from src.utils.http import (  # noqa: E402
+    configure_host,
+    fetch_many,
+    format_stats,
+    get_session,
+    reset_session,
+)
+
+
+def spell_body(index: str) -> dict:
+    return {
+        "index": index,
+        "name": index.title(),
+        "level": 1,
+        "school": {"name": "Evocation"},
+        "classes": [{"name": "Wizard"}],
+        "desc": ["Lorem ipsum " * 40],
+    }
+
+
+def make_handler(latency: float, count: int):
+    indexes = [f"spell-{i:04}" for i in range(count)]
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # allow keep-alive
+        disable_nagle_algorithm = True
+
+        def send_json(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == "/api/spells":
+                results = [{"index": i, "url": f"/api/spells/{i}"} for i in indexes]
+                self.send_json({"count": len(results), "results": results})
+            else:
+                self.send_json(spell_body(self.path.rsplit("/", 1)[-1]))
+
+        def do_POST(self):
+            time.sleep(latency)
+            query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            skip = query["variables"].get("skip") or 0
+            limit = query["variables"]["limit"]
+            page = [spell_body(i) for i in indexes[skip : skip + limit]]
+            self.send_json({"data": {"spells": page}})
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def start_server(latency: float, count: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency, count))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_run(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=319)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--levels", default="1,2,4,8,16,32")
+    parser.add_argument(
+        "--rate", type=float, default=10_000, help="Token-bucket rate for the stub"
+    )
+    args = parser.parse_args()
+
+    server = start_server(args.latency_ms / 1000, args.count)
+    host = f"127.0.0.1:{server.server_address[1]}"
+    base = f"http://{host}"
+    urls = [f"{base}/api/spells/spell-{i}" for i in range(args.count)]
+    configure_host(host, rate=args.rate, burst=args.rate)
+
+    banner(
+        "⏱ Fetch Benchmark",
+        f"{args.count} requests, {args.latency_ms:g} ms simulated latency",
+    )
+    table = Table("mode", "concurrency", "seconds", "req/s")
+
+    def serial():
+        for url in urls:
+            requests.get(url).json()
+
+    elapsed = time_run(serial)
+    table.add_row(
+        "bare requests.get", "1", f"{elapsed:.2f}", f"{len(urls) / elapsed:.0f}"
+    )
+
+    for level in (int(x) for x in args.levels.split(",")):
+        reset_session()
+        session = get_session(pool_size=level)
+
+        def pooled():
+            for response in fetch_many(urls, level, session):
+                response.json()
+
+        elapsed = time_run(pooled)
+        table.add_row(
+            "pooled session", str(level), f"{elapsed:.2f}", f"{len(urls) / elapsed:.0f}"
+        )
+
+    console.print(table)
+
+    # REST N+1 versus paged GraphQL, end to end through the srd transports
+    srd.BASE_URL = base
+    transports = Table("transport", "HTTP calls", "seconds")
+    for name, calls in (
+        ("rest", 1 + args.count),
+        ("graphql", args.count // srd.GRAPHQL_PAGE_SIZE + 1),
+    ):
+        reset_session()
+        elapsed = time_run(lambda: list(srd.TRANSPORTS[name]("spells", set(), {}, 8)))
+        transports.add_row(name, str(calls), f"{elapsed:.2f}")
+    console.print(transports)
+
+    # Record a REST run into the response cache, then replay it offline
+    cache_table = Table("cache", "seconds")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for mode in ("record", "replay"):
+            if mode == "replay":
+                server.shutdown()
+                server.server_close()
+            http_cache.configure(mode, root=Path(cache_dir))
+            reset_session()
+            elapsed = time_run(
+                lambda: list(srd.TRANSPORTS["rest"]("spells", set(), {}, 8))
+            )
+            cache_table.add_row(mode, f"{elapsed:.2f}")
+        console.print(cache_table)
+        console.print(f"🌐 HTTP: {format_stats(host)}")
+        http_cache.configure("off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# src/catalog/columns.py
+
+"""Columnar, bitmap-indexed view of the spell catalog for fast filtering.
+
+Every spell is a row number in source order. Schools and classes are
+integer-coded against a small vocabulary. Each distinct level, school,
+class, casting time, component and flag gets a bitmap: a Python int
+whose bit `r` is set when row `r` has that value. A filter is then a
+handful of big-int ORs (within a facet) and ANDs (across facets), which
+run in C over the whole catalog at once instead of testing spells one
+by one. Only the rows that survive are ever turned back into Python
+objects. Filter expressions (see `filters.py`) compile to the same
+bitmap operations. The same bitmaps answer facet counts (matches per
+class, level, school and concentration) with one popcount per facet
+value.
+
+Building the table means scanning the catalog, so a binary snapshot of
+it (spells.snapshot) is written next to the catalog. The snapshot has a
+fixed header (magic, format version, byte order, source fingerprint)
+followed by a marshalled dict of the raw columns and bitmaps. Loading it
+is a single read with no per-row Python work. A snapshot whose header
+doesn't match is ignored, and the table is rebuilt from SQLite.
+"""
+
+import marshal
+import os
+import re
+import sqlite3
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Optional
+
+SNAPSHOT_MAGIC = b"DMFT"
+SNAPSHOT_VERSION = 4
+# magic, format version, little-endian flag, fingerprint length
+_HEADER = struct.Struct("<4sHBH")
+
+_NONZERO_RE = re.compile(rb"[^\x00]")
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def _bitmap(rows: Iterable[int], size: int) -> int:
+    """Return an int with the bits of `rows` set."""
+    data = bytearray((size + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, "little")
+
+
+def _code(vocab: dict, value: str) -> int:
+    return vocab.setdefault(value, len(vocab))
+
+
+class SpellTable:
+    """Integer-coded columns and per-value bitmaps for filterable spell facets.
+
+    Args:
+        rows: (position, idx, level, school, concentration, ritual,
+            components, casting_time) tuples; components is a string of
+            lowercase v/s/m letters, and the last two fields may be left off
+        classes: (class, idx) pairs; class, school and casting time
+            names are lowercase
+        clusters: (position, cluster) pairs for near-duplicate spells, where
+            a cluster is named by its first member's position
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[tuple],
+        classes: Iterable[tuple[str, str]],
+        clusters: Iterable[tuple[int, int]] = (),
+    ):
+        rows = sorted(rows)
+        self.size = len(rows)
+        self.position = array("q", (row[0] for row in rows))
+        self.idx = [row[1] for row in rows]
+        self.levels = array("h", (-1 if row[2] is None else row[2] for row in rows))
+
+        self.school_codes: dict[str, int] = {}
+        self.schools = array("H", (_code(self.school_codes, row[3]) for row in rows))
+
+        self.casting_codes: dict[str, int] = {}
+        casting = [
+            _code(self.casting_codes, row[7] if len(row) > 7 else "") for row in rows
+        ]
+
+        self.class_codes: dict[str, int] = {}
+        row_of = {idx: row for row, idx in enumerate(self.idx)}
+        class_rows: dict[int, list[int]] = {}
+        for cls, idx in classes:
+            if idx in row_of:
+                code = _code(self.class_codes, cls)
+                class_rows.setdefault(code, []).append(row_of[idx])
+
+        self.all = (1 << self.size) - 1
+        self.level_bits = self._bitmaps(self.levels)
+        self.school_bits = self._bitmaps(self.schools)
+        self.class_bits = {
+            code: _bitmap(members, self.size) for code, members in class_rows.items()
+        }
+        self.casting_bits = self._bitmaps(casting)
+        components = [row[6] if len(row) > 6 else "" for row in rows]
+        self.component_bits = {
+            letter: _bitmap(
+                (r for r, found in enumerate(components) if letter in found),
+                self.size,
+            )
+            for letter in "vsm"
+        }
+        self.concentration_bits = _bitmap(
+            (r for r, row in enumerate(rows) if row[4]), self.size
+        )
+        self.ritual_bits = _bitmap(
+            (r for r, row in enumerate(rows) if row[5]), self.size
+        )
+        self.cluster = {self.row(position): c for position, c in clusters}
+        self.duplicate_bits = self.mask(self.cluster)
+        # Unfiltered counts are what a preview shows first; keep them ready
+        self.facet_counts = self.facets(self.all)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "SpellTable":
+        """Load the filterable columns (not the spell bodies) from a catalog."""
+        return cls(
+            conn.execute(
+                "SELECT position, idx, level, school, concentration, ritual, "
+                "components, casting_time FROM spells"
+            ).fetchall(),
+            conn.execute("SELECT class, idx FROM spell_classes").fetchall(),
+            conn.execute("SELECT position, cluster FROM spell_clusters").fetchall(),
+        )
+
+    def save(self, path: Path, fingerprint: str) -> None:
+        """Write a snapshot of the table for the source with this fingerprint."""
+        state = dict(vars(self))
+        for name in ("position", "levels", "schools"):
+            state[name] = state[name].tobytes()
+        key = fingerprint.encode("utf-8")
+        header = _HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sys.byteorder == "little", len(key)
+        )
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_bytes(header + key + marshal.dumps(state))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> Optional["SpellTable"]:
+        """Load a snapshot, or return None if it is missing, stale or unreadable."""
+        try:
+            data = path.read_bytes()
+            magic, version, little, size = _HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        key = data[_HEADER.size : _HEADER.size + size]
+        if (
+            magic != SNAPSHOT_MAGIC
+            or version != SNAPSHOT_VERSION
+            or little != (sys.byteorder == "little")
+            or key != fingerprint.encode("utf-8")
+        ):
+            return None
+        try:
+            state = marshal.loads(data[_HEADER.size + size :])
+        except (EOFError, ValueError, TypeError):
+            return None
+        for name, typecode in (("position", "q"), ("levels", "h"), ("schools", "H")):
+            column = array(typecode)
+            column.frombytes(state[name])
+            state[name] = column
+        table = cls.__new__(cls)
+        table.__dict__.update(state)
+        return table
+
+    def _bitmaps(self, column: Iterable[int]) -> dict[int, int]:
+        members: dict[int, list[int]] = {}
+        for row, value in enumerate(column):
+            members.setdefault(value, []).append(row)
+        return {value: _bitmap(rows, self.size) for value, rows in members.items()}
+
+    def _any(self, bits: dict, keys: Iterable) -> int:
+        mask = 0
+        for key in keys:
+            mask |= bits.get(key, 0)
+        return mask
+
+    def select(
+        self,
+        classes: Optional[Iterable[str]] = None,
+        levels: Optional[Iterable[int]] = None,
+        schools: Optional[Iterable[str]] = None,
+        concentration: Optional[bool] = None,
+        ritual: Optional[bool] = None,
+    ) -> int:
+        """Return the bitmap of rows matching every given filter.
+
+        Values within a facet are ORed; facets are ANDed. Class and school
+        names are matched case-insensitively.
+        """
+        mask = self.all
+        if classes:
+            codes = (self.class_codes.get(c.lower()) for c in classes)
+            mask &= self._any(self.class_bits, codes)
+        if levels:
+            mask &= self._any(self.level_bits, levels)
+        if schools:
+            codes = (self.school_codes.get(s.lower()) for s in schools)
+            mask &= self._any(self.school_bits, codes)
+        for bits, flag in (
+            (self.concentration_bits, concentration),
+            (self.ritual_bits, ritual),
+        ):
+            if flag is not None:
+                mask &= bits if flag else self.all ^ bits
+        return mask
+
+    def rows(self, mask: int, limit: Optional[int] = None) -> list[int]:
+        """Return the row numbers set in `mask`, in order, up to `limit`."""
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        found: list[int] = []
+        # The regex skips runs of empty bytes in C
+        for match in _NONZERO_RE.finditer(data):
+            base = match.start() * 8
+            found.extend(base + bit for bit in _BITS[data[match.start()]])
+            if limit and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def distinct(self, rows: Iterable[int], limit: Optional[int] = None) -> list[int]:
+        """Drop rows whose near-duplicate cluster already appeared earlier.
+
+        Returns at most `limit` rows, keeping the order of `rows`.
+        """
+        seen, kept = set(), []
+        for row in rows:
+            cluster = self.cluster.get(row)
+            if cluster is not None:
+                if cluster in seen:
+                    continue
+                seen.add(cluster)
+            kept.append(row)
+            if limit and len(kept) >= limit:
+                break
+        return kept
+
+    def mask(self, rows: Iterable[int]) -> int:
+        """Return the bitmap with exactly these rows set."""
+        return _bitmap(rows, self.size)
+
+    def facets(self, mask: int) -> dict[str, dict]:
+        """Count the rows of `mask` per class, level, school and concentration.
+
+        Values with no matching rows are left out. Spells of unknown level
+        are counted under None.
+        """
+
+        def counts(bits: dict, label, by_label: bool = True) -> dict:
+            found = {}
+            for key in sorted(bits, key=label if by_label else None):
+                count = (bits[key] & mask).bit_count()
+                if count:
+                    found[label(key)] = count
+            return found
+
+        classes = {code: name for name, code in self.class_codes.items()}
+        schools = {code: name for name, code in self.school_codes.items()}
+        concentrating = (self.concentration_bits & mask).bit_count()
+        return {
+            "class": counts(self.class_bits, classes.get),
+            "level": counts(
+                self.level_bits, lambda level: None if level < 0 else level, False
+            ),
+            "school": counts(self.school_bits, schools.get),
+            "concentration": {
+                True: concentrating,
+                False: mask.bit_count() - concentrating,
+            },
+        }
+
+    def positions(self, mask: int) -> set[int]:
+        """Return the source positions of the rows set in `mask`."""
+        return {self.position[row] for row in self.rows(mask)}
+
+    def row(self, position: int) -> int:
+        """Return the row number of the spell at a source position."""
+        return bisect_left(self.position, position)
@@ -0,0 +1,224 @@
+# src/catalog/compose.py
+
+"""Compose decks from quotas and constraints over the columnar catalog.
+
+A deck request is a deck size and a list of constraints. Each
+constraint is a filter expression (see `filters.py`) with bounds on how
+many deck spells may match it:
+
+    quota      4:level=0           exactly 4 cantrips
+    at least   1:school=evocation  1 or more evocation spells
+    at most    2:concentration     no more than 2 concentration spells
+    each       1:school            at least 1 spell of every school in the pool
+
+Every constraint compiles to one bitmap over the candidate pool, and
+the allocator works on those bitmaps. It is greedy. While some minimum
+is unmet, it serves the unmet constraint with the fewest spare
+candidates first. It draws up to `CANDIDATES` seeded random spells from
+that constraint's bitmap, masked to rows that would not push any
+constraint past its maximum. Of those, it takes the spell that also
+counts towards the most other unmet minimums. Once every minimum is met,
+the rest of the deck is drawn from the pool the same way. The same
+request and seed always give the same deck. Spell lists are never
+materialized for large bitmaps. The cost is about deck size ×
+(constraints + candidates) big-int operations.
+"""
+
+import random
+from typing import Iterable, Optional
+
+from src.catalog.columns import SpellTable
+from src.catalog.filters import compile_filter
+
+# Feasible candidates scored per greedy pick
+CANDIDATES = 64
+
+EACH_FIELDS = {
+    "class": ("class_codes", "class_bits"),
+    "school": ("school_codes", "school_bits"),
+}
+
+
+def _count(spec: str) -> tuple[int, str]:
+    """Split "N:rest" into (N, rest)."""
+    count, sep, rest = spec.partition(":")
+    try:
+        value = int(count)
+    except ValueError:
+        value = -1
+    if not sep or value < 0 or not rest.strip():
+        raise ValueError(f"Expected COUNT:EXPRESSION, not '{spec}'")
+    return value, rest.strip()
+
+
+def parse_constraints(
+    table: SpellTable,
+    pool: int,
+    quotas: Iterable[str] = (),
+    at_least: Iterable[str] = (),
+    at_most: Iterable[str] = (),
+    each: Iterable[str] = (),
+) -> list[tuple[str, int, int, Optional[int]]]:
+    """Turn "COUNT:EXPRESSION" specs into (label, bitmap, low, high) constraints.
+
+    Bitmaps are limited to `pool`. `each` specs name a field ("class",
+    "school" or "level") instead of an expression and expand to one
+    minimum per value of that field found in the pool.
+
+    Raises:
+        ValueError: If a spec or expression is malformed
+    """
+    constraints = []
+    for specs, bounds in (
+        (quotas, lambda n: (n, n)),
+        (at_least, lambda n: (n, None)),
+        (at_most, lambda n: (0, n)),
+    ):
+        for spec in specs:
+            count, expression = _count(spec)
+            bits = compile_filter(expression)(table) & pool
+            constraints.append((expression, bits, *bounds(count)))
+
+    for spec in each:
+        count, field = _count(spec)
+        field = field.lower()
+        if field == "level":
+            values = {
+                f"level={level}": bits
+                for level, bits in sorted(table.level_bits.items())
+                if level >= 0
+            }
+        elif field in EACH_FIELDS:
+            codes_name, bits_name = EACH_FIELDS[field]
+            bits = getattr(table, bits_name)
+            values = {
+                f"{field}={name}": bits.get(code, 0)
+                for name, code in sorted(getattr(table, codes_name).items())
+                if name
+            }
+        else:
+            raise ValueError(f"'each' takes class, school or level, not '{field}'")
+        constraints.extend(
+            (label, bits & pool, count, None)
+            for label, bits in values.items()
+            if bits & pool
+        )
+    return constraints
+
+
+def allocate(
+    table: SpellTable,
+    pool: int,
+    constraints: list[tuple[str, int, int, Optional[int]]],
+    size: Optional[int] = None,
+    seed: int = 0,
+) -> list[int]:
+    """Pick deck rows from `pool` that satisfy every constraint.
+
+    Args:
+        table: The catalog's filter table
+        pool: Bitmap of candidate rows
+        constraints: (label, bitmap, low, high) tuples; high None is unbounded
+        size: Deck size (default: the sum of the exact quotas, or of the
+            minimums if there are none)
+        seed: Seed for the candidate order
+
+    Returns the chosen rows in catalog order.
+
+    Raises:
+        ValueError: If the constraints cannot be met from the pool
+    """
+    if size is None:
+        exact = [low for _, _, low, high in constraints if low == high]
+        size = sum(exact) if exact else sum(low for _, _, low, _ in constraints)
+
+    rng = random.Random(seed)
+    spare = [bits.bit_count() - low for _, bits, low, _ in constraints]
+    counts = [0] * len(constraints)
+    chosen: list[int] = []
+    chosen_bits = 0
+
+    def allowed() -> int:
+        """Unchosen pool rows that would not overflow any maximum."""
+        mask = pool & ~chosen_bits
+        for c, (_, bits, _, high) in enumerate(constraints):
+            if high is not None and counts[c] >= high:
+                mask &= ~bits
+        return mask
+
+    def take(row: int) -> bool:
+        """Add a row; True if that filled up some maximum."""
+        nonlocal chosen_bits
+        chosen.append(row)
+        chosen_bits |= 1 << row
+        filled = False
+        for c, (_, bits, _, high) in enumerate(constraints):
+            if bits >> row & 1:
+                counts[c] += 1
+                filled = filled or counts[c] == high
+        return filled
+
+    while len(chosen) < size:
+        unmet = [c for c, (_, _, low, _) in enumerate(constraints) if counts[c] < low]
+        if not unmet:
+            break
+        # Serve the tightest constraint first: fewest spare candidates
+        target = min(unmet, key=spare.__getitem__)
+        candidates = _sample(table, constraints[target][1] & allowed(), rng)
+        if not candidates:
+            label, _, low, _ = constraints[target]
+            raise ValueError(
+                f"Cannot pick {low} spell(s) matching '{label}' within the other "
+                "constraints"
+            )
+        # Ties go to the earlier (random) candidate
+        take(
+            max(
+                candidates,
+                key=lambda row: sum(constraints[c][1] >> row & 1 for c in unmet),
+            )
+        )
+
+    unmet_labels = [
+        label for c, (label, _, low, _) in enumerate(constraints) if counts[c] < low
+    ]
+    if unmet_labels:
+        raise ValueError(
+            f"Deck size {size} is too small to satisfy: {', '.join(unmet_labels)}"
+        )
+
+    while len(chosen) < size:
+        picks = _sample(table, allowed(), rng, size - len(chosen))
+        if not picks:
+            raise ValueError(
+                f"Only {len(chosen)} spell(s) fit the constraints; asked for {size}"
+            )
+        for row in picks:
+            if take(row):
+                break  # a maximum filled up; the remaining picks may overflow it
+    return sorted(chosen)
+
+
+def _sample(
+    table: SpellTable, bits: int, rng: random.Random, count: int = CANDIDATES
+) -> list[int]:
+    """Return up to `count` distinct rows of `bits` in seeded random order.
+
+    Small bitmaps are listed and shuffled. For large ones, each draw jumps
+    to a random row and takes the next set bit, so nothing is listed.
+    That favours rows after gaps slightly, which is fine for picking
+    between candidates.
+    """
+    if bits.bit_count() <= count:
+        rows = table.rows(bits)
+        rng.shuffle(rows)
+        return rows
+    found: dict[int, None] = {}
+    for _ in range(2 * count):
+        start = rng.randrange(table.size)
+        rest = bits >> start
+        lowest = rest & -rest if rest else bits & -bits
+        found[lowest.bit_length() - 1 + (start if rest else 0)] = None
+        if len(found) >= count:
+            break
+    return list(found)
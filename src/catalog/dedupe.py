@@ -0,0 +1,150 @@
+# src/catalog/dedupe.py
+
+"""Near-duplicate detection for spell descriptions with MinHash and LSH.
+
+Homebrew collections often carry lightly reworded copies of SRD spells.
+Each description becomes a set of word 3-gram shingles. Each set gets a
+MinHash signature, computed with one-permutation hashing: every shingle
+is hashed once into one of `NUM_HASHES` bins, and empty bins borrow
+from their neighbours. Signatures are cut into `BANDS` bands, and
+spells that share any band land in the same LSH bucket. Only spells
+sharing a bucket are compared exactly, so the work grows with the
+number of near-duplicates instead of with every pair of spells.
+Candidate pairs whose shingle Jaccard similarity reaches `THRESHOLD`
+are joined into clusters.
+
+Only spells of the same level are compared. Spell families such as
+Dominate Beast, Person and Monster share almost all of their wording
+but are different spells, and a reworded copy keeps its level.
+"""
+
+import re
+import zlib
+from typing import Iterable
+
+NUM_HASHES = 32
+# 8 bands of 4 rows: a pair at 0.8 similarity shares a bucket 98.5% of the time
+BANDS = 8
+THRESHOLD = 0.8
+SHINGLE_SIZE = 3
+# Members of a bucket group a new spell is compared with
+GROUP_CHECKS = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_EMPTY = 1 << 32
+# Offset added per step when an empty bin borrows a neighbour's value, so
+# borrowed values never collide with real ones
+_BORROW_STEP = 1 << 33
+
+
+def shingles(text: str) -> set[int]:
+    """Return the hashed word 3-grams of a text (single words if shorter).
+
+    Hashes are CRC-32s, which are the same in every process, so the
+    clusters stored with a catalog do not depend on PYTHONHASHSEED.
+    """
+    words = _WORD_RE.findall(text.lower())
+    grams = [
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    ]
+    if len(words) < SHINGLE_SIZE:
+        grams = words
+    return {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+
+
+def signature(shingle_set: set[int]) -> tuple[int, ...]:
+    """Return the one-permutation MinHash signature of a non-empty shingle set."""
+    bins = [_EMPTY] * NUM_HASHES
+    for value in shingle_set:
+        slot, rest = value % NUM_HASHES, value // NUM_HASHES
+        if rest < bins[slot]:
+            bins[slot] = rest
+    # Densify: an empty bin takes the next filled bin's value (circularly),
+    # found in one backwards sweep over two laps of the bins
+    if _EMPTY in bins:
+        nearest, at = _EMPTY, 0
+        for i in range(2 * NUM_HASHES - 1, -1, -1):
+            value = bins[i % NUM_HASHES]
+            if value < _EMPTY:
+                nearest, at = value, i
+            elif i < NUM_HASHES and nearest < _EMPTY:
+                bins[i] = nearest + (at - i) * _BORROW_STEP
+    return tuple(bins)
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _text(spell: dict) -> str:
+    desc = spell.get("desc") or []
+    return " ".join(desc) if isinstance(desc, (list, tuple)) else str(desc)
+
+
+def find_clusters(
+    spells: Iterable[tuple[int, dict]], threshold: float = THRESHOLD
+) -> list[list[int]]:
+    """Group (position, spell) pairs whose descriptions are near-duplicates.
+
+    Within an LSH bucket, a spell joins the first group of earlier
+    spells it matches. It is compared with up to `GROUP_CHECKS` members
+    of each group, not only the first, because similarity is not
+    transitive. A spell that only matches a later member of a large
+    group is not joined in that bucket.
+
+    Returns clusters of two or more positions, each sorted, ordered by
+    their first position. Spells of different levels and spells without
+    a description are never clustered.
+    """
+    sets: dict[int, set[int]] = {}
+    buckets: dict[tuple, list[int]] = {}
+    rows = NUM_HASHES // BANDS
+    for position, spell in spells:
+        shingle_set = shingles(_text(spell))
+        if not shingle_set:
+            continue
+        sets[position] = shingle_set
+        sig = signature(shingle_set)
+        for band in range(BANDS):
+            key = (spell.get("level"), band, sig[band * rows : (band + 1) * rows])
+            buckets.setdefault(key, []).append(position)
+
+    parent = {}
+
+    def find(x: int) -> int:
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    checked = set()
+
+    def matches(a: int, b: int) -> bool:
+        if (a, b) in checked:
+            return False
+        checked.add((a, b))
+        return jaccard(sets[a], sets[b]) >= threshold
+
+    for members in buckets.values():
+        # Group the bucket as we go; each spell is compared with the first
+        # GROUP_CHECKS members of every group, so a bucket of many identical
+        # descriptions stays linear
+        groups: list[list[int]] = []
+        for b in members:
+            for group in groups:
+                if find(group[0]) == find(b) or any(
+                    matches(a, b) for a in group[:GROUP_CHECKS]
+                ):
+                    low, high = sorted((find(group[0]), find(b)))
+                    parent[high] = low
+                    group.append(b)
+                    break
+            else:
+                groups.append([b])
+
+    clusters: dict[int, set[int]] = {}
+    for position in list(parent):
+        root = find(position)
+        clusters.setdefault(root, {root}).add(position)
+    return sorted(sorted(members) for members in clusters.values())
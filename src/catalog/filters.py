@@ -0,0 +1,315 @@
+# src/catalog/filters.py
+
+"""A small filter expression language for spell queries.
+
+    level<=3 and not concentration and components!~M
+    (class=wizard,sorcerer or school~evoc) and casting_time="1 action"
+
+An expression is parsed once and compiled into a tree of bitmap
+operations over the columnar `SpellTable` (see `columns.py`). Evaluating
+it ORs, ANDs and complements whole-catalog bitmaps. No Python code runs
+per spell, so a complex filter costs about the same as a simple one.
+Compiled filters are cached by their text.
+
+Fields and operators:
+
+- `level`: `=` `!=` `<` `<=` `>` `>=` with a number
+- `class`, `school`, `casting_time`: `=` / `!=` for an exact
+  (case-insensitive) value, and `~` / `!~` for values containing the text
+- `components`: `~` has every listed letter, `!~` has none of them, and
+  `=` / `!=` compare the exact set (e.g. `components=VS`)
+- `concentration`, `ritual`: on their own, or `=true` / `=false`
+
+`=`, `!=`, `~` and `!~` take comma-separated alternatives
+(`class=wizard,sorcerer`); the positive forms match any alternative and
+the negated forms match none. Conditions combine with `and`, `or`, `not`
+and parentheses; `and` binds tighter than `or`. Values with spaces are
+quoted.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable
+
+from src.catalog.columns import SpellTable
+
+Filter = Callable[[SpellTable], int]
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<op><=|>=|!=|!~|==|=|<|>|~)
+        |(?P<punct>[(),])
+        |"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'
+        |(?P<word>[\w.+'-]+)
+    )""",
+    re.VERBOSE,
+)
+
+FLAGS = ("concentration", "ritual")
+VOCABULARIES = {
+    "class": ("class_codes", "class_bits"),
+    "school": ("school_codes", "school_bits"),
+    "casting_time": ("casting_codes", "casting_bits"),
+}
+FIELDS = ("level", "components", *VOCABULARIES, *FLAGS)
+
+_LEVEL_OPS = {
+    "=": int.__eq__,
+    "==": int.__eq__,
+    "!=": int.__ne__,
+    "<": int.__lt__,
+    "<=": int.__le__,
+    ">": int.__gt__,
+    ">=": int.__ge__,
+}
+_BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+def _tokenize(text: str) -> list[tuple[str, str, int]]:
+    """Split an expression into (kind, value, column) tokens."""
+    tokens, pos = [], 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            if text[pos:].strip():
+                raise ValueError(f"Unexpected '{text[pos:].strip()[0]}' at {pos + 1}")
+            break
+        kind = match.lastgroup
+        value = match.group(kind)
+        column = match.start(kind) + 1
+        if kind in ("dq", "sq"):
+            kind = "text"
+        elif kind == "word" and value.lower() in ("and", "or", "not"):
+            kind, value = value.lower(), value.lower()
+        tokens.append((kind, value, column))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser that builds the compiled filter directly."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self) -> tuple[str, str, int]:
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return ("end", "", len(self.text) + 1)
+
+    def take(self, expected: str, *kinds: str) -> tuple[str, str, int]:
+        """Consume the next token, which must be one of `kinds`."""
+        token = self.peek()
+        if token[0] not in kinds or (token[0] == "punct" and token[1] != expected):
+            found = "the end" if token[0] == "end" else f"'{token[1]}'"
+            raise ValueError(f"Expected {expected} but found {found} at {token[2]}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Filter:
+        node = self.either()
+        self.take("'and', 'or' or the end", "end")
+        return node
+
+    def either(self) -> Filter:
+        nodes = [self.both()]
+        while self.peek()[0] == "or":
+            self.take("'or'", "or")
+            nodes.append(self.both())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda table: _reduce_or(table, nodes)
+
+    def both(self) -> Filter:
+        nodes = [self.negation()]
+        while self.peek()[0] == "and":
+            self.take("'and'", "and")
+            nodes.append(self.negation())
+        if len(nodes) == 1:
+            return nodes[0]
+        return lambda table: _reduce_and(table, nodes)
+
+    def negation(self) -> Filter:
+        if self.peek()[0] == "not":
+            self.take("'not'", "not")
+            inner = self.negation()
+            return lambda table: table.all ^ inner(table)
+        if self.peek()[0] == "punct" and self.peek()[1] == "(":
+            self.take("(", "punct")
+            node = self.either()
+            self.take(")", "punct")
+            return node
+        return self.condition()
+
+    def values(self) -> list[str]:
+        values = [self.take("a value", "word", "text")[1]]
+        while self.peek()[:2] == ("punct", ","):
+            self.take(",", "punct")
+            values.append(self.take("a value", "word", "text")[1])
+        return values
+
+    def condition(self) -> Filter:
+        _, name, column = self.take("a field", "word")
+        field = name.lower()
+        if field not in FIELDS:
+            raise ValueError(
+                f"Unknown field '{name}' at {column} (expected one of: "
+                f"{', '.join(FIELDS)})"
+            )
+        if field in FLAGS and self.peek()[0] != "op":
+            return _flag(field, True)
+        _, op, op_column = self.take("an operator", "op")
+        values = self.values()
+        try:
+            if field in FLAGS:
+                return _flag_condition(field, op, values)
+            if field == "level":
+                return _level_condition(op, values)
+            if field == "components":
+                return _components_condition(op, values)
+            return _vocabulary_condition(field, op, values)
+        except ValueError as e:
+            raise ValueError(f"{e} (for '{name}' at {column})") from None
+        except KeyError:
+            raise ValueError(
+                f"Operator '{op}' does not apply to '{name}' at {op_column}"
+            ) from None
+
+
+def _reduce_or(table: SpellTable, nodes: list[Filter]) -> int:
+    mask = 0
+    for node in nodes:
+        mask |= node(table)
+    return mask
+
+
+def _reduce_and(table: SpellTable, nodes: list[Filter]) -> int:
+    mask = table.all
+    for node in nodes:
+        mask &= node(table)
+        if not mask:
+            break
+    return mask
+
+
+def _negated(op: str, positive: Filter) -> Filter:
+    """Return `positive` for =/~ and its complement for !=/!~."""
+    if op.startswith("!"):
+        return lambda table: table.all ^ positive(table)
+    return positive
+
+
+def _flag(field: str, wanted: bool) -> Filter:
+    def evaluate(table: SpellTable) -> int:
+        bits = getattr(table, f"{field}_bits")
+        return bits if wanted else table.all ^ bits
+
+    return evaluate
+
+
+def _flag_condition(field: str, op: str, values: list[str]) -> Filter:
+    if op not in ("=", "==", "!="):
+        raise KeyError(op)
+    if len(values) != 1:
+        raise ValueError("Expected a single true or false")
+    wanted = _BOOLEANS.get(values[0].lower())
+    if wanted is None:
+        raise ValueError(f"Expected true or false, not '{values[0]}'")
+    return _flag(field, wanted != (op == "!="))
+
+
+def _level_condition(op: str, values: list[str]) -> Filter:
+    compare = _LEVEL_OPS[op]
+    try:
+        levels = [int(value) for value in values]
+    except ValueError:
+        raise ValueError(f"Levels are numbers, not '{', '.join(values)}'") from None
+    if len(levels) > 1 and op not in ("=", "==", "!="):
+        raise ValueError(f"'{op}' takes a single level")
+    if op == "!=":
+        return _negated(op, _level_condition("=", values))
+
+    def evaluate(table: SpellTable) -> int:
+        mask = 0
+        for level, bits in table.level_bits.items():
+            # Unknown levels (-1) never satisfy a comparison
+            if level >= 0 and any(compare(level, wanted) for wanted in levels):
+                mask |= bits
+        return mask
+
+    return evaluate
+
+
+def _components_condition(op: str, values: list[str]) -> Filter:
+    letters = {letter for value in values for letter in value.lower()}
+    unknown = letters - set("vsm")
+    if unknown:
+        raise ValueError(f"Components are V, S and M, not '{''.join(sorted(unknown))}'")
+
+    def exact(table: SpellTable) -> int:
+        mask = table.all
+        for letter, bits in table.component_bits.items():
+            mask &= bits if letter in letters else table.all ^ bits
+        return mask
+
+    def has_all(table: SpellTable) -> int:
+        mask = table.all
+        for letter in letters:
+            mask &= table.component_bits[letter]
+        return mask
+
+    def has_none(table: SpellTable) -> int:
+        mask = table.all
+        for letter in letters:
+            mask &= table.all ^ table.component_bits[letter]
+        return mask
+
+    conditions = {
+        "=": exact,
+        "==": exact,
+        "!=": _negated("!=", exact),
+        "~": has_all,
+        "!~": has_none,
+    }
+    return conditions[op]
+
+
+def _vocabulary_condition(field: str, op: str, values: list[str]) -> Filter:
+    codes_name, bits_name = VOCABULARIES[field]
+    wanted = [value.lower() for value in values]
+    if op in ("=", "==", "!="):
+
+        def matches(name: str) -> bool:
+            return name in wanted
+
+    elif op in ("~", "!~"):
+
+        def matches(name: str) -> bool:
+            return any(value in name for value in wanted)
+
+    else:
+        raise KeyError(op)
+
+    def positive(table: SpellTable) -> int:
+        bits = getattr(table, bits_name)
+        mask = 0
+        # Match against the (small) vocabulary, then OR whole bitmaps
+        for name, code in getattr(table, codes_name).items():
+            if matches(name):
+                mask |= bits.get(code, 0)
+        return mask
+
+    return _negated(op, positive)
+
+
+@lru_cache(maxsize=256)
+def compile_filter(text: str) -> Filter:
+    """Parse a filter expression into a function from table to row bitmap.
+
+    Raises:
+        ValueError: If the expression is malformed, names an unknown
+            field or uses an operator the field does not support
+    """
+    return _Parser(text).parse()
@@ -0,0 +1,235 @@
+# src/catalog/merge.py
+
+"""Merge several spell sources into one catalog with per-field provenance.
+
+Sources are listed in a `sources.json` next to the env's spells cache:
+
+    {
+      "sources": [
+        {"name": "homebrew", "path": "homebrew/spells.json"},
+        {"name": "5etools", "path": "5etools-mirror/data", "format": "5etools"},
+        {"name": "srd", "path": "spells.json"}
+      ],
+      "precedence": {"desc": ["srd"]}
+    }
+
+Paths are relative to the file. A "json" source (the default) is a
+normalized spells file (a list or {"spells": [...]}, optionally .br); a
+"5etools" source is a 5etools data folder or a single 5etools spell file.
+
+Spells are matched on a canonical key built from their name, so "Melf's
+Acid Arrow" and "melfs acid arrow" are the same spell. The merge is a
+single-pass hash join: one dict keyed by canonical key, and each
+incoming record fills or overrides fields according to precedence. By
+default the earlier source wins every field; `precedence` lists the
+sources that win a particular field first. Empty values never override.
+Each merged spell records which source supplied each field under
+`provenance`.
+
+The result is written to `merged.json` and reused until the config or
+any input changes.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from src.fetch.fivetools import iter_spells, normalize_5etools_spell
+from src.utils.storage import cached_file, read_json, write_json_array
+
+CONFIG_NAME = "sources.json"
+MERGED_NAME = "merged.json"
+FORMATS = ("json", "5etools")
+
+_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+
+def canonical_key(name: str) -> str:
+    """Return the join key for a spell name ("Melf’s Acid Arrow" → "melfs-acid-arrow")."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    text = text.lower().replace("'", "")
+    return _KEY_RE.sub("-", text).strip("-")
+
+
+def _empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def load_config(path: Path) -> dict:
+    """Read and validate a sources config.
+
+    Raises:
+        ValueError: If a source has no name/path, a name repeats or a
+            format is unknown
+    """
+    config = json.loads(path.read_text(encoding="utf-8"))
+    names = set()
+    for source in config.get("sources", []):
+        if not source.get("name") or not source.get("path"):
+            raise ValueError(f"Every source in {path} needs a name and a path")
+        if source["name"] in names:
+            raise ValueError(f"Source '{source['name']}' is listed twice in {path}")
+        if source.get("format", "json") not in FORMATS:
+            raise ValueError(
+                f"Unknown format '{source['format']}' for source '{source['name']}'"
+            )
+        names.add(source["name"])
+    return config
+
+
+def _source_path(config_path: Path, source: dict) -> Path:
+    return (config_path.parent / source["path"]).resolve()
+
+
+def iter_source(path: Path, fmt: str = "json") -> Iterator[dict]:
+    """Yield the normalized spells of one source (nothing if it is missing)."""
+    if cached_file(path) is None:
+        return
+    if fmt == "5etools":
+        if path.is_dir():
+            yield from iter_spells(path, workers=1)
+        else:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            yield from (normalize_5etools_spell(s) for s in data.get("spell", []))
+        return
+    data = read_json(path)
+    yield from data.get("spells", []) if isinstance(data, dict) else data
+
+
+def _field_ranks(names: list[str], precedence: dict) -> dict[str, dict[str, int]]:
+    """Return {field: {source: rank}} for every field with its own rule."""
+    ranks = {}
+    for field, preferred in precedence.items():
+        order = list(preferred) + [n for n in names if n not in preferred]
+        ranks[field] = {name: rank for rank, name in enumerate(order)}
+    return ranks
+
+
+def merge_sources(
+    sources: Iterable[tuple[str, Iterable[dict]]],
+    precedence: Optional[dict] = None,
+) -> list[dict]:
+    """Hash-join spells from (name, records) sources into one list.
+
+    Args:
+        sources: Sources in default precedence order (first wins)
+        precedence: {field: [source, ...]} overrides for individual fields
+
+    Returns merged spells in order of first appearance, each with a
+    `provenance` mapping of field → source name.
+    """
+    sources = list(sources)
+    names = [name for name, _ in sources]
+    default = {name: rank for rank, name in enumerate(names)}
+    ranks = _field_ranks(names, precedence or {})
+
+    merged: dict[str, dict] = {}
+    field_ranks: dict[str, dict] = {}
+    for name, records in sources:
+        for record in records:
+            label = record.get("name") or record.get("index") or ""
+            key = canonical_key(label)
+            if not key:
+                continue
+            spell = merged.setdefault(key, {"provenance": {}})
+            held = field_ranks.setdefault(key, {})
+            for field, value in record.items():
+                if field == "provenance" or _empty(value):
+                    continue
+                rank = ranks.get(field, default)[name]
+                if field not in held or rank < held[field]:
+                    spell[field] = value
+                    spell["provenance"][field] = name
+                    held[field] = rank
+    for key, spell in merged.items():
+        spell.setdefault("index", key)
+        # Keep provenance last so merged records read like the sources
+        spell["provenance"] = spell.pop("provenance")
+    return list(merged.values())
+
+
+def _fingerprint(path: Path) -> str:
+    """Summarize a source file or folder by its files' sizes and mtimes."""
+    found = cached_file(path) or path
+    if not found.exists():
+        return "missing"
+    files = (
+        sorted(p for p in found.rglob("*") if p.is_file())
+        if found.is_dir()
+        else [found]
+    )
+    digest = hashlib.sha256()
+    for file in files:
+        stat = file.stat()
+        digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _inputs(config_path: Path, config: dict) -> dict:
+    return {
+        "config": hashlib.sha256(config_path.read_bytes()).hexdigest(),
+        "sources": {
+            source["name"]: _fingerprint(_source_path(config_path, source))
+            for source in config.get("sources", [])
+        },
+    }
+
+
+def merged_path(config_path: Path) -> Path:
+    return config_path.with_name(MERGED_NAME)
+
+
+def _inputs_path(config_path: Path) -> Path:
+    return config_path.with_name("merged.inputs.json")
+
+
+def is_stale(config_path: Path) -> bool:
+    """True if the merged catalog is missing or any of its inputs changed."""
+    inputs_file = _inputs_path(config_path)
+    if not merged_path(config_path).exists() or not inputs_file.exists():
+        return True
+    try:
+        recorded = json.loads(inputs_file.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return True
+    return recorded != _inputs(config_path, load_config(config_path))
+
+
+def merge_catalog(config_path: Path, force: bool = False) -> Path:
+    """Merge the sources in `config_path` into `merged.json` unless up to date.
+
+    Returns the merged file's path.
+    """
+    target = merged_path(config_path)
+    if not force and not is_stale(config_path):
+        return target
+    config = load_config(config_path)
+    # Fingerprint before reading, so an input edited mid-merge is caught next time
+    inputs = _inputs(config_path, config)
+    sources = [
+        (
+            source["name"],
+            iter_source(
+                _source_path(config_path, source), source.get("format", "json")
+            ),
+        )
+        for source in config.get("sources", [])
+    ]
+    write_json_array(target, merge_sources(sources, config.get("precedence")))
+    _inputs_path(config_path).write_text(json.dumps(inputs, indent=2), encoding="utf-8")
+    return target
+
+
+def catalog_source(spells_file: Path) -> Path:
+    """Return the spells file to build the catalog from.
+
+    That is the merged catalog when a sources.json sits next to
+    `spells_file` (merging first if needed), otherwise `spells_file`.
+    """
+    config_path = spells_file.with_name(CONFIG_NAME)
+    if not config_path.exists():
+        return spells_file
+    return merge_catalog(config_path)
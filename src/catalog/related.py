@@ -0,0 +1,136 @@
+# src/catalog/related.py
+
+"""Precomputed "related spells" from TF-IDF similarity of descriptions.
+
+Each spell is a sparse TF-IDF vector over the terms already stored in
+the BM25 postings (see `search.py`): weight (1 + log tf) · log(1 + N / df),
+normalized to unit length. The catalog build computes the cosine
+similarity of every spell with every other spell as a sparse matrix
+product, one row at a time: a spell's terms walk their postings and
+accumulate dot products. It keeps the top `TOP_K` neighbours of each
+spell in the `spell_related` table. Looking up a spell's related spells
+is then a primary-key read, with no similarity work at query time.
+
+Catalogs of up to `EXACT_LIMIT` spells (the SRD has 319) get exact
+cosine scores over every term. Larger merged catalogs apply three
+cut-offs to keep the product sparse, at the cost of slightly
+approximate scores for spells with long, common descriptions:
+
+- Terms found in more than half of all spells are skipped. They say
+  little about a spell.
+- Each term contributes through at most its `MAX_POSTINGS` heaviest
+  postings.
+- Each spell looks up only its `QUERY_TERMS` heaviest terms.
+"""
+
+import heapq
+import math
+import sqlite3
+from collections import defaultdict
+from operator import itemgetter
+from typing import Optional
+
+TOP_K = 10
+# Catalogs up to this size get exact scores, without the cut-offs below
+EXACT_LIMIT = 1000
+MAX_POSTINGS = 32
+QUERY_TERMS = 12
+MAX_DF_RATIO = 0.5
+
+_weight = itemgetter(1)
+
+SCHEMA = """
+CREATE TABLE spell_related (
+    position INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    neighbor INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (position, rank)
+) WITHOUT ROWID;
+"""
+
+
+def tfidf_vectors(
+    conn: sqlite3.Connection, exact: Optional[bool] = None
+) -> dict[int, dict[str, float]]:
+    """Return {position: {term: weight}} unit vectors from the search postings.
+
+    Unless `exact` (by default: for up to `EXACT_LIMIT` spells), terms
+    found in more than `MAX_DF_RATIO` of all spells are left out.
+    """
+    postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    for term, doc, tf in conn.execute("SELECT term, doc, tf FROM search_postings"):
+        postings[term].append((doc, tf))
+    total = len({doc for docs in postings.values() for doc, _ in docs})
+    if exact is None:
+        exact = total <= EXACT_LIMIT
+
+    vectors: dict[int, dict[str, float]] = defaultdict(dict)
+    for term, docs in postings.items():
+        if not exact and len(docs) > max(MAX_POSTINGS, total * MAX_DF_RATIO):
+            continue
+        idf = math.log(1 + total / len(docs))
+        for doc, tf in docs:
+            vectors[doc][term] = (1 + math.log(tf)) * idf
+    for vector in vectors.values():
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        for term in vector:
+            vector[term] /= norm
+    return dict(vectors)
+
+
+def nearest_neighbors(
+    vectors: dict[int, dict[str, float]],
+    k: int = TOP_K,
+    exact: Optional[bool] = None,
+) -> dict[int, list[tuple[int, float]]]:
+    """Return the `k` most cosine-similar spells of every spell, best first.
+
+    Scores are exact if `exact` (by default: for up to `EXACT_LIMIT`
+    spells) and pruned otherwise. Spells with no similar spell are absent.
+    """
+    if exact is None:
+        exact = len(vectors) <= EXACT_LIMIT
+    index: dict[str, list[tuple[int, float]]] = defaultdict(list)
+    for doc, vector in vectors.items():
+        for term, weight in vector.items():
+            index[term].append((doc, weight))
+    if not exact:
+        for term, docs in index.items():
+            if len(docs) > MAX_POSTINGS:
+                index[term] = heapq.nlargest(MAX_POSTINGS, docs, key=_weight)
+
+    neighbors = {}
+    for doc, vector in vectors.items():
+        scores: dict[int, float] = {}
+        get = scores.get
+        terms = (
+            vector.items()
+            if exact
+            else heapq.nlargest(QUERY_TERMS, vector.items(), key=_weight)
+        )
+        for term, weight in terms:
+            for other, other_weight in index[term]:
+                scores[other] = get(other, 0.0) + weight * other_weight
+        scores.pop(doc, None)
+        if scores:
+            neighbors[doc] = heapq.nlargest(k, scores.items(), key=_weight)
+    return neighbors
+
+
+def build_related(conn: sqlite3.Connection, k: int = TOP_K) -> None:
+    """Create and fill `spell_related` from an already built search index."""
+    conn.executescript(SCHEMA)
+    (total,) = conn.execute(
+        "SELECT COUNT(DISTINCT doc) FROM search_postings"
+    ).fetchone()
+    exact = total <= EXACT_LIMIT
+    neighbors = nearest_neighbors(tfidf_vectors(conn, exact), k, exact)
+    conn.executemany(
+        "INSERT INTO spell_related VALUES (?, ?, ?, ?)",
+        (
+            (doc, rank, other, score)
+            for doc, best in neighbors.items()
+            for rank, (other, score) in enumerate(best)
+        ),
+    )
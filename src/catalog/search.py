@@ -0,0 +1,130 @@
+# src/catalog/search.py
+
+"""BM25 full-text index over spell names and descriptions.
+
+The index is an inverted index stored in the catalog database next to
+the spells it covers: one postings row per (term, spell) with the term
+frequency. A query only reads the postings of its own terms, so ranking
+a large merged catalog costs a few index range scans instead of a pass
+over every description. Each posting also carries its document's
+length, so scoring needs no joins.
+"""
+
+import math
+import re
+import sqlite3
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+# Name tokens count this many times, so "fire" ranks Fire Bolt above a
+# spell that merely mentions fire once in its description
+NAME_BOOST = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have if in into is it its of on "
+    "or that the their them then there these they this to up was were when "
+    "which while with within you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+SCHEMA = """
+CREATE TABLE search_postings (
+    term TEXT NOT NULL,
+    doc INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (term, doc)
+) WITHOUT ROWID;
+"""
+
+
+@lru_cache(maxsize=65536)
+def _stem(token: str) -> str:
+    """Very light plural stripping so "creatures" matches "creature"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem."""
+    return [
+        _stem(token)
+        for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+def document_terms(spell: dict) -> Counter:
+    """Return the boosted term frequencies indexed for one spell."""
+    desc = spell.get("desc") or []
+    text = " ".join(desc) if isinstance(desc, (list, tuple)) else str(desc)
+    terms = Counter(tokenize(text))
+    for token in tokenize(spell.get("name") or ""):
+        terms[token] += NAME_BOOST
+    return terms
+
+
+def build_index(conn: sqlite3.Connection, spells: Iterable[tuple[int, dict]]) -> None:
+    """Create and fill the search tables for (position, spell) pairs.
+
+    Corpus statistics go into the catalog's `meta` table so queries never
+    have to count documents.
+    """
+    conn.executescript(SCHEMA)
+    total = total_length = 0
+    for doc, spell in spells:
+        terms = document_terms(spell)
+        length = sum(terms.values())
+        conn.executemany(
+            "INSERT INTO search_postings VALUES (?, ?, ?, ?)",
+            ((term, doc, tf, length) for term, tf in terms.items()),
+        )
+        total += 1
+        total_length += length
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        (("search_docs", str(total)), ("search_length", str(total_length))),
+    )
+
+
+def search(conn: sqlite3.Connection, query: str) -> dict[int, float]:
+    """Score every spell containing at least one query term with BM25.
+
+    Returns a mapping of spell position to score; spells that match no
+    query term are absent.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return {}
+    stats = dict(
+        conn.execute(
+            "SELECT key, value FROM meta WHERE key IN ('search_docs', 'search_length')"
+        ).fetchall()
+    )
+    total = int(stats.get("search_docs", 0))
+    total_length = int(stats.get("search_length", 0))
+    if not total:
+        return {}
+    avg_length = total_length / total
+
+    scores: dict[int, float] = {}
+    for term in terms:
+        postings = conn.execute(
+            "SELECT doc, tf, length FROM search_postings WHERE term = ?", (term,)
+        ).fetchall()
+        if not postings:
+            continue
+        idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc, tf, length in postings:
+            norm = tf + K1 * (1 - B + B * length / avg_length)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / norm
+    return scores
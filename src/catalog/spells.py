@@ -0,0 +1,501 @@
+# src/catalog/spells.py
+
+"""Indexed SQLite catalog built from the cached spells.json.
+
+The catalog lives next to its source (spells.json → spells.sqlite) and is
+rebuilt automatically whenever the source file changes. Spells are keyed
+by `index`, with secondary indexes on class, level, school,
+concentration and ritual, so lookups and filtered queries stay
+logarithmic no matter how large the spell list (or homebrew catalog)
+grows. Opening an up-to-date catalog costs one small metadata query.
+The same database holds the BM25 full-text index (see `search.py`), the
+near-duplicate clusters found at build time (see `dedupe.py`) and each
+spell's precomputed related spells (see `related.py`).
+Filtered queries run against an in-memory columnar copy of the
+filterable fields (see `columns.py`). It is snapshotted to spells.snapshot
+whenever the catalog is rebuilt, so a cold start loads it in one read.
+
+`load_catalog` is the shared entry point: it keeps one open catalog per
+source for the life of the process, reopens it only when the source's
+inode, size or mtime changes, and hands out frozen records that are
+decoded once and shared by every caller.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+from src.catalog.columns import SpellTable
+from src.catalog.compose import allocate, parse_constraints
+from src.catalog.dedupe import find_clusters
+from src.catalog.filters import compile_filter
+from src.catalog.related import build_related
+from src.catalog.search import build_index, search
+from src.utils.storage import cached_file, read_json
+
+SCHEMA_VERSION = 8
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE spells (
+    idx TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    level INTEGER,
+    school TEXT,
+    concentration INTEGER NOT NULL,
+    ritual INTEGER NOT NULL,
+    components TEXT NOT NULL,
+    casting_time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE spell_classes (
+    class TEXT NOT NULL,
+    idx TEXT NOT NULL,
+    PRIMARY KEY (class, idx)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX spells_position ON spells (position);
+CREATE INDEX spells_name ON spells (name_key);
+CREATE INDEX spells_level ON spells (level, position);
+CREATE INDEX spells_school ON spells (school, position);
+CREATE INDEX spells_concentration ON spells (concentration, position);
+CREATE INDEX spells_ritual ON spells (ritual, position);
+CREATE TABLE spell_clusters (
+    position INTEGER PRIMARY KEY,
+    cluster INTEGER NOT NULL
+);
+"""
+
+
+def catalog_path(source: Path) -> Path:
+    """Return the catalog path for a spells cache (spells.json → spells.sqlite)."""
+    return source.with_name(f"{source.name.split('.')[0]}.sqlite")
+
+
+def is_concentration(spell: dict) -> bool:
+    """True if a spell needs concentration (explicit flag or duration text)."""
+    if "concentration" in spell:
+        return bool(spell["concentration"])
+    return str(spell.get("duration") or "").lower().startswith("concentration")
+
+
+def _fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return ":".join(
+        str(part)
+        for part in (
+            SCHEMA_VERSION,
+            path.name,
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+    )
+
+
+def _key(spell: dict) -> str:
+    return spell.get("index") or spell.get("name")
+
+
+def _unique(spells: Iterable[dict]) -> list[tuple[int, dict]]:
+    """Pair spells with their source position, keeping the first of each index."""
+    seen, unique = set(), []
+    for position, spell in enumerate(spells):
+        if _key(spell) not in seen:
+            seen.add(_key(spell))
+            unique.append((position, spell))
+    return unique
+
+
+def _rows(spells: Iterable[tuple[int, dict]]) -> Iterator[tuple]:
+    for position, spell in spells:
+        yield (
+            _key(spell),
+            position,
+            spell.get("name", ""),
+            spell.get("name", "").lower(),
+            spell.get("level"),
+            str(spell.get("school") or "").lower(),
+            int(is_concentration(spell)),
+            int(bool(spell.get("ritual"))),
+            "".join(str(c) for c in spell.get("components") or []).lower(),
+            str(spell.get("casting_time") or "").lower(),
+            json.dumps(spell),
+        )
+
+
+def build_catalog(source: Path, target: Path) -> None:
+    """Build a fresh catalog at `target` from a spells cache, atomically.
+
+    Also writes the filter-table snapshot for the new catalog.
+    """
+    spells = _unique(read_json(source))
+    tmp_path = target.with_name(f"{target.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO spells VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _rows(spells)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO spell_classes VALUES (?, ?)",
+            (
+                (str(cls).lower(), _key(spell))
+                for _, spell in spells
+                for cls in spell.get("classes", [])
+            ),
+        )
+        build_index(conn, spells)
+        build_related(conn)
+        conn.executemany(
+            "INSERT INTO spell_clusters VALUES (?, ?)",
+            (
+                (position, members[0])
+                for members in find_clusters(spells)
+                for position in members
+            ),
+        )
+        fingerprint = _fingerprint(cached_file(source))
+        conn.execute("INSERT INTO meta VALUES ('source', ?)", (fingerprint,))
+        conn.commit()
+        table = SpellTable.from_connection(conn)
+    finally:
+        conn.close()
+    os.replace(tmp_path, target)
+    table.save(target.with_suffix(".snapshot"), fingerprint)
+
+
+def freeze(value: Any) -> Any:
+    """Return a deeply read-only copy (dicts → mapping proxies, lists → tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class SpellCatalog:
+    """Read-only query interface over a built catalog.
+
+    Records are decoded on first use and cached as frozen mappings, so
+    repeated queries return the same shared objects without re-parsing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self._records: dict = {}
+        self._table: Optional[SpellTable] = None
+
+    @classmethod
+    def open(cls, source: Path) -> Optional["SpellCatalog"]:
+        """Open the catalog for a spells cache, (re)building it if stale.
+
+        Returns None if the spells cache does not exist.
+        """
+        found = cached_file(source)
+        if found is None:
+            return None
+        target = catalog_path(source)
+        if _stored_fingerprint(target) != _fingerprint(found):
+            build_catalog(source, target)
+        return cls(target)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SpellCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM spells").fetchone()[0]
+
+    def _record(self, idx: str, data: str) -> Mapping:
+        """Return the shared frozen record for a row, decoding it on first use."""
+        if idx not in self._records:
+            self._records[idx] = freeze(json.loads(data))
+        return self._records[idx]
+
+    def _load(self, sql: str, params: Iterable = ()) -> list[Mapping]:
+        """Run a query selecting (idx, data) and return the cached records."""
+        with self.lock:
+            rows = self.conn.execute(sql, tuple(params)).fetchall()
+            return [self._record(idx, data) for idx, data in rows]
+
+    def all(self) -> list[Mapping]:
+        """Return every spell in source order."""
+        return self._load("SELECT idx, data FROM spells ORDER BY position")
+
+    def get(self, identifier: str) -> Optional[Mapping]:
+        """Look a spell up by index or (case-insensitive) name."""
+        found = self._load(
+            "SELECT idx, data FROM spells WHERE idx = ? OR name_key = ? "
+            "ORDER BY idx != ?, position LIMIT 1",
+            (identifier, identifier.lower(), identifier),
+        )
+        return found[0] if found else None
+
+    def query(
+        self,
+        classes: Optional[Iterable[str]] = None,
+        levels: Optional[Iterable[int]] = None,
+        schools: Optional[Iterable[str]] = None,
+        concentration: Optional[bool] = None,
+        ritual: Optional[bool] = None,
+        limit: Optional[int] = None,
+        text: Optional[str] = None,
+        distinct: bool = False,
+        where: Optional[str] = None,
+    ) -> list[Mapping]:
+        """Return spells matching every given filter, in source order.
+
+        With `text`, only spells matching at least one of its terms are
+        returned, ranked by BM25 relevance instead of source order.
+
+        Args:
+            classes: Match spells available to any of these classes
+            levels: Match any of these spell levels
+            schools: Match any of these schools
+            concentration: Match on whether the spell needs concentration
+            ritual: Match on whether the spell can be cast as a ritual
+            limit: Maximum number of spells to return
+            text: Free-text query over spell names and descriptions
+            distinct: Return only the first spell of each near-duplicate
+                cluster (see `dedupe.py`)
+            where: Filter expression, ANDed with the other filters (see
+                `filters.py`)
+
+        Raises:
+            ValueError: If `where` is not a valid filter expression
+        """
+        table = self.table
+        mask = self._select(
+            classes, levels, schools, concentration, ritual, where=where
+        )
+        if text is not None:
+            rows = self._ranked(text, mask)
+        elif distinct and mask & table.duplicate_bits:
+            rows = table.rows(mask)
+        else:
+            rows = table.rows(mask, limit)
+        if distinct:
+            rows = table.distinct(rows, limit)
+        return self._by_row(rows[: limit or None])
+
+    def compose(
+        self,
+        quotas: Iterable[str] = (),
+        at_least: Iterable[str] = (),
+        at_most: Iterable[str] = (),
+        each: Iterable[str] = (),
+        size: Optional[int] = None,
+        seed: int = 0,
+        where: Optional[str] = None,
+        distinct: bool = False,
+    ) -> list[Mapping]:
+        """Pick a deck that meets quotas and constraints (see `compose.py`).
+
+        Returns the chosen spells in source order.
+
+        Args:
+            quotas: "COUNT:EXPRESSION" specs matched exactly
+            at_least: "COUNT:EXPRESSION" minimums
+            at_most: "COUNT:EXPRESSION" maximums
+            each: "COUNT:FIELD" minimums for every class, school or level
+            size: Deck size (default: the sum of the quotas, or of the
+                minimums if there are none)
+            seed: Seed that picks among equally good spells
+            where: Filter expression limiting the candidate pool
+            distinct: Keep only the first spell of each near-duplicate
+                cluster in the pool
+
+        Raises:
+            ValueError: If a spec is malformed or the constraints cannot
+                be met
+        """
+        table = self.table
+        pool = self._select(where=where)
+        if distinct:
+            pool = table.mask(table.distinct(table.rows(pool)))
+        constraints = parse_constraints(table, pool, quotas, at_least, at_most, each)
+        return self._by_row(allocate(table, pool, constraints, size, seed))
+
+    def duplicates(self) -> list[list[Mapping]]:
+        """Return the near-duplicate clusters found when the catalog was built."""
+        table = self.table
+        clusters: dict[int, list[int]] = {}
+        for row in sorted(table.cluster):
+            clusters.setdefault(table.cluster[row], []).append(row)
+        return [self._by_row(rows) for rows in clusters.values()]
+
+    def related(self, identifier: str, k: int = 5) -> list[Mapping]:
+        """Return up to `k` spells most similar to a spell, best first.
+
+        The neighbours were computed when the catalog was built, so this
+        is a single indexed read. Unknown spells have no related spells.
+
+        Args:
+            identifier: Spell index or (case-insensitive) name
+            k: Maximum number of related spells (at most `related.TOP_K`)
+        """
+        spell = self.get(identifier)
+        if spell is None:
+            return []
+        return self._load(
+            "SELECT s.idx, s.data FROM spell_related r "
+            "JOIN spells s ON s.position = r.neighbor "
+            "WHERE r.position = (SELECT position FROM spells WHERE idx = ?) "
+            "ORDER BY r.rank LIMIT ?",
+            (_key(spell), k),
+        )
+
+    def preview(
+        self,
+        classes: Optional[Iterable[str]] = None,
+        levels: Optional[Iterable[int]] = None,
+        schools: Optional[Iterable[str]] = None,
+        concentration: Optional[bool] = None,
+        ritual: Optional[bool] = None,
+        text: Optional[str] = None,
+        samples: int = 5,
+        distinct: bool = False,
+        where: Optional[str] = None,
+    ) -> dict:
+        """Count what `query` would match without loading the matching spells.
+
+        Takes the same filters as `query`, so with `distinct` only the first
+        spell of each near-duplicate cluster is counted. Returns the number
+        of matches, their counts per facet (see `SpellTable.facets`) and the
+        names of the first `samples` matches in result order. Only the
+        sampled records are ever decoded.
+        """
+        table = self.table
+        mask = self._select(
+            classes, levels, schools, concentration, ritual, where=where
+        )
+        if text is not None:
+            rows = self._ranked(text, mask)
+            if distinct:
+                rows = table.distinct(rows)
+            mask, count, first = table.mask(rows), len(rows), rows[:samples]
+        elif distinct and mask & table.duplicate_bits:
+            rows = table.distinct(table.rows(mask))
+            mask, count, first = table.mask(rows), len(rows), rows[:samples]
+        else:
+            count, first = mask.bit_count(), table.rows(mask, samples)
+        return {
+            "count": count,
+            "facets": table.facet_counts if mask == table.all else table.facets(mask),
+            "samples": [spell.get("name", "") for spell in self._by_row(first)],
+        }
+
+    @property
+    def table(self) -> SpellTable:
+        """The columnar filter table, loaded on first use.
+
+        Prefers the snapshot next to the catalog and rebuilds it from the
+        catalog (rewriting the snapshot) when it is missing or stale.
+        """
+        with self.lock:
+            if self._table is None:
+                (fingerprint,) = self.conn.execute(
+                    "SELECT value FROM meta WHERE key = 'source'"
+                ).fetchone()
+                path = self.path.with_suffix(".snapshot")
+                self._table = SpellTable.load(path, fingerprint)
+                if self._table is None:
+                    self._table = SpellTable.from_connection(self.conn)
+                    self._table.save(path, fingerprint)
+            return self._table
+
+    def _select(self, *filters, where: Optional[str] = None) -> int:
+        """Return the bitmap of `SpellTable.select(*filters)` narrowed by `where`."""
+        mask = self.table.select(*filters)
+        if where:
+            mask &= compile_filter(where)(self.table)
+        return mask
+
+    def _by_row(self, rows: list[int]) -> list[Mapping]:
+        """Return the records for table rows, reading only the undecoded ones."""
+        keys = [self.table.idx[row] for row in rows]
+        with self.lock:
+            missing = [idx for idx in keys if idx not in self._records]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                for idx, data in self.conn.execute(
+                    f"SELECT idx, data FROM spells WHERE idx IN ({marks})", chunk
+                ):
+                    self._record(idx, data)
+            return [self._records[idx] for idx in keys]
+
+    def _ranked(self, text: str, mask: int) -> list[int]:
+        """Return the rows matching `text` and `mask`, best BM25 match first."""
+        table = self.table
+        with self.lock:
+            scores = search(self.conn, text)
+        if mask != table.all:
+            allowed = table.positions(mask)
+            scores = {p: s for p, s in scores.items() if p in allowed}
+        ranked = sorted(scores, key=lambda p: (-scores[p], p))
+        return [table.row(p) for p in ranked]
+
+
+def _stored_fingerprint(target: Path) -> Optional[str]:
+    if not target.exists():
+        return None
+    try:
+        conn = sqlite3.connect(target)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+_catalogs: dict = {}
+_catalogs_lock = threading.Lock()
+
+
+def load_catalog(source: Path) -> Optional[SpellCatalog]:
+    """Return the process-wide catalog for a spells cache.
+
+    The same instance (and its decoded records) is reused until the
+    source file changes on disk. Returns None if the cache is missing.
+    Callers must not close the returned catalog.
+    """
+    found = cached_file(source)
+    if found is None:
+        return None
+    key = str(source.resolve())
+    fingerprint = _fingerprint(found)
+    with _catalogs_lock:
+        cached = _catalogs.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+        # A replaced catalog is left for the GC so callers still holding
+        # it keep working
+        catalog = SpellCatalog.open(source)
+        _catalogs[key] = (fingerprint, catalog)
+    return catalog
+
+
+def clear_catalogs() -> None:
+    """Close and forget every memoized catalog."""
+    with _catalogs_lock:
+        for _, catalog in _catalogs.values():
+            catalog.close()
+        _catalogs.clear()
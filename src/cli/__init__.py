@@ -7,6 +7,7 @@ from src.utils.console import banner, info
 from .fetch import fetch_app
 from .deck import deck_app
 from .prompt import prompt_app
+from .catalog import catalog_app
 from .utils.docs import generate_cli_docs
 
 __version__ = "0.2.0"
@@ -27,6 +28,7 @@ app = typer.Typer(
 app.add_typer(fetch_app, name="fetch")
 app.add_typer(deck_app, name="deck")
 app.add_typer(prompt_app, name="prompt")
+app.add_typer(catalog_app, name="catalog")
 
 
 @app.callback(invoke_without_command=True)
@@ -90,9 +92,14 @@ def help_cmd(
     info("  dmforge docs-cli")
     info("  dmforge fetch srd")
     info("  dmforge deck build")
+    info("  dmforge deck compose")
     info("  dmforge deck render")
     info("  dmforge deck art")
     info("  dmforge prompt show")
+    info("  dmforge catalog facets")
+    info("  dmforge catalog merge")
+    info("  dmforge catalog duplicates")
+    info("  dmforge catalog related")
     info("\n📄 Developer Docs:")
     info("  - dev-log.md")
     info("  - docs/cli_reference.md")
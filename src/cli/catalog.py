@@ -0,0 +1,169 @@
+# src/cli/catalog.py
+
+import time
+from collections import Counter
+from typing import Optional
+
+import typer
+from rich.table import Table
+
+from src.catalog.merge import CONFIG_NAME, merge_catalog
+from src.deck_forge.generate import open_spell_catalog, preview_spell_deck
+from src.utils.console import banner, console, error, info, success, warn
+from src.utils.paths import get_data_path
+from src.utils.storage import read_json
+
+catalog_app = typer.Typer(name="catalog", help="Inspect the cached spell catalog.")
+
+FACET_LABELS = {"class": "Class", "level": "Level", "school": "School"}
+
+
+def show_preview(preview: dict, limit: Optional[int] = None) -> None:
+    """Print a catalog preview: match count, facet breakdown and sample names."""
+    count = preview["count"]
+    if not count:
+        warn("No matching spells found.")
+        return
+    selected = min(count, limit) if limit else count
+    info(f"{count} matching spell(s); a deck would include {selected}.")
+
+    table = Table("facet", "value", "spells")
+    for facet, label in FACET_LABELS.items():
+        for value, matches in preview["facets"][facet].items():
+            table.add_row(label, "?" if value is None else str(value), str(matches))
+    concentration = preview["facets"]["concentration"]
+    table.add_row("Concentration", "yes", str(concentration[True]))
+    table.add_row("Concentration", "no", str(concentration[False]))
+    console.print(table)
+    if preview["samples"]:
+        info("e.g. " + ", ".join(preview["samples"]))
+
+
+@catalog_app.command("facets", help="Count spells per facet for a set of filters.")
+def facets(
+    class_filter: Optional[str] = typer.Option(
+        None, "--class", help="Comma-separated class filter (e.g. wizard,cleric)."
+    ),
+    level_filter: Optional[str] = typer.Option(
+        None, "--level", help="Comma-separated spell level(s) (e.g. 1,2,3)."
+    ),
+    school_filter: Optional[str] = typer.Option(
+        None, "--school", help="Comma-separated spell school(s)."
+    ),
+    concentration: Optional[bool] = typer.Option(
+        None,
+        "--concentration/--no-concentration",
+        help="Only spells that do (or do not) need concentration.",
+    ),
+    ritual: Optional[bool] = typer.Option(
+        None, "--ritual/--no-ritual", help="Only ritual (or non-ritual) spells."
+    ),
+    query: Optional[str] = typer.Option(
+        None, "--query", "-q", help="Full-text search over names and descriptions."
+    ),
+    where: Optional[str] = typer.Option(
+        None, "--where", "-w", help='Filter expression (e.g. "level<=3 and ritual").'
+    ),
+    samples: int = typer.Option(5, "--samples", help="Number of sample names."),
+):
+    """Preview how many spells match, broken down by class, level and school."""
+    banner("🔎 Spell Catalog Facets")
+    preview = preview_spell_deck(
+        class_filter=class_filter,
+        level_filter=level_filter,
+        school_filter=school_filter,
+        query=query,
+        concentration=concentration,
+        ritual=ritual,
+        samples=samples,
+        where=where,
+    )
+    if preview is None:
+        raise typer.Exit(1)
+    show_preview(preview)
+
+
+@catalog_app.command("merge", help="Merge the spell sources listed in sources.json.")
+def merge(
+    force: bool = typer.Option(
+        False, "--force", help="Merge even if no input changed since the last merge."
+    ),
+):
+    """Combine SRD, homebrew and 5etools spells into one deduplicated catalog."""
+    banner("🧬 Merging Spell Sources")
+    config_path = get_data_path(CONFIG_NAME)
+    if not config_path.exists():
+        error(f"❌ No {CONFIG_NAME} found at {config_path}")
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
+    try:
+        merged = merge_catalog(config_path, force=force)
+    except ValueError as e:
+        error(f"❌ {e}")
+        raise typer.Exit(1)
+    elapsed = time.perf_counter() - start
+
+    spells = read_json(merged)
+    table = Table("source", "fields won")
+    for source, fields in Counter(
+        source for spell in spells for source in spell["provenance"].values()
+    ).most_common():
+        table.add_row(source, str(fields))
+    console.print(table)
+    success(f"✅ {len(spells)} spell(s) in {merged} ({elapsed:.2f}s)")
+
+
+@catalog_app.command(
+    "duplicates", help="List spells whose descriptions are near-duplicates."
+)
+def duplicates():
+    """Show the near-duplicate clusters found when the catalog was built."""
+    banner("👯 Near-Duplicate Spells")
+    catalog = open_spell_catalog()
+    if catalog is None:
+        raise typer.Exit(1)
+    clusters = catalog.duplicates()
+    if not clusters:
+        success("✅ No near-duplicate spells found.")
+        return
+
+    table = Table("kept", "near-duplicates")
+    for kept, *dropped in clusters:
+        table.add_row(
+            kept.get("name", ""), ", ".join(spell.get("name", "") for spell in dropped)
+        )
+    console.print(table)
+    info(
+        f"{len(clusters)} cluster(s); deck build keeps only the first spell of each "
+        "unless --keep-duplicates is given."
+    )
+
+
+@catalog_app.command("related", help="Show the spells most similar to a spell.")
+def related(
+    identifier: str = typer.Argument(..., help="Spell index or name"),
+    count: int = typer.Option(5, "--count", "-n", help="Number of related spells."),
+):
+    """List a spell's precomputed nearest neighbours by description."""
+    banner("✨ Related Spells")
+    catalog = open_spell_catalog()
+    if catalog is None:
+        raise typer.Exit(1)
+    spell = catalog.get(identifier)
+    if spell is None:
+        error("❌ No spell found")
+        raise typer.Exit(1)
+
+    neighbours = catalog.related(identifier, count)
+    if not neighbours:
+        warn(f"No spells similar to {spell.get('name', identifier)} found.")
+        return
+    table = Table("spell", "level", "school")
+    for other in neighbours:
+        table.add_row(
+            other.get("name", ""),
+            str(other.get("level", "")),
+            str(other.get("school") or ""),
+        )
+    console.print(table)
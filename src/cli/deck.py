@@ -1,17 +1,74 @@
 import json
 from pathlib import Path
 import typer
-from typing import Optional
+from typing import List, Optional
 from src.deck_forge.art import generate_art_for_deck
-from src.deck_forge.generate import generate_spell_deck
+from src.cli.catalog import show_preview
+from src.deck_forge.generate import (
+    compose_spell_deck,
+    generate_spell_deck,
+    preview_spell_deck,
+)
 from src.deck_forge.render_pdf import render_card_pdf, render_card_sheet_pdf
 from src.deck_forge.render_html import render_card_html
 from src.cli.utils.deck_utils import load_deck, summarize_cards
-from src.utils.console import banner, error, success
-from src.utils.summarizer import MAX_CHAR_COUNT
+from src.utils.console import banner, error, info, success
+from src.utils.http import get_stats
+from src.utils.summarizer import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RPM,
+    DEFAULT_TPM,
+    MAX_CHAR_COUNT,
+    OPENAI_HOST,
+    configure_budget,
+)
+from src.utils.summary_cache import get_summary_cache
 
 deck_app = typer.Typer(name="deck", help="Create, render, and enrich spell card decks.")
 
+# Summarization budget options shared by every command that summarizes
+CONCURRENCY_OPTION = typer.Option(
+    DEFAULT_CONCURRENCY,
+    "--concurrency",
+    "-j",
+    min=1,
+    help="Maximum number of summary requests in flight.",
+)
+RPM_OPTION = typer.Option(
+    DEFAULT_RPM, "--rpm", min=1, help="Summary requests allowed per minute."
+)
+TPM_OPTION = typer.Option(
+    DEFAULT_TPM, "--tpm", min=1, help="Summary tokens allowed per minute."
+)
+BATCH_SIZE_OPTION = typer.Option(
+    DEFAULT_BATCH_SIZE,
+    "--batch-size",
+    min=1,
+    help="Descriptions summarized per request (1 sends each on its own).",
+)
+
+
+def apply_summary_budget(concurrency: int, rpm: int, tpm: int, batch_size: int):
+    """Apply the summarization budget options before a command summarizes."""
+    configure_budget(concurrency=concurrency, rpm=rpm, tpm=tpm, batch_size=batch_size)
+
+
+def report_summary_cache() -> None:
+    """Print how many summaries came from the cache and how many requests ran."""
+    cache = get_summary_cache()
+    if cache is not None and cache.hits + cache.misses:
+        info(
+            f"🗃 Summary cache: {cache.hits} hit(s), {cache.misses} miss(es), "
+            f"{len(cache)} stored"
+        )
+    stats = get_stats(OPENAI_HOST)
+    if stats["requests"]:
+        info(
+            f"🌐 Summary requests: {stats['requests']} "
+            f"({stats['retries']} retries, {stats['failures']} failed)"
+        )
+
 
 @deck_app.command(
     "build", help="Generate a spell deck from the SRD with optional filters."
@@ -38,14 +95,55 @@ def build(
     school_filter: Optional[str] = typer.Option(
         None, "--school", help="Comma-separated spell school(s)."
     ),
+    where: Optional[str] = typer.Option(
+        None,
+        "--where",
+        "-w",
+        help='Filter expression (e.g. "level<=3 and not concentration and components!~M").',
+    ),
     interactive: bool = typer.Option(
         False,
         "--interactive",
         help="Select specific spells interactively after filtering.",
     ),
+    query: Optional[str] = typer.Option(
+        None,
+        "--query",
+        "-q",
+        help='Full-text search over names and descriptions (e.g. "fire damage cone").',
+    ),
+    keep_duplicates: bool = typer.Option(
+        False,
+        "--keep-duplicates",
+        help="Keep near-duplicate spells (e.g. reworded homebrew copies).",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="Only report how many spells match (per class, level and school).",
+    ),
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    batch_size: int = BATCH_SIZE_OPTION,
 ):
     """Generate a spell card deck from SRD spell data with optional filtering and summarization."""
     banner("🧱 Generating Spell Card Deck")
+    apply_summary_budget(concurrency, rpm, tpm, batch_size)
+    if dry_run:
+        preview = preview_spell_deck(
+            class_filter=class_filter,
+            level_filter=level_filter,
+            school_filter=school_filter,
+            query=query,
+            where=where,
+            distinct=not keep_duplicates,
+        )
+        if preview is None:
+            raise typer.Exit(1)
+        show_preview(preview, limit)
+        return
+
     deck_path_str = generate_spell_deck(
         output_name=output,
         limit=limit,
@@ -53,6 +151,9 @@ def build(
         level_filter=level_filter,
         school_filter=school_filter,
         interactive=interactive,
+        query=query,
+        distinct=not keep_duplicates,
+        where=where,
     )
     if not deck_path_str:
         error("❌ Deck generation failed.")
@@ -72,9 +173,74 @@ def build(
             error(f"❌ Failed to summarize descriptions: {e}")
             raise typer.Exit(1)
 
+    report_summary_cache()
     success(f"✅ Deck saved to {deck_path.resolve()}")
 
 
+@deck_app.command(
+    "compose", help="Compose a balanced deck from quotas and constraints."
+)
+def compose(
+    output: str = typer.Option(
+        "deck.json", "--output", help="Output filename for the deck."
+    ),
+    quota: Optional[List[str]] = typer.Option(
+        None,
+        "--quota",
+        help='Exactly COUNT spells matching a filter (e.g. "4:level=0"). Repeatable.',
+    ),
+    at_least: Optional[List[str]] = typer.Option(
+        None,
+        "--at-least",
+        help='At least COUNT spells matching a filter (e.g. "1:ritual"). Repeatable.',
+    ),
+    at_most: Optional[List[str]] = typer.Option(
+        None,
+        "--at-most",
+        help='At most COUNT spells matching a filter (e.g. "2:concentration").',
+    ),
+    each: Optional[List[str]] = typer.Option(
+        None,
+        "--each",
+        help='At least COUNT spells per class, school or level (e.g. "1:school").',
+    ),
+    size: Optional[int] = typer.Option(
+        None, "--size", "-n", help="Deck size (default: the sum of the quotas)."
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for choosing between spells."),
+    where: Optional[str] = typer.Option(
+        None, "--where", "-w", help="Filter expression limiting the spell pool."
+    ),
+    keep_duplicates: bool = typer.Option(
+        False,
+        "--keep-duplicates",
+        help="Keep near-duplicate spells (e.g. reworded homebrew copies).",
+    ),
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    batch_size: int = BATCH_SIZE_OPTION,
+):
+    """Pick spells that satisfy every quota and constraint, deterministically per seed."""
+    banner("⚖️ Composing Spell Card Deck")
+    apply_summary_budget(concurrency, rpm, tpm, batch_size)
+    deck_path = compose_spell_deck(
+        output_name=output,
+        quotas=quota or [],
+        at_least=at_least or [],
+        at_most=at_most or [],
+        each=each or [],
+        size=size,
+        seed=seed,
+        where=where,
+        distinct=not keep_duplicates,
+    )
+    if not deck_path:
+        raise typer.Exit(1)
+    report_summary_cache()
+    success(f"✅ Deck saved to {Path(deck_path).resolve()}")
+
+
 @deck_app.command("render", help="Render a deck to PDF or HTML.")
 def render(
     deck_file: Path = typer.Argument(..., help="Deck JSON file to render."),
@@ -91,9 +257,14 @@ def render(
     summary_length: int = typer.Option(
         MAX_CHAR_COUNT, "--summary-length", help="Max summary length."
     ),
+    concurrency: int = CONCURRENCY_OPTION,
+    rpm: int = RPM_OPTION,
+    tpm: int = TPM_OPTION,
+    batch_size: int = BATCH_SIZE_OPTION,
 ):
     """Render spell cards to a printable PDF or interactive HTML page."""
     banner("🎨 Rendering Deck")
+    apply_summary_budget(concurrency, rpm, tpm, batch_size)
     if not deck_file.exists():
         error(f"❌ Deck not found: {deck_file}")
         raise typer.Exit(1)
@@ -109,6 +280,7 @@ def render(
             )
             to_render = temp_file
             success(f"🔖 Using summarized deck (≤{summary_length} chars)")
+            report_summary_cache()
         except Exception as e:
             error(f"❌ Failed to summarize before rendering: {e}")
             raise typer.Exit(1)
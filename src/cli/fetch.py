@@ -1,9 +1,21 @@
 """Data fetching commands for D&D 5e content."""
 
 import typer
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+from rich.progress import MofNCompleteColumn, Progress
 from typer import Option
-from src.fetch.srd import fetch_srd_spells, fetch_srd_traits, fetch_srd_features
-from src.utils.console import banner, error, success
+from src.fetch.fivetools import DEFAULT_SOURCE, import_local, resolve_source_path
+from src.fetch.srd import (
+    TRANSPORTS,
+    fetch_srd_spells,
+    fetch_srd_traits,
+    fetch_srd_features,
+)
+from src.utils import http_cache
+from src.utils.http import DEFAULT_CONCURRENCY, format_stats, shared_budget
+from src.utils.console import banner, console, error, info, success
 
 fetch_app = typer.Typer(name="fetch", help="Data fetching commands")
 
@@ -15,26 +27,133 @@ def fetch_srd(
     features: bool = Option(False, "--features", help="Fetch class features"),
     all_data: bool = Option(False, "--all", help="Fetch all available SRD content"),
     force: bool = Option(False, "--force", help="Force re-download and overwrite"),
+    sync: bool = Option(
+        False,
+        "--sync",
+        help="Revalidate the cache with conditional requests; rewrite only changes",
+    ),
+    concurrency: int = Option(
+        DEFAULT_CONCURRENCY,
+        "--concurrency",
+        "-j",
+        min=1,
+        help="Maximum number of detail requests in flight",
+    ),
+    transport: str = Option(
+        "rest",
+        "--transport",
+        help="Transport: rest (index + detail calls) or graphql (paged queries)",
+    ),
+    cache: Optional[str] = Option(
+        None,
+        "--cache",
+        help="HTTP response cache: off, record or replay (default: $DMFORGE_HTTP_CACHE)",
+    ),
+    compress: bool = Option(
+        False, "--compress", help="Store caches Brotli-compressed (*.json.br)"
+    ),
 ) -> None:
     """Download and cache SRD data from dnd5eapi.co."""
     if not (spells or traits or features or all_data):
         error("No data type selected. Use --spells, --traits, --features, or --all.")
         return
 
-    banner("📥 Fetching SRD Content")
+    if transport not in TRANSPORTS:
+        error(f"Unknown transport '{transport}'. Use rest or graphql.")
+        raise typer.Exit(1)
 
     try:
-        if all_data or spells:
-            fetch_srd_spells(force=force)
+        http_cache.configure(cache, refresh=force)
+    except ValueError as e:
+        error(str(e))
+        raise typer.Exit(1)
+
+    banner("📥 Fetching SRD Content")
 
-        if all_data or traits:
-            fetch_srd_traits(force=force)
+    # Collections are independent, so they run side by side; the shared
+    # budget keeps the total number of requests in flight at --concurrency.
+    selected = [
+        fetcher
+        for fetcher, wanted in (
+            (fetch_srd_spells, spells),
+            (fetch_srd_traits, traits),
+            (fetch_srd_features, features),
+        )
+        if all_data or wanted
+    ]
 
-        if all_data or features:
-            fetch_srd_features(force=force)
+    try:
+        with shared_budget(concurrency), Progress(
+            *Progress.get_default_columns(), MofNCompleteColumn(), console=console
+        ) as progress, ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            futures = [
+                pool.submit(
+                    fetcher,
+                    force=force,
+                    sync=sync,
+                    concurrency=concurrency,
+                    transport=transport,
+                    progress=progress,
+                    compress=compress,
+                )
+                for fetcher in selected
+            ]
+            for future in futures:
+                future.result()
 
         success("✅ All requested content downloaded")
+        info(f"🌐 HTTP: {format_stats()}")
 
     except Exception as e:
         error(f"Failed to fetch content: {str(e)}")
         raise  # Re-raise to show full traceback in debug mode
+
+
+@fetch_app.command("local")
+def fetch_local(
+    spells: bool = Option(False, "--spells", help="Import spells"),
+    traits: bool = Option(False, "--traits", help="Import racial traits"),
+    features: bool = Option(False, "--features", help="Import class features"),
+    all_data: bool = Option(False, "--all", help="Import all supported content"),
+    source: str = Option(
+        DEFAULT_SOURCE, "--source", help="Source name from config/srd5e.json"
+    ),
+    path: Optional[Path] = Option(
+        None, "--path", help="Mirror data folder (overrides --source)"
+    ),
+    force: bool = Option(False, "--force", help="Overwrite existing caches"),
+    workers: Optional[int] = Option(
+        None, "--workers", "-w", min=1, help="Parser processes (default: CPU count)"
+    ),
+    compress: bool = Option(
+        False, "--compress", help="Store caches Brotli-compressed (*.json.br)"
+    ),
+) -> None:
+    """Import SRD data from a local 5etools mirror without any network calls."""
+    if not (spells or traits or features or all_data):
+        error("No data type selected. Use --spells, --traits, --features, or --all.")
+        return
+
+    banner("📂 Importing Local Content")
+
+    try:
+        data_dir = path or resolve_source_path(source)
+    except (OSError, ValueError) as e:
+        error(f"Failed to resolve source: {e}")
+        raise typer.Exit(1)
+
+    for kind, selected in (
+        ("spells", spells),
+        ("traits", traits),
+        ("features", features),
+    ):
+        if all_data or selected:
+            import_local(
+                kind,
+                data_dir=data_dir,
+                force=force,
+                workers=workers,
+                compress=compress,
+            )
+
+    success("✅ All requested content imported")
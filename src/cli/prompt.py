@@ -1,8 +1,9 @@
 # src/cli/prompt.py
 
 import typer
-import json
 from src.utils.paths import get_data_path
+from src.catalog.merge import catalog_source
+from src.catalog.spells import load_catalog
 from src.utils.console import banner, error
 from src.prompts.spells import generate_spell_prompt
 
@@ -18,20 +19,12 @@ def show(
     banner("🎨 Generating Spell Prompt")
 
     input_file = get_data_path("spells.json")
-    if not input_file.exists():
+    catalog = load_catalog(catalog_source(input_file))
+    if catalog is None:
         error(f"❌ Missing SRD data: {input_file}")
         raise typer.Exit(1)
 
-    spells = json.loads(input_file.read_text(encoding="utf-8"))
-    spell = next(
-        (
-            s
-            for s in spells
-            if s.get("index") == identifier
-            or s.get("name", "").lower() == identifier.lower()
-        ),
-        None,
-    )
+    spell = catalog.get(identifier)
     if not spell:
         error("❌ No spell found")
         raise typer.Exit(1)
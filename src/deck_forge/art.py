@@ -1,15 +1,19 @@
 import os
-import json
 import requests
 import sys
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
 from typing import Optional
-from src.utils.console import banner, success
+from urllib.parse import urlsplit
+from src.utils.console import banner, info, success
+from src.utils.http import format_stats, send
+from src.utils.json_stream import deck_format, iter_cards, write_cards
 from src.utils.formatting import spell_effect_snippet
 from src.utils.prompt_utils import build_spell_prompt
 
 API_URL = "https://api.openai.com/v1/images/generations"
+API_HOST = "api.openai.com"
 MODEL = "dall-e-3"
 DEFAULT_SIZE = "1024x1024"
 
@@ -34,50 +38,79 @@ def generate_art_for_deck(
         print("❌ OPENAI_API_KEY not set.", file=sys.stderr)
         return
 
-    raw = json.loads(deck_path.read_text(encoding="utf-8"))
-    cards = (
-        raw.get("cards")
-        if isinstance(raw, dict)
-        else raw if isinstance(raw, list) else []
-    )
-
-    if not cards:
+    fmt = deck_format(deck_path)
+    cards = iter_cards(deck_path) if fmt else iter([])
+    first = next(cards, None)
+    if first is None:
         print("❌ No cards found in deck.", file=sys.stderr)
         return
 
     art_dir.mkdir(parents=True, exist_ok=True)
 
-    for card in cards:
-        title = card["title"]
-        filename = f"{title.replace(' ', '_')}_{version}.png"
-        out_path = art_dir / filename
+    # Cards are read, illustrated and written back one at a time; the
+    # deck is swapped in atomically once the last card is done
+    def illustrated():
+        for card in chain([first], cards):
+            _add_card_art(
+                card,
+                art_dir,
+                api_key,
+                size,
+                n_per_card,
+                prompt_suffix,
+                character_style,
+                version,
+            )
+            yield card
 
-        # 1)  Create a short, cinematic effect phrase from the raw SRD text
-        effect = spell_effect_snippet(card.get("description", ""))
+    write_cards(deck_path, illustrated(), fmt)
+    success(f"✅ All art generated and deck updated at {deck_path}")
+    info(f"🌐 HTTP: {format_stats()}")
 
-        # 2)  Build the final prompt with optional style / suffix
-        prompt = build_spell_prompt(
-            title=title,
-            description=effect,
-            character_style=character_style,
-            prompt_suffix=prompt_suffix,
-        )
 
-        if out_path.exists():
-            print(f"⏭️ Skipping existing: {filename}", file=sys.stderr)
-            # IMPORTANT CHANGE: Make sure we're recording the versioned path even for skipped images
-            relative_path = (Path("assets/art") / filename).as_posix()
-            art_info = {
-                "tag": version,
-                "path": relative_path,
-                "prompt": prompt,
-            }
-            card.setdefault("art_versions", []).append(art_info)
-            card["art_url"] = relative_path  # Use versioned path
-            continue
-
-        try:
-            response = requests.post(
+def _add_card_art(
+    card: dict,
+    art_dir: Path,
+    api_key: str,
+    size: str,
+    n_per_card: int,
+    prompt_suffix: Optional[str],
+    character_style: Optional[str],
+    version: str,
+) -> None:
+    """Generate (or reuse) one card's image and record it on the card."""
+    title = card["title"]
+    filename = f"{title.replace(' ', '_')}_{version}.png"
+    out_path = art_dir / filename
+
+    # 1)  Create a short, cinematic effect phrase from the raw SRD text
+    effect = spell_effect_snippet(card.get("description", ""))
+
+    # 2)  Build the final prompt with optional style / suffix
+    prompt = build_spell_prompt(
+        title=title,
+        description=effect,
+        character_style=character_style,
+        prompt_suffix=prompt_suffix,
+    )
+
+    if out_path.exists():
+        print(f"⏭️ Skipping existing: {filename}", file=sys.stderr)
+        # IMPORTANT CHANGE: Make sure we're recording the versioned path even for skipped images
+        relative_path = (Path("assets/art") / filename).as_posix()
+        art_info = {
+            "tag": version,
+            "path": relative_path,
+            "prompt": prompt,
+        }
+        card.setdefault("art_versions", []).append(art_info)
+        card["art_url"] = relative_path  # Use versioned path
+        return
+
+    try:
+        response = send(
+            API_HOST,
+            lambda: requests.post(
                 API_URL,
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -90,39 +123,37 @@ def generate_art_for_deck(
                     "size": size,
                 },
                 timeout=60,
-            )
+            ),
+        )
 
-            if response.status_code != 200:
-                print(f"❌ Failed to generate art for {title}", file=sys.stderr)
-                print(f"   → Status: {response.status_code}", file=sys.stderr)
-                print(f"   → Error: {response.text}", file=sys.stderr)
-                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-                debug_path = (
-                    art_dir / f"{title.replace(' ', '_')}_error_{timestamp}.json"
-                )
-                debug_path.write_text(response.text, encoding="utf-8")
-                continue
-
-            image_url = response.json()["data"][0]["url"]
-            img_bytes = requests.get(image_url).content
-            out_path.write_bytes(img_bytes)
-
-            relative_path = (Path("assets/art") / filename).as_posix()
-            art_info = {
-                "tag": version,
-                "path": relative_path,
-                "prompt": prompt,
-            }
-
-            card.setdefault("art_versions", []).append(art_info)
-            card["art_url"] = relative_path  # default image path
-
-            print(f"✅ Updating art_url for {title}: {relative_path}")
-            success(f"→ {title}: image saved to {filename}")
-
-        except Exception as e:
-            print(f"❌ {title}: Exception while generating art: {e}", file=sys.stderr)
-
-    updated = {"cards": cards} if isinstance(raw, dict) else cards
-    deck_path.write_text(json.dumps(updated, indent=2), encoding="utf-8")
-    success(f"✅ All art generated and deck updated at {deck_path}")
+        if response.status_code != 200:
+            print(f"❌ Failed to generate art for {title}", file=sys.stderr)
+            print(f"   → Status: {response.status_code}", file=sys.stderr)
+            print(f"   → Error: {response.text}", file=sys.stderr)
+            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            debug_path = art_dir / f"{title.replace(' ', '_')}_error_{timestamp}.json"
+            debug_path.write_text(response.text, encoding="utf-8")
+            return
+
+        # Image URLs are one-time signed links, so the download isn't cached
+        image_url = response.json()["data"][0]["url"]
+        img_bytes = send(
+            urlsplit(image_url).netloc, lambda: requests.get(image_url, timeout=60)
+        ).content
+        out_path.write_bytes(img_bytes)
+
+        relative_path = (Path("assets/art") / filename).as_posix()
+        art_info = {
+            "tag": version,
+            "path": relative_path,
+            "prompt": prompt,
+        }
+
+        card.setdefault("art_versions", []).append(art_info)
+        card["art_url"] = relative_path  # default image path
+
+        print(f"✅ Updating art_url for {title}: {relative_path}")
+        success(f"→ {title}: image saved to {filename}")
+
+    except Exception as e:
+        print(f"❌ {title}: Exception while generating art: {e}", file=sys.stderr)
@@ -5,19 +5,109 @@
 import json
 import typer
 from pathlib import Path
+from typing import Optional
+from src.catalog.merge import CONFIG_NAME, catalog_source
+from src.catalog.spells import SpellCatalog, load_catalog
 from src.utils.paths import get_data_path
 from src.utils.console import success, error
 from src.deck_forge.schema import spell_to_card
+from src.utils.summarizer import summarize_many
 from src.utils.env import get_env  # noqa: F401
 
 
-def fetch_srd_spells():
-    """Load SRD spells from JSON file."""
+def open_spell_catalog() -> Optional[SpellCatalog]:
+    """Open the indexed catalog for the cached spells, or report it missing.
+
+    With a sources.json next to spells.json, this is the merged catalog.
+    Returns None if the cache is missing or sources.json is invalid.
+    """
     path = get_data_path("spells.json")
-    if not path.exists():
+    try:
+        source = catalog_source(path)
+    except ValueError as e:
+        error(f"❌ Invalid {CONFIG_NAME}: {e}")
+        return None
+    catalog = load_catalog(source)
+    if catalog is None:
         error(f"❌ spells.json not found at {path}")
+    return catalog
+
+
+def fetch_srd_spells():
+    """Load SRD spells from the catalog."""
+    catalog = open_spell_catalog()
+    if catalog is None:
         return []
-    return json.loads(path.read_text(encoding="utf-8"))
+    return catalog.all()
+
+
+def _split(value: Optional[str]) -> list[str]:
+    return [part.strip() for part in value.split(",")] if value else []
+
+
+def parse_filters(class_filter=None, level_filter=None, school_filter=None) -> dict:
+    """Turn comma-separated CLI filters into `SpellCatalog.query` arguments."""
+    return {
+        "classes": _split(class_filter),
+        "levels": [int(level) for level in _split(level_filter)],
+        "schools": _split(school_filter),
+    }
+
+
+def preview_spell_deck(
+    class_filter=None,
+    level_filter=None,
+    school_filter=None,
+    query=None,
+    concentration=None,
+    ritual=None,
+    samples=5,
+    where=None,
+    distinct=False,
+) -> Optional[dict]:
+    """Report what `generate_spell_deck` would select, without building cards.
+
+    Returns the catalog preview (match count, facet counts and sample
+    names), or None if the spell cache is missing or `where` is invalid.
+    """
+    catalog = open_spell_catalog()
+    if catalog is None:
+        return None
+    try:
+        return catalog.preview(
+            **parse_filters(class_filter, level_filter, school_filter),
+            concentration=concentration,
+            ritual=ritual,
+            text=query,
+            samples=samples,
+            distinct=distinct,
+            where=where,
+        )
+    except ValueError as e:
+        error(f"❌ Invalid filter: {e}")
+        return None
+
+
+def related_suggestions(catalog: SpellCatalog, chosen, per_spell=3, limit=10):
+    """Return spells related to the chosen ones that are not chosen yet.
+
+    Takes the top `per_spell` neighbours of each chosen spell in turn, so
+    every pick contributes, and stops at `limit` suggestions.
+    """
+
+    def key(spell):
+        return spell.get("index") or spell.get("name")
+
+    seen = {key(spell) for spell in chosen}
+    suggestions = []
+    for spell in chosen:
+        for other in catalog.related(key(spell), per_spell):
+            if key(other) not in seen:
+                seen.add(key(other))
+                suggestions.append(other)
+                if len(suggestions) >= limit:
+                    return suggestions
+    return suggestions
 
 
 def generate_spell_deck(
@@ -27,44 +117,42 @@ def generate_spell_deck(
     level_filter=None,
     school_filter=None,
     interactive=False,
+    query=None,
+    distinct=False,
+    where=None,
 ):
-    """Generate a full or filtered spell deck and save as a JSON file."""
-    spells = fetch_srd_spells()
-    if not spells:
+    """Generate a full or filtered spell deck and save as a JSON file.
+
+    With `query`, spells are matched against names and descriptions and
+    ordered by relevance. With `distinct`, only the first spell of each
+    group of near-duplicate descriptions is kept. `where` is a filter
+    expression such as "level<=3 and not concentration" (see
+    `src/catalog/filters.py`). With `interactive`, the
+    user picks from the matches and is then offered related spells (see
+    `related_suggestions`) to add.
+    """
+    catalog = open_spell_catalog()
+    if catalog is None:
         return None
 
-    class_set = (
-        {c.strip().lower() for c in class_filter.split(",")} if class_filter else set()
-    )
-    level_set = (
-        {int(level.strip()) for level in level_filter.split(",")}
-        if level_filter
-        else set()
-    )
-    school_set = (
-        {school.strip().lower() for school in school_filter.split(",")}
-        if school_filter
-        else set()
-    )
-
-    def matches_filters(spell):
-        spell_classes = [c.lower() for c in spell.get("classes", [])]
-        spell_level = spell.get("level")
-        spell_school = spell.get("school", "").lower()
-        return (
-            (not class_set or any(c in class_set for c in spell_classes))
-            and (not level_set or spell_level in level_set)
-            and (not school_set or spell_school in school_set)
+    if not len(catalog):
+        return None
+    try:
+        filtered = catalog.query(
+            **parse_filters(class_filter, level_filter, school_filter),
+            limit=limit,
+            text=query,
+            distinct=distinct,
+            where=where,
         )
+    except ValueError as e:
+        error(f"❌ Invalid filter: {e}")
+        return None
 
-    filtered = [s for s in spells if matches_filters(s)]
     if not filtered:
         error("❌ No matching spells found.")
         return None
 
-    if limit:
-        filtered = filtered[:limit]
-
     if interactive:
         typer.echo("📜 Available Spells (filtered):\n")
         for i, s in enumerate(filtered, 1):
@@ -84,11 +172,81 @@ def generate_spell_deck(
                 error(f"❌ Invalid input: {e}")
                 return None
 
+        suggestions = related_suggestions(catalog, filtered)
+        if suggestions:
+            typer.echo("\n✨ Related spells you might also want:\n")
+            for i, s in enumerate(suggestions, 1):
+                typer.echo(f"{i:2}. {s['name']} (Level {s['level']}, {s['school']})")
+            extra_input = typer.prompt(
+                "\nEnter the numbers of related spells to add (comma-separated), or leave blank to add none",
+                default="",
+                show_default=False,
+            ).strip()
+            if extra_input:
+                try:
+                    extra = {int(x.strip()) for x in extra_input.split(",")}
+                except ValueError as e:
+                    error(f"❌ Invalid input: {e}")
+                    return None
+                filtered += [s for i, s in enumerate(suggestions, 1) if i in extra]
+
+    return write_spell_deck(filtered, output_name)
+
+
+def compose_spell_deck(
+    output_name="deck.json",
+    quotas=(),
+    at_least=(),
+    at_most=(),
+    each=(),
+    size=None,
+    seed=0,
+    where=None,
+    distinct=False,
+):
+    """Compose a deck that meets quotas and constraints and save it as JSON.
+
+    Constraints are "COUNT:EXPRESSION" strings such as "4:level=0" or
+    "2:concentration"; see `SpellCatalog.compose`. Returns the deck path,
+    or None if the cache is missing or the constraints can't be met.
+    """
+    catalog = open_spell_catalog()
+    if catalog is None:
+        return None
+    try:
+        spells = catalog.compose(
+            quotas=quotas,
+            at_least=at_least,
+            at_most=at_most,
+            each=each,
+            size=size,
+            seed=seed,
+            where=where,
+            distinct=distinct,
+        )
+    except ValueError as e:
+        error(f"❌ Cannot compose deck: {e}")
+        return None
+    if not spells:
+        error("❌ No spells requested; give a --size or some quotas.")
+        return None
+    return write_spell_deck(spells, output_name)
+
+
+def write_spell_deck(spells, output_name="deck.json") -> Path:
+    """Convert spells to cards and write them as a deck file.
+
+    Long descriptions are summarized concurrently once every card is
+    built, rather than one request per card in turn.
+    """
     cards = []
-    for spell in filtered:
-        card = spell_to_card(spell)
+    for spell in spells:
+        card = spell_to_card(spell, summarize=False)
         if card:
             cards.append(card)
+    long = [card for card in cards if card.get("summary")]
+    for card, summary in zip(long, summarize_many(c["description"] for c in long)):
+        card["description"] = summary
 
     output_path = Path(output_name)
     output_path.parent.mkdir(parents=True, exist_ok=True)
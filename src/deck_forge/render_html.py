@@ -1,10 +1,10 @@
 import logging
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-import json
 import os
 import base64
 import mimetypes
+from src.utils.json_stream import has_items, iter_cards
 
 # ——— Logging setup —————————————————————————————————————————————————————
 logging.basicConfig(level=logging.INFO)
@@ -90,26 +90,20 @@ def render_card_html(deck_path: Path, output_path: Path, theme: str = "default")
         return
 
     try:
-        data = json.loads(deck_path.read_text(encoding="utf-8"))
-        if isinstance(data, dict):
-            if "cards" not in data:
-                logger.error("❌ 'cards' key missing in JSON file.")
-                return
-            cards = data["cards"]
-        elif isinstance(data, list):
-            cards = data
-        else:
+        if not has_items(deck_path):
             logger.error("❌ JSON root must be a dict with a 'cards' key or a list.")
             return
 
-        if not cards:
-            logger.warning("⚠️ No cards found in input.")
-        else:
-            logger.info(f"📦 Loaded {len(cards)} cards from {deck_path}")
+        loaded = 0
 
-        logger.info(f"Loaded {len(cards)} cards from {deck_path}")
-
-        _fix_image_paths(cards, PROJECT_ROOT, output_path.parent)
+        def cards():
+            # Fix each card's image as the template reaches it, so the page
+            # is written while the deck is still being read
+            nonlocal loaded
+            for card in iter_cards(deck_path):
+                _fix_image_paths([card], PROJECT_ROOT, output_path.parent)
+                loaded += 1
+                yield card
 
         # CSS
         css_file = PROJECT_ROOT / "assets" / "css" / f"{theme}.css"
@@ -124,14 +118,17 @@ def render_card_html(deck_path: Path, output_path: Path, theme: str = "default")
             autoescape=select_autoescape(["html", "jinja"]),
         )
         template = env.get_template("spell_card.jinja")
-        html = template.render(
-            cards=cards,
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        template.stream(
+            cards=cards(),
             css_path=css_path,
             default_image=PLACEHOLDER_DATA_URI,
-        )
+        ).dump(str(output_path), encoding="utf-8")
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(html, encoding="utf-8")
+        if not loaded:
+            logger.warning("⚠️ No cards found in input.")
+        else:
+            logger.info(f"📦 Loaded {loaded} cards from {deck_path}")
         logger.info(f"✅ HTML output saved to {output_path.resolve()}")
 
     except Exception as e:
@@ -1,9 +1,9 @@
 from pathlib import Path
-import json
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from weasyprint import HTML, CSS
 from src.utils.console import banner, success, error, warn
 from src.utils.formatting import abbreviate_duration
+from src.utils.json_stream import deck_format, iter_cards
 from src.deck_forge.render_html import PLACEHOLDER_DATA_URI
 
 # Directories
@@ -38,16 +38,13 @@ def resolve_image_path(path_str: str, base_dir: Path) -> str:
 
 
 def load_deck(deck_path: Path) -> list[dict]:
-    """Load JSON deck, supporting both list and dict formats."""
+    """Load a deck, supporting list, {"cards": [...]} and JSON Lines formats."""
     if not deck_path.exists():
         error(f"❌ Deck not found: {deck_path}")
         return []
-    data = json.loads(deck_path.read_text(encoding="utf-8"))
-    return (
-        data.get("cards")
-        if isinstance(data, dict)
-        else (data if isinstance(data, list) else [])
-    )
+    if not deck_format(deck_path):
+        return []
+    return list(iter_cards(deck_path))
 
 
 def get_css_path(theme: str) -> str:
@@ -1,18 +1,21 @@
 # src/deck_forge/schema.py
 
 import random
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional
 from src.utils.console import warn
 import src.utils.summarizer as summarizer
 from src.utils.summarizer import MAX_CHAR_COUNT
 
 
 def spell_to_card(
-    spell: Dict[str, Any], summarize: bool = True
+    spell: Mapping[str, Any], summarize: bool = True
 ) -> Optional[Dict[str, Any]]:
-    """Convert a raw spell dictionary to a card-ready format, summarizing if needed."""
+    """Convert a raw spell dictionary to a card-ready format, summarizing if needed.
+
+    Accepts plain dicts as well as the frozen records the catalog returns.
+    """
     try:
-        if not isinstance(spell, dict):
+        if not isinstance(spell, Mapping):
             return None
 
         # Required
@@ -22,7 +25,7 @@ def spell_to_card(
 
         full_desc = (
             " ".join(spell["desc"])
-            if isinstance(spell["desc"], list)
+            if isinstance(spell["desc"], (list, tuple))
             else str(spell["desc"])
         )
         was_summarized = len(full_desc) > MAX_CHAR_COUNT
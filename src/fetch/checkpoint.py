@@ -0,0 +1,46 @@
+# src/fetch/checkpoint.py
+
+"""JSONL checkpoints for resumable SRD downloads.
+
+Each fetched record is appended to `{collection}.partial.jsonl` as soon as
+it arrives, together with its manifest entry. If a run dies halfway, the
+next run reads the checkpoint, skips everything already fetched and picks
+up where the previous one stopped.
+"""
+
+import json
+from pathlib import Path
+from typing import IO, Iterator
+
+
+def checkpoint_path(output_file: Path) -> Path:
+    """Return the checkpoint path for a cached collection (spells.json → spells.partial.jsonl)."""
+    return output_file.with_name(f"{output_file.stem}.partial.jsonl")
+
+
+def read_checkpoint(path: Path) -> Iterator[dict]:
+    """Yield checkpoint entries one at a time, ignoring a torn final line."""
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write can leave a partial last line
+                continue
+
+
+def open_checkpoint(path: Path) -> IO[str]:
+    """Open a checkpoint for appending, creating parent folders if needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("a", encoding="utf-8")
+
+
+def append_checkpoint(handle: IO[str], entry: dict) -> None:
+    """Append one entry and flush it so it survives a crash."""
+    handle.write(json.dumps(entry) + "\n")
+    handle.flush()
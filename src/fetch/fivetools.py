@@ -0,0 +1,366 @@
+# src/fetch/fivetools.py
+
+"""Import spells, traits and features from a local 5etools data mirror.
+
+The mirror is declared as a source in config/srd5e.json. Files are parsed
+in parallel worker processes and converted into the same shapes the API
+fetchers cache, so the rest of DMForge can't tell where the data came from.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from src.catalog.spells import load_catalog
+from src.fetch.store import publish
+from src.utils.console import banner, success, warn, error
+from src.utils.paths import get_data_path
+from src.utils.storage import cached_file, compressed_path, write_json_array
+
+CONFIG_PATH = Path("config/srd5e.json")
+DEFAULT_SOURCE = "5etools-mirror"
+
+SCHOOLS = {
+    "A": "Abjuration",
+    "C": "Conjuration",
+    "D": "Divination",
+    "E": "Enchantment",
+    "V": "Evocation",
+    "I": "Illusion",
+    "N": "Necromancy",
+    "T": "Transmutation",
+}
+
+# Race entries that the API models as race fields rather than traits
+RACE_BASICS = {
+    "Age",
+    "Alignment",
+    "Size",
+    "Speed",
+    "Languages",
+    "Ability Score Increase",
+}
+
+_TAG_RE = re.compile(r"\{@\w+ ([^{}]*?)\}")
+
+
+def resolve_source_path(
+    name: str = DEFAULT_SOURCE, config_path: Path = CONFIG_PATH
+) -> Path:
+    """Return the data directory of a named source from config/srd5e.json.
+
+    Relative paths are resolved against the config file's folder.
+
+    Raises:
+        ValueError: If the config has no source with that name
+    """
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    for source in config.get("sources", []):
+        if source.get("name") == name:
+            return (config_path.parent / source["path"]).resolve()
+    raise ValueError(f"No source named '{name}' in {config_path}")
+
+
+def slugify(name: str) -> str:
+    """Build an API-style index from a name ("Hunter's Mark" → "hunters-mark")."""
+    slug = name.lower().replace("'", "").replace("’", "")
+    return re.sub(r"[^a-z0-9]+", "-", slug).strip("-")
+
+
+def strip_tags(text: str) -> str:
+    """Replace 5etools inline tags like {@damage 8d6} with their display text."""
+    while True:
+        stripped = _TAG_RE.sub(lambda m: m.group(1).split("|")[0], text)
+        if stripped == text:
+            return stripped
+        text = stripped
+
+
+def flatten_entries(entries: Iterable) -> list[str]:
+    """Flatten nested 5etools entries into a list of plain paragraphs."""
+    paragraphs = []
+    for entry in entries or []:
+        if isinstance(entry, str):
+            paragraphs.append(strip_tags(entry))
+        elif isinstance(entry, dict):
+            children = entry.get("entries") or entry.get("items") or []
+            if entry.get("type") == "list":
+                paragraphs.extend(f"- {p}" for p in flatten_entries(children))
+                continue
+            if entry.get("type") == "item" and entry.get("name"):
+                text = " ".join(flatten_entries(entry.get("entries", [])))
+                paragraphs.append(f"{entry['name']} {text}".strip())
+                continue
+            if entry.get("entry"):
+                children = [entry["entry"], *children]
+            nested = flatten_entries(children)
+            if entry.get("name") and nested:
+                nested[0] = f"{entry['name']}. {nested[0]}"
+            paragraphs.extend(nested)
+    return paragraphs
+
+
+def _format_amount(amount, unit: str) -> str:
+    """Format "1 minute" / "10 minutes" style amounts."""
+    unit = unit.rstrip("s")
+    return f"{amount} {unit}" if amount == 1 else f"{amount} {unit}s"
+
+
+def format_casting_time(times: list) -> Optional[str]:
+    """Format 5etools `time` entries ("1 action", "10 minutes")."""
+    if not times:
+        return None
+    time = times[0]
+    unit = time.get("unit", "action")
+    if unit == "bonus":
+        unit = "bonus action"
+    number = time.get("number", 1)
+    if unit in ("action", "bonus action", "reaction"):
+        return f"{number} {unit}"
+    return _format_amount(number, unit)
+
+
+AREA_TYPES = ("radius", "sphere", "cone", "line", "cube", "hemisphere")
+
+
+def format_range(rng: dict) -> Optional[str]:
+    """Format a 5etools `range` object ("150 feet", "Self (15-foot cone)")."""
+    if not rng:
+        return None
+    distance = rng.get("distance", {})
+    kind = distance.get("type", "")
+    amount = distance.get("amount")
+    if rng.get("type") == "point":
+        if kind in ("self", "touch", "sight", "unlimited"):
+            return kind.title()
+        if kind == "feet":
+            return f"{amount} feet"
+        return _format_amount(amount, kind) if kind else None
+    if rng.get("type") in AREA_TYPES:
+        unit = "foot" if kind == "feet" else kind.rstrip("s")
+        return f"Self ({amount}-{unit} {rng['type']})"
+    return rng.get("type", "").title() or None
+
+
+def format_duration(durations: list) -> Optional[str]:
+    """Format 5etools `duration` entries ("Concentration, up to 1 minute")."""
+    if not durations:
+        return None
+    duration = durations[0]
+    kind = duration.get("type")
+    if kind == "instant":
+        return "Instantaneous"
+    if kind == "permanent":
+        ends = duration.get("ends", [])
+        return "Until dispelled" if "dispel" in ends else "Permanent"
+    if kind == "timed":
+        inner = duration.get("duration", {})
+        text = _format_amount(inner.get("amount", 1), inner.get("type", "round"))
+        if duration.get("concentration"):
+            return f"Concentration, up to {text}"
+        return text
+    return "Special"
+
+
+def format_components(components: dict) -> list[str]:
+    """Convert {"v": true, "s": true, "m": "..."} into ["V", "S", "M"]."""
+    return [key.upper() for key in ("v", "s", "m") if (components or {}).get(key)]
+
+
+def normalize_5etools_spell(raw: dict, class_map: Optional[dict] = None) -> dict:
+    """Convert a 5etools spell into the shape produced by `normalize_spell`."""
+    from_list = (raw.get("classes") or {}).get("fromClassList", [])
+    classes = [c["name"] for c in from_list]
+    if not classes and class_map:
+        classes = [c["name"] for c in class_map.get(raw["name"], {}).get("class", [])]
+
+    desc = flatten_entries(raw.get("entries", []))
+    desc += flatten_entries(raw.get("entriesHigherLevel", []))
+
+    return {
+        "index": slugify(raw["name"]),
+        "name": raw["name"],
+        "level": raw.get("level"),
+        "school": SCHOOLS.get(raw.get("school"), raw.get("school")),
+        "classes": list(dict.fromkeys(classes)),
+        "desc": desc,
+        "range": format_range(raw.get("range")),
+        "duration": format_duration(raw.get("duration")),
+        "components": format_components(raw.get("components")),
+        "casting_time": format_casting_time(raw.get("time")),
+        "concentration": any(d.get("concentration") for d in raw.get("duration") or []),
+        "ritual": bool((raw.get("meta") or {}).get("ritual")),
+    }
+
+
+def normalize_5etools_trait(race: dict, trait: dict) -> dict:
+    """Convert a named entry of a 5etools race into the `normalize_trait` shape."""
+    return {
+        "index": slugify(trait["name"]),
+        "name": trait["name"],
+        "races": [race["name"]],
+        "subraces": [],
+        "desc": flatten_entries(trait.get("entries", [])),
+    }
+
+
+def normalize_5etools_feature(raw: dict) -> dict:
+    """Convert a 5etools classFeature into the `normalize_feature` shape."""
+    class_name = raw.get("className", "")
+    return {
+        "index": slugify(f"{class_name} {raw['name']}"),
+        "name": raw["name"],
+        "level": raw.get("level"),
+        "class": class_name,
+        "subclass": None,
+        "desc": flatten_entries(raw.get("entries", [])),
+    }
+
+
+# Worker functions run in child processes, so they must be top-level.
+
+
+def _parse_spell_file(path: str, class_map: Optional[dict] = None) -> list[dict]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [normalize_5etools_spell(s, class_map) for s in data.get("spell", [])]
+
+
+def _parse_race_file(path: str) -> list[dict]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    traits: dict = {}
+    for race in data.get("race", []):
+        for entry in race.get("entries", []):
+            if not isinstance(entry, dict) or not entry.get("name"):
+                continue
+            if entry["name"] in RACE_BASICS:
+                continue
+            trait = normalize_5etools_trait(race, entry)
+            if trait["index"] in traits:
+                # Shared traits (e.g. Darkvision) list every race that has them
+                traits[trait["index"]]["races"].extend(trait["races"])
+            else:
+                traits[trait["index"]] = trait
+    return list(traits.values())
+
+
+def _parse_class_file(path: str) -> list[dict]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [normalize_5etools_feature(f) for f in data.get("classFeature", [])]
+
+
+def _parse_files(jobs: list, workers: int) -> Iterator[dict]:
+    """Run parse jobs on `workers` processes, yielding records in job order."""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield from job()
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        for future in futures:
+            yield from future.result()
+
+
+def _unique(records: Iterable[dict]) -> Iterator[dict]:
+    """Drop later records whose index was already seen (first source wins)."""
+    seen = set()
+    for record in records:
+        if record["index"] not in seen:
+            seen.add(record["index"])
+            yield record
+
+
+def _indexed_files(folder: Path, prefix: str) -> list[tuple[str, Path]]:
+    """List (source, file) pairs from a folder's index.json, or by glob."""
+    index_file = folder / "index.json"
+    if index_file.exists():
+        index = json.loads(index_file.read_text(encoding="utf-8"))
+        return [(source, folder / name) for source, name in index.items()]
+    return [(p.stem, p) for p in sorted(folder.glob(f"{prefix}-*.json"))]
+
+
+def iter_spells(data_dir: Path, workers: Optional[int] = None) -> Iterator[dict]:
+    """Yield normalized spells from `<data_dir>/spells`."""
+    folder = data_dir / "spells"
+    sources_file = folder / "sources.json"
+    sources = (
+        json.loads(sources_file.read_text(encoding="utf-8"))
+        if sources_file.exists()
+        else {}
+    )
+    jobs = [
+        partial(_parse_spell_file, str(path), sources.get(source, {}))
+        for source, path in _indexed_files(folder, "spells")
+    ]
+    return _parse_files(jobs, workers or os.cpu_count() or 1)
+
+
+def iter_traits(data_dir: Path, workers: Optional[int] = None) -> Iterator[dict]:
+    """Yield normalized traits from `<data_dir>/races.json`."""
+    path = data_dir / "races.json"
+    jobs = [partial(_parse_race_file, str(path))] if path.exists() else []
+    return _parse_files(jobs, 1)
+
+
+def iter_features(data_dir: Path, workers: Optional[int] = None) -> Iterator[dict]:
+    """Yield normalized class features from `<data_dir>/class`."""
+    jobs = [
+        partial(_parse_class_file, str(path))
+        for _, path in _indexed_files(data_dir / "class", "class")
+    ]
+    return _parse_files(jobs, workers or os.cpu_count() or 1)
+
+
+IMPORTERS = {
+    "spells": iter_spells,
+    "traits": iter_traits,
+    "features": iter_features,
+}
+
+
+def import_local(
+    kind: str,
+    data_dir: Optional[Path] = None,
+    force: bool = False,
+    workers: Optional[int] = None,
+    compress: bool = False,
+) -> None:
+    """Import one collection from a local 5etools mirror into data/{env}/.
+
+    Args:
+        kind: "spells", "traits" or "features"
+        data_dir: Mirror data folder (defaults to the configured source)
+        force: If True, overwrite an existing cache
+        workers: Number of parser processes (defaults to CPU count)
+        compress: If True, store the cache Brotli-compressed
+    """
+    banner(f"📂 Importing {kind.title()} from 5etools")
+
+    output_file = get_data_path(f"{kind}.json")
+    if cached_file(output_file) and not force:
+        warn(f"{kind}.json already exists — use --force to re-import.")
+        return
+
+    try:
+        data_dir = data_dir or resolve_source_path()
+    except (OSError, ValueError) as e:
+        error(f"❌ Could not resolve 5etools source: {e}")
+        return
+    if not data_dir.is_dir():
+        error(f"❌ 5etools data folder not found: {data_dir}")
+        return
+
+    try:
+        records = _unique(IMPORTERS[kind](data_dir, workers))
+        total = write_json_array(output_file, records, compress=compress)
+    except (OSError, json.JSONDecodeError, KeyError) as e:
+        error(f"❌ Failed to import {kind}: {e}")
+        return
+    target = compressed_path(output_file) if compress else output_file
+    publish(target)
+    success(f"✅ Imported {total} {kind} to {target}")
+    if kind == "spells":
+        load_catalog(output_file)  # build the catalog and search index up front
@@ -0,0 +1,64 @@
+# src/fetch/manifest.py
+
+"""Per-resource sync manifests stored next to cached SRD collections.
+
+A manifest maps each record's API index to the URL it came from, the
+validators the server sent (ETag / Last-Modified) and a hash of the raw
+response body, so later syncs can send conditional requests and only
+rewrite records that actually changed.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_file: Path) -> Path:
+    """Return the manifest path for a cached collection (spells.json → spells.manifest.json)."""
+    return output_file.with_name(f"{output_file.stem}.manifest.json")
+
+
+def load_manifest(path: Path) -> dict:
+    """Load a manifest's resource map, returning {} if missing or unreadable."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("resources", {})
+
+
+def save_manifest(path: Path, resources: dict) -> None:
+    """Write a manifest's resource map to disk."""
+    payload = {"version": MANIFEST_VERSION, "resources": resources}
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def content_hash(body: bytes) -> str:
+    """Return the SHA-256 hex digest of a raw response body."""
+    return hashlib.sha256(body).hexdigest()
+
+
+def conditional_headers(entry: dict) -> dict:
+    """Build If-None-Match / If-Modified-Since headers from a manifest entry."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def manifest_entry(url: str, response) -> dict:
+    """Build a manifest entry from a successful response."""
+    return {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "sha256": content_hash(response.content),
+    }
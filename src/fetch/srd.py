@@ -3,11 +3,56 @@
 """Fetch and cache D&D 5e SRD content from the official API."""
 
 import json
+from collections import Counter
+from typing import Callable, Iterator, Optional
+import brotli
 import requests
+from rich.progress import Progress
+from src.fetch.checkpoint import (
+    append_checkpoint,
+    checkpoint_path,
+    open_checkpoint,
+    read_checkpoint,
+)
+from src.catalog.spells import load_catalog
+from src.fetch.store import adopt, publish
+from src.fetch.manifest import (
+    conditional_headers,
+    content_hash,
+    load_manifest,
+    manifest_entry,
+    manifest_path,
+    save_manifest,
+)
 from src.utils.paths import get_data_path
 from src.utils.console import banner, success, warn, error
+from src.utils.storage import (
+    cached_file,
+    compressed_path,
+    read_json,
+    write_json_array,
+)
+from src.utils.http import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_TIMEOUT,
+    fetch_many,
+    get_session,
+    request,
+)
 
 BASE_URL = "https://www.dnd5eapi.co"
+GRAPHQL_PAGE_SIZE = 100
+
+# Fields requested per collection; they mirror what the REST detail
+# endpoints return for everything DMForge keeps.
+GRAPHQL_FIELDS = {
+    "spells": (
+        "index name level desc range duration components casting_time "
+        "concentration ritual school { name } classes { name }"
+    ),
+    "traits": "index name desc races { name } subraces { name }",
+    "features": "index name level desc class { name } subclass { name }",
+}
 
 
 def normalize_spell(raw: dict) -> dict:
@@ -23,111 +68,401 @@ def normalize_spell(raw: dict) -> dict:
         "duration": raw.get("duration"),
         "components": raw.get("components", []),
         "casting_time": raw.get("casting_time"),
+        "concentration": bool(raw.get("concentration")),
+        "ritual": bool(raw.get("ritual")),
     }
 
 
-def fetch_srd_spells(force: bool = False) -> None:
-    """Fetch and cache SRD spell data from the 5e API.
+def _names(refs: Optional[list]) -> list:
+    """Reduce a list of API reference objects to their names."""
+    return [ref["name"] for ref in refs or []]
 
-    Args:
-        force: If True, re-fetch even if local cache exists
-    """
-    banner("📥 Fetching SRD Spells")
 
-    # Use correct path relative to data directory
-    output_file = get_data_path("spells.json")
+def normalize_trait(raw: dict) -> dict:
+    """Extract relevant fields from raw API trait data."""
+    return {
+        "index": raw.get("index"),
+        "name": raw.get("name"),
+        "races": _names(raw.get("races")),
+        "subraces": _names(raw.get("subraces")),
+        "desc": raw.get("desc", []),
+    }
 
-    if output_file.exists() and not force:
-        warn("spells.json already exists — use --force to re-fetch.")
-        return
 
-    try:
-        # Step 1: Fetch list of spells
-        index_response = requests.get(f"{BASE_URL}/api/spells")
-        index_response.raise_for_status()
-        spell_list = index_response.json()["results"]
-
-        # Step 2: Fetch full data for each spell
-        spells = []
-        for spell in spell_list:
-            spell_url = f"{BASE_URL}{spell['url']}"
-            spell_response = requests.get(spell_url)
-            spell_response.raise_for_status()
-            spells.append(normalize_spell(spell_response.json()))
-
-        # Step 3: Create parent directories if needed
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # Step 4: Save to local cache
-        output_file.write_text(json.dumps(spells, indent=2), encoding="utf-8")
-        success(f"✅ Saved {len(spells)} spells to {output_file}")
+def normalize_feature(raw: dict) -> dict:
+    """Extract relevant fields from raw API class feature data."""
+    return {
+        "index": raw.get("index"),
+        "name": raw.get("name"),
+        "level": raw.get("level"),
+        "class": (raw.get("class") or {}).get("name"),
+        "subclass": (raw.get("subclass") or {}).get("name"),
+        "desc": raw.get("desc", []),
+    }
 
-    except requests.RequestException as e:
-        error(f"❌ Failed to fetch SRD spells: {e}")
 
+def _fetch_index(endpoint: str) -> list:
+    """Return the `results` list of an API collection index."""
+    response = request(
+        "GET", f"{BASE_URL}/api/{endpoint}", get_session(), timeout=DEFAULT_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()["results"]
 
-def fetch_srd_traits(force: bool = False) -> None:
-    """Fetch and cache racial traits from the 5e API.
 
-    Args:
-        force: If True, re-fetch even if local cache exists
+def _load_existing(output_file) -> dict:
+    """Load a cached collection keyed by record index."""
+    if cached_file(output_file) is None:
+        return {}
+    try:
+        records = read_json(output_file)
+    except (json.JSONDecodeError, brotli.error):
+        warn(f"{output_file.name} is unreadable — syncing from scratch.")
+        return {}
+    return {record.get("index"): record for record in records}
+
+
+def _graphql_url() -> str:
+    return f"{BASE_URL}/graphql"
+
+
+def _graphql_collection(endpoint: str, page_size: Optional[int] = None) -> list:
+    """Return every raw record of a collection using paged GraphQL queries."""
+    page_size = page_size or GRAPHQL_PAGE_SIZE
+    query = (
+        f"query($skip: Int, $limit: Int!) {{ "
+        f"{endpoint}(skip: $skip, limit: $limit) {{ {GRAPHQL_FIELDS[endpoint]} }} }}"
+    )
+    records, skip = [], 0
+    while True:
+        response = request(
+            "POST",
+            _graphql_url(),
+            get_session(),
+            json={"query": query, "variables": {"skip": skip, "limit": page_size}},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get("errors"):
+            message = payload["errors"][0].get("message", "unknown error")
+            raise requests.RequestException(f"GraphQL error: {message}")
+        page = payload["data"][endpoint] or []
+        records.extend(page)
+        if len(page) < page_size:
+            return records
+        skip += page_size
+
+
+def _rest_records(
+    endpoint: str,
+    skip: set,
+    validators: dict,
+    concurrency: int,
+    on_total: Optional[Callable[[int], None]] = None,
+) -> Iterator[tuple]:
+    """Yield (index, resource, raw) using the index call plus one GET per record.
+
+    Records in `skip` are yielded as (index, None, None) without a request.
+    Records with `validators` are revalidated, and a 304 yields raw=None.
+    `on_total` is called with the record count once the index is known.
     """
-    banner("📥 Fetching SRD Traits")
+    # Step 1: Fetch the collection index
+    entries = _fetch_index(endpoint)
+    if on_total:
+        on_total(len(entries))
+    todo = [
+        (f"{BASE_URL}{entry['url']}", entry["index"])
+        for entry in entries
+        if entry["index"] not in skip
+    ]
+    headers = {
+        url: conditional_headers(validators[index])
+        for url, index in todo
+        if index in validators
+    }
 
-    output_file = get_data_path("traits.json")
+    # Step 2: Fetch (or revalidate) each record, preserving index order
+    responses = fetch_many(
+        [url for url, _ in todo], concurrency, get_session(), headers=headers
+    )
+    pending = zip(todo, responses)
+    for entry in entries:
+        if entry["index"] in skip:
+            yield entry["index"], None, None
+            continue
+        (url, index), response = next(pending)
+        if response.status_code == 304 and index in validators:
+            yield index, validators[index], None
+            continue
+        response.raise_for_status()
+        yield index, manifest_entry(url, response), response.json()
+
+
+def _graphql_records(
+    endpoint: str,
+    skip: set,
+    validators: dict,
+    concurrency: int,
+    on_total: Optional[Callable[[int], None]] = None,
+) -> Iterator[tuple]:
+    """Yield (index, resource, raw) from a few paged GraphQL queries.
+
+    GraphQL has no per-record validators, so change detection relies on
+    the hash of each record's JSON. Records are sorted by index to match
+    the order of the REST index.
+    """
+    raws = sorted(_graphql_collection(endpoint), key=lambda r: r["index"])
+    if on_total:
+        on_total(len(raws))
+    for raw in raws:
+        index = raw["index"]
+        if index in skip:
+            yield index, None, None
+            continue
+        body = json.dumps(raw, sort_keys=True).encode("utf-8")
+        resource = {
+            "url": f"{_graphql_url()}#{endpoint}/{index}",
+            "etag": None,
+            "last_modified": None,
+            "sha256": content_hash(body),
+        }
+        yield index, resource, raw
+
+
+TRANSPORTS = {"rest": _rest_records, "graphql": _graphql_records}
+
+
+def _fetch_collection(
+    endpoint: str,
+    normalize: Optional[Callable[[dict], dict]] = None,
+    force: bool = False,
+    sync: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: str = "rest",
+    progress: Optional[Progress] = None,
+    compress: bool = False,
+) -> None:
+    """Fetch one SRD collection and cache it as data/{env}/{endpoint}.json.
+
+    A full fetch downloads every record. With `sync`, records already in
+    the cache are revalidated with conditional requests using the
+    validators stored in the manifest, and the cache is only rewritten
+    when something was added, changed or removed.
+
+    Every record is appended to a JSONL checkpoint as it arrives. If the
+    run fails, the next run resumes from the checkpoint instead of
+    starting over, and the final JSON is streamed from it in one pass.
+
+    When a rich `progress` display is given, the collection gets its own
+    task on it that advances as records arrive. With `compress`, the
+    cache is stored Brotli-compressed as {endpoint}.json.br.
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{transport}' (use rest or graphql)")
+
+    task = progress.add_task(endpoint, total=None) if progress else None
+
+    def on_total(total: int) -> None:
+        if progress:
+            progress.update(task, total=total)
+
+    output_file = get_data_path(f"{endpoint}.json")
+    checkpoint_file = checkpoint_path(output_file)
+    resuming = checkpoint_file.exists()
+
+    if not (cached_file(output_file) or force or sync or resuming):
+        # Another environment may already have fetched this collection
+        adopted = adopt(output_file)
+        if adopted:
+            success(f"✅ Linked {adopted.name} from the shared store")
+            if progress:
+                progress.update(task, total=0, description=f"{endpoint} (shared)")
+            return
+
+    if cached_file(output_file) and not (force or sync or resuming):
+        warn(f"{endpoint}.json already exists — use --force to re-fetch.")
+        if progress:
+            progress.update(task, total=0, description=f"{endpoint} (cached)")
+        return
 
-    if output_file.exists() and not force:
-        warn("traits.json already exists — use --force to re-fetch.")
+    manifest_file = manifest_path(output_file)
+    existing = _load_existing(output_file) if sync else {}
+    manifest = load_manifest(manifest_file) if sync else {}
+    validators = {index: manifest[index] for index in existing if index in manifest}
+
+    # Only index + status are kept in memory; records stay on disk
+    done = {
+        entry["index"]: entry["status"] for entry in read_checkpoint(checkpoint_file)
+    }
+    if done:
+        warn(f"Resuming {endpoint} from checkpoint ({len(done)} already fetched).")
+
+    current = []
+    records = TRANSPORTS[transport](
+        endpoint, set(done), validators, concurrency, on_total
+    )
+    with open_checkpoint(checkpoint_file) as checkpoint:
+        for index, resource, raw in records:
+            current.append(index)
+            if progress:
+                progress.advance(task)
+            if resource is None:
+                continue  # already in the checkpoint
+
+            known = manifest.get(index, {}).get("sha256")
+            if raw is None or (index in existing and known == resource["sha256"]):
+                status, record = "unchanged", existing[index]
+            else:
+                record = normalize(raw) if normalize else raw
+                if index not in existing:
+                    status = "added"
+                elif record == existing[index]:
+                    status = "unchanged"
+                else:
+                    status = "updated"
+            append_checkpoint(
+                checkpoint,
+                {
+                    "index": index,
+                    "status": status,
+                    "resource": resource,
+                    "record": record,
+                },
+            )
+            done[index] = status
+
+    counts = Counter(done[index] for index in current)
+    removed = len(set(existing) - set(current))
+
+    # Build the cache from the checkpoint in one streaming pass
+    resources = {}
+
+    def checkpointed_records():
+        seen = set()
+        wanted = set(current)
+        for entry in read_checkpoint(checkpoint_file):
+            index = entry["index"]
+            if index in seen or index not in wanted:
+                continue
+            seen.add(index)
+            resources[index] = entry["resource"]
+            yield entry["record"]
+
+    changed = counts["added"] or counts["updated"] or removed
+    target = compressed_path(output_file) if compress else output_file
+    if sync and cached_file(output_file) == target and not changed:
+        for _ in checkpointed_records():
+            pass
+        save_manifest(manifest_file, resources)
+        checkpoint_file.unlink()
+        success(f"✅ {endpoint}.json is up to date ({counts['unchanged']} unchanged)")
         return
 
+    total = write_json_array(output_file, checkpointed_records(), compress=compress)
+    publish(target)
+    save_manifest(manifest_file, resources)
+    checkpoint_file.unlink()
+    if sync:
+        success(
+            f"✅ Synced {endpoint}: {counts['added']} added, {counts['updated']} "
+            f"updated, {removed} removed, {counts['unchanged']} unchanged"
+        )
+    else:
+        success(f"✅ Saved {total} {endpoint} to {target}")
+
+
+def fetch_srd_spells(
+    force: bool = False,
+    sync: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: str = "rest",
+    progress: Optional[Progress] = None,
+    compress: bool = False,
+) -> None:
+    """Fetch and cache SRD spell data from the 5e API.
+
+    Args:
+        force: If True, re-fetch even if local cache exists
+        sync: If True, revalidate the cache and rewrite only changed records
+        concurrency: Maximum number of detail requests in flight
+        transport: "rest" (index + detail calls) or "graphql" (paged queries)
+        progress: Shared rich progress display to report on
+        compress: If True, store the cache Brotli-compressed
+    """
+    banner("📥 Fetching SRD Spells")
     try:
-        # Step 1: Get list of traits
-        index_response = requests.get(f"{BASE_URL}/api/traits")
-        index_response.raise_for_status()
-        trait_list = index_response.json()["results"]
-
-        # Step 2: Fetch individual trait details
-        traits = []
-        for trait in trait_list:
-            trait_url = f"{BASE_URL}{trait['url']}"
-            trait_response = requests.get(trait_url)
-            trait_response.raise_for_status()
-            traits.append(trait_response.json())
-
-        # Step 3: Save to local cache
-        output_file.write_text(json.dumps(traits, indent=2), encoding="utf-8")
-        success(f"✅ Saved {len(traits)} traits to {output_file}")
+        _fetch_collection(
+            "spells",
+            normalize_spell,
+            force,
+            sync,
+            concurrency,
+            transport,
+            progress,
+            compress,
+        )
+    except requests.RequestException as e:
+        error(f"❌ Failed to fetch SRD spells: {e} — rerun to resume.")
+        return
+    # Build the indexed catalog and search index now rather than on first use
+    load_catalog(get_data_path("spells.json"))
+
+
+def fetch_srd_traits(
+    force: bool = False,
+    sync: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: str = "rest",
+    progress: Optional[Progress] = None,
+    compress: bool = False,
+) -> None:
+    """Fetch and cache racial traits from the 5e API.
 
+    Args:
+        force: If True, re-fetch even if local cache exists
+        sync: If True, revalidate the cache and rewrite only changed records
+        concurrency: Maximum number of detail requests in flight
+        transport: "rest" (index + detail calls) or "graphql" (paged queries)
+        progress: Shared rich progress display to report on
+        compress: If True, store the cache Brotli-compressed
+    """
+    banner("📥 Fetching SRD Traits")
+    try:
+        _fetch_collection(
+            "traits",
+            normalize_trait,
+            force,
+            sync,
+            concurrency,
+            transport,
+            progress,
+            compress,
+        )
     except requests.RequestException as e:
-        error(f"❌ Failed to fetch SRD traits: {e}")
+        error(f"❌ Failed to fetch SRD traits: {e} — rerun to resume.")
 
 
-def fetch_srd_features(force: bool = False):
+def fetch_srd_features(
+    force: bool = False,
+    sync: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    transport: str = "rest",
+    progress: Optional[Progress] = None,
+    compress: bool = False,
+):
     """Fetch and cache class features from the 5e API."""
     banner("📥 Fetching SRD Features")
-
-    output_file = get_data_path("features.json")
-
-    if output_file.exists() and not force:
-        warn("features.json already exists — use --force to re-fetch.")
-        return
-
     try:
-        # Step 1: Get feature list
-        index_response = requests.get(f"{BASE_URL}/api/features")
-        index_response.raise_for_status()
-        feature_list = index_response.json()["results"]
-
-        # Step 2: Fetch individual feature details
-        features = []
-        for feature in feature_list:
-            feature_url = f"{BASE_URL}{feature['url']}"
-            response = requests.get(feature_url)
-            if response.status_code == 200:
-                features.append(response.json())
-
-        output_file.write_text(json.dumps(features, indent=2), encoding="utf-8")
-        success(f"✅ Saved {len(features)} features to {output_file}")
-
+        _fetch_collection(
+            "features",
+            normalize_feature,
+            force,
+            sync,
+            concurrency,
+            transport,
+            progress,
+            compress,
+        )
     except requests.RequestException as e:
-        error(f"❌ Failed to fetch SRD features: {e}")
+        error(f"❌ Failed to fetch SRD features: {e} — rerun to resume.")
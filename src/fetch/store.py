@@ -0,0 +1,152 @@
+# src/fetch/store.py
+
+"""Environment-independent, content-addressed store for SRD caches.
+
+Every cache file a fetch or import writes (spells.json, traits.json.br,
+...) is moved into `data/store/<sha256>` and linked back into
+`data/{env}/`. Hardlinks are preferred, then symlinks, then a plain
+copy. Each environment keeps a `store.json` manifest that records which
+blob its files point at, and the store keeps an index of the latest
+blob published under each file name. A new environment can then adopt
+those blobs by linking them, without any network traffic or extra disk.
+
+Blobs are never modified in place: cache writers always write a temporary
+file and `os.replace` it, which swaps the env's link for a new file
+instead of writing through it into the shared blob.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.utils.paths import get_store_path
+
+STORE_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+_lock = threading.Lock()
+
+
+def env_manifest_path(cache_file: Path) -> Path:
+    """Return the store manifest of the environment folder holding `cache_file`."""
+    return cache_file.with_name("store.json")
+
+
+def _load(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return data.get("files", {}) if data.get("version") == STORE_VERSION else {}
+
+
+def _save(path: Path, files: dict) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    payload = {"version": STORE_VERSION, "files": files}
+    tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def file_hash(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_path(digest: str) -> Path:
+    """Return where the store keeps the blob with this digest."""
+    return get_store_path(digest)
+
+
+def link_file(source: Path, target: Path) -> str:
+    """Point `target` at `source`, replacing any existing file atomically.
+
+    Returns "hardlink", "symlink" or "copy" depending on what the
+    filesystem allowed.
+    """
+    tmp_path = target.with_name(f"{target.name}.link")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(source, tmp_path)
+        kind = "hardlink"
+    except OSError:
+        try:
+            os.symlink(source.resolve(), tmp_path)
+            kind = "symlink"
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+            kind = "copy"
+    os.replace(tmp_path, target)
+    return kind
+
+
+def _record(cache_file: Path, digest: str) -> None:
+    """Note in the env manifest and the store index that `cache_file` is `digest`."""
+    entry = {
+        "sha256": digest,
+        "size": blob_path(digest).stat().st_size,
+        "linked": time.time(),
+    }
+    manifest_file = env_manifest_path(cache_file)
+    files = _load(manifest_file)
+    files[cache_file.name] = entry
+    _save(manifest_file, files)
+
+    index_file = get_store_path("index.json")
+    index = _load(index_file)
+    index[cache_file.name] = entry
+    _save(index_file, index)
+
+
+def publish(cache_file: Path) -> str:
+    """Move a freshly written cache file into the store and link it back.
+
+    Returns the blob digest. If an identical blob already exists, the new
+    file is dropped and the env links to the existing one.
+    """
+    digest = file_hash(cache_file)
+    blob = blob_path(digest)
+    with _lock:
+        if not blob.exists():
+            # Adopt the new file's inode as the blob when possible
+            tmp_blob = blob.with_name(f"{digest}.tmp")
+            tmp_blob.unlink(missing_ok=True)
+            try:
+                os.link(cache_file, tmp_blob)
+            except OSError:
+                shutil.copyfile(cache_file, tmp_blob)
+            os.replace(tmp_blob, blob)
+        link_file(blob, cache_file)
+        _record(cache_file, digest)
+    return digest
+
+
+def adopt(cache_file: Path) -> Optional[Path]:
+    """Link the latest stored copy of a cache file (plain or .br) into this env.
+
+    Returns the linked path, or None if the store has no copy.
+    """
+    index = _load(get_store_path("index.json"))
+    for name in (cache_file.name, f"{cache_file.name}.br"):
+        entry = index.get(name)
+        if not entry:
+            continue
+        blob = blob_path(entry["sha256"])
+        if not blob.exists():
+            continue
+        target = cache_file.with_name(name)
+        with _lock:
+            link_file(blob, target)
+            _record(target, entry["sha256"])
+        return target
+    return None
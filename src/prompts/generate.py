@@ -6,6 +6,8 @@ import json
 from pathlib import Path
 from src.utils.env import get_env
 from src.utils.paths import get_data_path
+from src.catalog.merge import catalog_source
+from src.catalog.spells import load_catalog
 from src.prompts.spells import generate_spell_prompt
 from src.utils.console import banner, success, error
 
@@ -19,12 +21,13 @@ def generate_spell_prompts(suffix: str = "", format: str = "txt"):
     output_dir = Path("prompts") / env
     output_file = output_dir / "spells.txt"
 
-    if not input_file.exists():
+    catalog = load_catalog(catalog_source(input_file))
+    if catalog is None:
         error(f"❌ Missing SRD data: {input_file}")
         return
 
     try:
-        spells = json.loads(input_file.read_text(encoding="utf-8"))
+        spells = catalog.all()
         output_dir.mkdir(parents=True, exist_ok=True)
 
         if format == "json":
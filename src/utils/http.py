@@ -0,0 +1,389 @@
+# src/utils/http.py
+
+"""Shared HTTP client layer for every outbound call DMForge makes.
+
+Provides one pooled keep-alive session, a per-host token-bucket rate
+limiter, an adaptive (AIMD) concurrency limit that backs off when a host
+answers 429 or slows down, jittered exponential retries that honour
+Retry-After, and counters so each stage can report what it cost.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterable, Iterator, Mapping, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.http_cache import cached_call, encode_body, get_cache
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30
+
+# Token bucket defaults (requests/second and burst size) per host
+DEFAULT_RATE = 50.0
+HOST_RATES: dict = {}
+
+# Retry policy
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Requests carrying these headers are revalidations and bypass cache reads
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+# Adaptive concurrency: requests slower than this count as congestion
+LATENCY_TARGET = 5.0
+MAX_HOST_CONCURRENCY = 32
+
+T = TypeVar("T")
+
+_session: Optional[requests.Session] = None
+_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size: Optional[int] = None) -> requests.Session:
+    """Return the process-wide keep-alive session, creating it on first use.
+
+    All fetchers share this session so TCP/TLS connections are reused
+    across requests instead of being re-established for every URL. Each
+    host's connection pool holds at least MAX_HOST_CONCURRENCY
+    connections, the most requests `send` lets run against one host. A
+    larger `pool_size` grows the pools, so no connection in flight is
+    discarded.
+    """
+    global _session, _pool_size
+    size = max(pool_size or 0, MAX_HOST_CONCURRENCY)
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _pool_size = 0
+        if size > _pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _pool_size = size
+        return _session
+
+
+def reset_session() -> None:
+    """Close and drop the shared session (used by tests and benchmarks)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst` saved."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens, sleeping until they are available.
+
+        Amounts larger than the burst size wait for a full bucket instead
+        of waiting forever. Returns seconds waited.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                need = min(amount, self.burst)
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= need:
+                    self.tokens -= need
+                    return waited
+                delay = (need - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveLimit:
+    """Concurrency limit that grows additively and shrinks multiplicatively.
+
+    Each success raises the limit by 1/limit (about +1 per round trip);
+    a throttled or slow response halves it. Callers block in `acquire`
+    while the number of in-flight requests is at the limit.
+    """
+
+    def __init__(self, initial: int = DEFAULT_CONCURRENCY, maximum: int = 0):
+        self.limit = float(initial)
+        self.maximum = maximum or MAX_HOST_CONCURRENCY
+        self.in_flight = 0
+        self.cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Wait for a free slot. Returns seconds waited."""
+        start = time.monotonic()
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+        return time.monotonic() - start
+
+    def release(self, congested: bool) -> None:
+        with self.cond:
+            self.in_flight -= 1
+            if congested:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+
+# Optional process-wide cap on requests in flight, shared by all callers
+_budget: Optional[threading.BoundedSemaphore] = None
+
+
+@contextmanager
+def shared_budget(limit: int):
+    """Cap the number of requests in flight across every concurrent fetch.
+
+    Used when several collections are fetched at once, so the combined
+    load stays at `limit` instead of `limit` per collection.
+    """
+    global _budget
+    previous, _budget = _budget, threading.BoundedSemaphore(max(1, limit))
+    try:
+        yield
+    finally:
+        _budget = previous
+
+
+_hosts: dict = {}
+_hosts_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats: dict = {}
+
+
+def _new_stats() -> dict:
+    return {
+        "requests": 0,
+        "retries": 0,
+        "throttled": 0,
+        "throttled_time": 0.0,
+        "failures": 0,
+    }
+
+
+def _host_state(host: str) -> tuple:
+    """Return the (TokenBucket, AdaptiveLimit) pair for a host."""
+    with _hosts_lock:
+        if host not in _hosts:
+            rate = HOST_RATES.get(host, DEFAULT_RATE)
+            _hosts[host] = (TokenBucket(rate), AdaptiveLimit())
+        return _hosts[host]
+
+
+def configure_host(
+    host: str, rate: Optional[float] = None, burst: Optional[float] = None
+) -> None:
+    """Set the request rate (per second) and burst size used for a host."""
+    bucket, _ = _host_state(host)
+    with bucket.lock:
+        if rate is not None:
+            bucket.rate = rate
+            HOST_RATES[host] = rate
+        if burst is not None:
+            bucket.burst = burst
+            bucket.tokens = min(bucket.tokens, burst)
+
+
+def _count(host: str, key: str, amount=1) -> None:
+    with _stats_lock:
+        for scope in ("*", host):
+            _stats.setdefault(scope, _new_stats())[key] += amount
+
+
+def get_stats(host: Optional[str] = None) -> dict:
+    """Return a copy of the request counters (all hosts, or one host)."""
+    with _stats_lock:
+        return dict(_stats.get(host or "*", _new_stats()))
+
+
+def reset_stats() -> None:
+    """Zero every counter and forget adaptive limits."""
+    with _stats_lock:
+        _stats.clear()
+    with _hosts_lock:
+        _hosts.clear()
+
+
+def format_stats(host: Optional[str] = None) -> str:
+    """Render the counters as a one-line summary for console output."""
+    stats = get_stats(host)
+    summary = (
+        f"{stats['requests']} requests, {stats['retries']} retries, "
+        f"{stats['throttled']} throttled, {stats['throttled_time']:.1f}s waiting"
+    )
+    cache = get_cache()
+    if cache is not None:
+        summary += f", cache {cache.hits} hits / {cache.misses} misses"
+    return summary
+
+
+def _retry_after(headers) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def send(
+    host: str,
+    call: Callable[[], T],
+    retry_on: tuple = (requests.ConnectionError, requests.Timeout),
+    max_retries: Optional[int] = None,
+) -> T:
+    """Run one outbound call under the host's rate limit, with retries.
+
+    `call` performs the request and returns a response. Responses whose
+    `status_code` is in RETRY_STATUSES, exceptions listed in `retry_on`
+    and exceptions carrying such a `status_code` (as SDK errors do) are
+    retried with jittered exponential backoff, waiting at least as long
+    as any Retry-After header asks.
+
+    Args:
+        host: Host name used for rate limiting and counters
+        call: Zero-argument function that performs the request
+        retry_on: Exception types that are always worth retrying
+        max_retries: Override the default retry count
+    """
+    bucket, limit = _host_state(host)
+    retries = MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        waited = bucket.acquire() + limit.acquire()
+        if waited:
+            _count(host, "throttled_time", waited)
+        _count(host, "requests")
+
+        response, failure = None, None
+        start = time.monotonic()
+        try:
+            with _budget or nullcontext():
+                start = time.monotonic()  # don't count time queued for the budget
+                response = call()
+            status = getattr(response, "status_code", None)
+            headers = getattr(response, "headers", None)
+        except Exception as e:
+            failure = e
+            status = getattr(e, "status_code", None)
+            headers = getattr(getattr(e, "response", None), "headers", None)
+        elapsed = time.monotonic() - start
+
+        throttled = status == 429
+        retryable = (isinstance(status, int) and status in RETRY_STATUSES) or (
+            failure is not None and isinstance(failure, retry_on)
+        )
+        limit.release(congested=throttled or retryable or elapsed > LATENCY_TARGET)
+        if throttled:
+            _count(host, "throttled")
+
+        if not retryable or attempt >= retries:
+            if failure is not None:
+                _count(host, "failures")
+                raise failure
+            return response
+
+        delay = max(_backoff(attempt), _retry_after(headers) or 0.0)
+        _count(host, "retries")
+        _count(host, "throttled_time", delay)
+        time.sleep(delay)
+        attempt += 1
+
+
+def request(
+    method: str, url: str, session: Optional[requests.Session] = None, **kwargs
+) -> requests.Response:
+    """Send one request through the shared session with limits and retries.
+
+    When the response cache is enabled, hits are served from disk without
+    touching the network or the host's rate limit.
+    """
+    session = session or get_session()
+    sender = getattr(session, method.lower())
+    headers = kwargs.get("headers") or {}
+    return cached_call(
+        method,
+        url,
+        lambda: send(urlsplit(url).netloc, lambda: sender(url, **kwargs)),
+        body=encode_body(kwargs.get("json"), kwargs.get("data")),
+        revalidate=any(name in headers for name in CONDITIONAL_HEADERS),
+    )
+
+
+def fetch_many(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    session: Optional[requests.Session] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    headers: Optional[Mapping[str, dict]] = None,
+) -> Iterator[requests.Response]:
+    """GET every URL with at most `concurrency` requests in flight.
+
+    Responses are yielded in the same order as `urls`, so callers can
+    stream results to disk without buffering the whole collection.
+
+    Args:
+        urls: URLs to fetch
+        concurrency: Maximum number of simultaneous requests
+        session: Session to use (defaults to the shared session)
+        timeout: Per-request timeout in seconds
+        headers: Optional extra request headers keyed by URL
+    """
+    session = session or get_session(concurrency)
+    headers = headers or {}
+    concurrency = max(1, concurrency)
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch")
+    pending: deque = deque()
+    try:
+        for url in urls:
+            pending.append(
+                pool.submit(
+                    request,
+                    "GET",
+                    url,
+                    session,
+                    timeout=timeout,
+                    headers=headers.get(url),
+                )
+            )
+            # Keep a small look-ahead window so memory stays bounded
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
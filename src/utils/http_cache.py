@@ -0,0 +1,275 @@
+# src/utils/http_cache.py
+
+"""Content-addressed on-disk cache for HTTP responses.
+
+Each request is keyed by a hash of its method, URL and body. The key
+points at a small JSON entry (status, headers, body hash) and bodies are
+stored once per unique content under `blobs/`, so identical payloads
+served from different URLs share storage. Entry mtimes act as the LRU
+clock: hits touch the entry, and stores evict the least recently used
+entries once the cache grows past its size cap.
+
+Modes:
+    off     Never read or write the cache (default)
+    record  Serve hits from the cache; fetch and store misses
+    replay  Serve only from the cache; a miss raises CacheMiss
+
+A record-mode cache configured with `refresh` (`fetch srd --force`)
+does not serve hits. It fetches every request again and overwrites the
+stored response.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.utils.paths import get_data_path
+
+MODES = ("off", "record", "replay")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Headers worth keeping with a cached body; the rest are per-connection noise
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+class CacheMiss(requests.ConnectionError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """Return the cache key for a request: sha256 of method, URL and body hash."""
+    body_hash = hashlib.sha256(body or b"").hexdigest()
+    return hashlib.sha256(f"{method.upper()}\n{url}\n{body_hash}".encode()).hexdigest()
+
+
+def encode_body(json_body=None, data=None) -> Optional[bytes]:
+    """Serialize a request body the same way on every call so keys are stable."""
+    if json_body is not None:
+        return json.dumps(json_body, sort_keys=True).encode("utf-8")
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return data
+
+
+class HTTPCache:
+    """A size-capped, content-addressed response store rooted at `root`."""
+
+    def __init__(
+        self,
+        root: Path,
+        mode: str = "record",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh: bool = False,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'. Use one of {MODES}.")
+        self.root = Path(root)
+        self.mode = mode
+        self.refresh = refresh
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _entries(self) -> list[Path]:
+        return list((self.root / "entries").glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        """Return the cached response for a key, or None."""
+        entry_path = self._entry_path(key)
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            body = self._blob_path(entry["sha256"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.encoding = entry.get("encoding")
+        response._content = body
+        return response
+
+    def put(self, key: str, response) -> None:
+        """Store a successful response under a key."""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        entry = {
+            "url": response.url,
+            "status": response.status_code,
+            "encoding": getattr(response, "encoding", None),
+            "headers": {
+                name: response.headers[name]
+                for name in KEPT_HEADERS
+                if name in response.headers
+            },
+            "sha256": digest,
+            "size": len(body),
+            "stored": time.time(),
+        }
+        with self.lock:
+            if not blob_path.exists():
+                _atomic_write(blob_path, body)
+                self._size = None if self._size is None else self._size + len(body)
+            _atomic_write(self._entry_path(key), json.dumps(entry).encode("utf-8"))
+            if self.size() > self.max_bytes:
+                self._evict()
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup as a hit or a miss."""
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def size(self) -> int:
+        """Return the total size of stored bodies in bytes."""
+        if self._size is None:
+            blobs = (self.root / "blobs").glob("*/*")
+            self._size = sum(p.stat().st_size for p in blobs if p.is_file())
+        return self._size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is under 90% of its cap."""
+        entries = []
+        refs: dict = {}
+        for path in self._entries():
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+                used = path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            entries.append((used, path, entry["sha256"], entry["size"]))
+            refs[entry["sha256"]] = refs.get(entry["sha256"], 0) + 1
+
+        target = self.max_bytes * 0.9
+        for _, path, digest, size in sorted(entries):
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            refs[digest] -= 1
+            if not refs[digest]:
+                self._blob_path(digest).unlink(missing_ok=True)
+                self._size -= size
+
+    def clear(self) -> None:
+        """Remove every entry and blob."""
+        with self.lock:
+            for folder in ("entries", "blobs"):
+                for path in (self.root / folder).glob("*/*"):
+                    path.unlink(missing_ok=True)
+            self._size = 0
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+_cache: Optional[HTTPCache] = None
+_configured = False
+_cache_lock = threading.Lock()
+
+
+def default_root() -> Path:
+    """Cache folder: $DMFORGE_HTTP_CACHE_DIR or data/{env}/http-cache."""
+    return Path(os.getenv("DMFORGE_HTTP_CACHE_DIR") or get_data_path("http-cache"))
+
+
+def configure(
+    mode: Optional[str] = None,
+    root: Optional[Path] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    refresh: bool = False,
+) -> Optional[HTTPCache]:
+    """Select the process-wide cache.
+
+    Args:
+        mode: "off", "record" or "replay" (defaults to $DMFORGE_HTTP_CACHE or off)
+        root: Cache folder (defaults to `default_root()`)
+        max_bytes: Size cap before least recently used entries are evicted
+        refresh: In record mode, re-fetch instead of serving hits
+    """
+    global _cache, _configured
+    mode = (mode or os.getenv("DMFORGE_HTTP_CACHE") or "off").lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown cache mode '{mode}'. Use one of {MODES}.")
+    with _cache_lock:
+        _cache = (
+            None
+            if mode == "off"
+            else HTTPCache(
+                root or default_root(),
+                mode=mode,
+                max_bytes=max_bytes,
+                refresh=refresh,
+            )
+        )
+        _configured = True
+    return _cache
+
+
+def get_cache() -> Optional[HTTPCache]:
+    """Return the active cache, configuring it from the environment on first use."""
+    if not _configured:
+        configure()
+    return _cache
+
+
+def cached_call(
+    method: str,
+    url: str,
+    call: Callable[[], requests.Response],
+    body: Optional[bytes] = None,
+    revalidate: bool = False,
+) -> requests.Response:
+    """Return a cached response for the request, or run `call` and record it.
+
+    Only 2xx responses are stored. With the cache off, `call` runs as is.
+    In record mode, revalidating requests (conditional GETs from
+    `fetch srd --sync`) and every request of a refreshing cache skip
+    cache reads, so the server still gets to answer them.
+
+    Raises:
+        CacheMiss: In replay mode, when the request was never recorded
+    """
+    cache = get_cache()
+    if cache is None:
+        return call()
+
+    key = request_key(method, url, body)
+    skip_read = (revalidate or cache.refresh) and cache.mode == "record"
+    cached = None if skip_read else cache.get(key)
+    cache.record(hit=cached is not None)
+    if cached is not None:
+        return cached
+    if cache.mode == "replay":
+        raise CacheMiss(f"No recorded response for {method.upper()} {url}")
+
+    response = call()
+    if 200 <= response.status_code < 300:
+        cache.put(key, response)
+    return response
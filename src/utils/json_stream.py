@@ -0,0 +1,189 @@
+# src/utils/json_stream.py
+
+"""Incremental readers and writers for deck and catalog files.
+
+Decks come in three shapes: `{"cards": [...]}`, a bare list of cards,
+or JSON Lines (`.jsonl`/`.ndjson`, one card per line). `iter_cards`
+yields cards from any of them one at a time, reading the file in
+chunks. Memory stays proportional to one card rather than the whole
+deck, and callers can start work on the first card before the rest of
+the file has been parsed.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from src.utils.storage import write_json_array, write_json_lines
+
+CHUNK_SIZE = 1 << 16
+DECK_KEYS = ("cards", "spells")
+LINE_SUFFIXES = (".jsonl", ".ndjson")
+
+_WHITESPACE_RE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """A growing window over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self) -> bool:
+        """Drop consumed text and read more; returns False at end of file.
+
+        Reads at least as much as is already buffered, so a value spanning
+        many chunks is re-scanned a logarithmic number of times.
+        """
+        chunk = self.f.read(max(CHUNK_SIZE, len(self.buf) - self.pos))
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in JSON file")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' but found '{separator}'")
+
+
+def deck_format(path: Path) -> str:
+    """Return "lines", "list" or "object" depending on how a deck is stored."""
+    if path.suffix in LINE_SUFFIXES:
+        return "lines"
+    with path.open(encoding="utf-8") as f:
+        root = _Reader(f).peek()
+    return {"[": "list", "{": "object"}.get(root, "")
+
+
+def iter_json_items(
+    path: Path, keys: Iterable[str] = DECK_KEYS, whole_root: bool = False
+) -> Iterator[Any]:
+    """Yield the items of a list-root, keyed-object or JSON Lines file lazily.
+
+    Args:
+        path: File to read
+        keys: For an object root, stream the first of these keys holding a list
+        whole_root: Yield an object root itself when it has none of `keys`
+
+    Raises:
+        ValueError: If the file is not valid JSON or its root is a scalar
+    """
+    keys = set(keys)
+    with path.open(encoding="utf-8") as f:
+        if path.suffix in LINE_SUFFIXES:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        reader = _Reader(f)
+        root = reader.peek()
+        if root == "[":
+            yield from reader.items()
+            return
+        if root != "{":
+            raise ValueError("Unexpected deck JSON format: root must be list or dict")
+
+        members = {}
+        if _seek_list(reader, keys, members):
+            yield from reader.items()
+        elif whole_root:
+            yield members
+
+
+def _seek_list(reader: _Reader, keys: set, members: dict) -> bool:
+    """Advance into an object root up to the first of `keys` holding a list.
+
+    Members read on the way are stored in `members`. Returns False if
+    no such key exists.
+    """
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key in keys and reader.peek() == "[":
+            return True
+        members[key] = reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+    return False
+
+
+def has_items(path: Path, keys: Iterable[str] = DECK_KEYS) -> bool:
+    """True if `iter_json_items` would stream a list from this file.
+
+    That is a list root, JSON Lines, or an object root with one of `keys`
+    holding a list. Only reads up to the start of that list.
+
+    Raises:
+        ValueError: If the file is not valid JSON
+    """
+    if path.suffix in LINE_SUFFIXES:
+        return True
+    with path.open(encoding="utf-8") as f:
+        reader = _Reader(f)
+        root = reader.peek()
+        if root == "{":
+            return _seek_list(reader, set(keys), {})
+        return root == "["
+
+
+def iter_cards(path: Path, whole_root: bool = False) -> Iterator[dict]:
+    """Yield the cards of a deck one at a time (see `iter_json_items`)."""
+    return iter_json_items(path, DECK_KEYS, whole_root)
+
+
+def write_cards(path: Path, cards: Iterable[dict], fmt: str = "object") -> int:
+    """Stream cards back out in a deck format from `deck_format`.
+
+    Writes through a temporary file, so `cards` may be a stream over the
+    very file being replaced. Returns the number of cards written.
+    """
+    if fmt == "lines":
+        return write_json_lines(path, cards)
+    return write_json_array(path, cards, key="cards" if fmt == "object" else None)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from src.utils.env import get_env
 
@@ -16,3 +17,13 @@ def get_data_path(filename: str = "") -> Path:
     base = Path("data") / env
     base.mkdir(parents=True, exist_ok=True)
     return base / filename if filename else base
+
+
+def get_store_path(filename: str = "") -> Path:
+    """Get a path inside the environment-independent SRD store (data/store/).
+
+    Set DMFORGE_STORE_DIR to keep the store somewhere else.
+    """
+    base = Path(os.getenv("DMFORGE_STORE_DIR") or Path("data") / "store")
+    base.mkdir(parents=True, exist_ok=True)
+    return base / filename if filename else base
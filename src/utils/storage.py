@@ -0,0 +1,123 @@
+# src/utils/storage.py
+
+"""Helpers for reading and writing cached data files safely.
+
+A cache such as `traits.json` may be stored Brotli-compressed as
+`traits.json.br`. Callers keep using the plain name; `cached_file` and
+`read_json` find whichever variant is on disk.
+"""
+
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import brotli
+
+BROTLI_SUFFIX = ".br"
+BROTLI_QUALITY = 9  # 11 is ~10x slower for a few percent smaller files
+
+
+def compressed_path(path: Path) -> Path:
+    """Return the Brotli variant of a cache path (traits.json → traits.json.br)."""
+    return path.with_name(f"{path.name}{BROTLI_SUFFIX}")
+
+
+def cached_file(path: Path) -> Optional[Path]:
+    """Return the plain or compressed file stored for `path`, or None."""
+    for candidate in (path, compressed_path(path)):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def read_json(path: Path) -> Any:
+    """Load a cache written by `write_json_array`, compressed or not.
+
+    Raises:
+        FileNotFoundError: If neither variant exists
+    """
+    found = cached_file(path)
+    if found is None:
+        raise FileNotFoundError(path)
+    data = found.read_bytes()
+    if found.suffix == BROTLI_SUFFIX:
+        data = brotli.decompress(data)
+    return json.loads(data)
+
+
+def write_json_array(
+    path: Path,
+    items: Iterable,
+    indent: int = 2,
+    compress: bool = False,
+    key: Optional[str] = None,
+) -> int:
+    """Stream items into a JSON array file and return how many were written.
+
+    Items are serialized one at a time, so memory use does not grow with
+    the size of the collection. Output matches `json.dumps(items,
+    indent=indent)`, or `json.dumps({key: items}, indent=indent)` when
+    `key` is given. The file is written to a temporary sibling and then
+    moved into place, so readers never see a half-written file.
+
+    With `compress`, compact JSON is streamed through Brotli into
+    `<path>.br` instead. Whichever variant is not written is removed so
+    a stale copy can never shadow the new one.
+    """
+    if compress:
+        return _write_compressed(path, items)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    pad = " " * indent
+    head, tail = "[", "]"
+    if key is not None:
+        head = "{\n" + pad + json.dumps(key) + ": ["
+        tail, pad = "]\n}", pad * 2
+    count = 0
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(head)
+        for item in items:
+            f.write(",\n" if count else "\n")
+            f.write(textwrap.indent(json.dumps(item, indent=indent), pad))
+            count += 1
+        if count:
+            f.write("\n" + pad[indent:])
+        f.write(tail)
+    os.replace(tmp_path, path)
+    compressed_path(path).unlink(missing_ok=True)
+    return count
+
+
+def write_json_lines(path: Path, items: Iterable) -> int:
+    """Stream items into a JSON Lines file (one compact object per line)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    count = 0
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def _write_compressed(path: Path, items: Iterable) -> int:
+    target = compressed_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.tmp")
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    count = 0
+    with tmp_path.open("wb") as f:
+        f.write(compressor.process(b"["))
+        for item in items:
+            chunk = ("," if count else "") + json.dumps(item, separators=(",", ":"))
+            f.write(compressor.process(chunk.encode("utf-8")))
+            count += 1
+        f.write(compressor.process(b"]"))
+        f.write(compressor.finish())
+    os.replace(tmp_path, target)
+    path.unlink(missing_ok=True)
+    return count
@@ -1,13 +1,75 @@
 # src/utils/summarizer.py
 
+import json
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
 from dotenv import load_dotenv
 import openai
+from src.utils.http import HOST_RATES, TokenBucket, configure_host, send
+from src.utils.summary_cache import get_summary_cache, summary_key
 
 load_dotenv()
 
 MAX_CHAR_COUNT = 250
+OPENAI_HOST = "api.openai.com"
+MODEL = "gpt-3.5-turbo"
+# Bump when the prompt changes so cached summaries are not reused
+PROMPT_VERSION = 1
+
+# Default API budget in requests and tokens per minute (the model's
+# account limits) and summaries in flight; see `configure_budget`
+DEFAULT_RPM = 3500
+DEFAULT_TPM = 200_000
+DEFAULT_CONCURRENCY = 16
+# Rough characters per token, for estimating a request's token cost
+CHARS_PER_TOKEN = 4
+
+# Batched requests: descriptions per request, and token limits that keep
+# each request well inside the model's context and answer size
+DEFAULT_BATCH_SIZE = 20
+BATCH_INPUT_TOKENS = 8000
+BATCH_OUTPUT_TOKENS = 3000
+# Answer tokens per summary spent on its JSON wrapper
+BATCH_ITEM_OVERHEAD = 12
+
+HOST_RATES.setdefault(OPENAI_HOST, DEFAULT_RPM / 60)
+# A whole minute's tokens may be spent at once, as the API allows
+_tokens = TokenBucket(DEFAULT_TPM / 60, DEFAULT_TPM)
+_concurrency = DEFAULT_CONCURRENCY
+_batch_size = DEFAULT_BATCH_SIZE
+
+
+def configure_budget(
+    concurrency: Optional[int] = None,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None,
+    batch_size: Optional[int] = None,
+) -> None:
+    """Set how many summary requests run at once and the per-minute API budget.
+
+    Requests per minute go to the shared HTTP rate limiter for the OpenAI
+    host; tokens per minute are metered here, before each request.
+    `batch_size` caps the descriptions sent per request (1 sends each
+    description on its own).
+    """
+    global _concurrency, _batch_size
+    if concurrency is not None:
+        _concurrency = max(1, concurrency)
+    if batch_size is not None:
+        _batch_size = max(1, batch_size)
+    if rpm is not None:
+        configure_host(OPENAI_HOST, rate=rpm / 60)
+    if tpm is not None:
+        with _tokens.lock:
+            _tokens.rate, _tokens.burst = tpm / 60, tpm
+            _tokens.tokens = min(_tokens.tokens, _tokens.burst)
+
+
+def estimate_tokens(text: str, max_length: int, prompt: str = "") -> int:
+    """Estimate the tokens one request costs: prompt, text and answer."""
+    return (len(prompt) + len(text)) // CHARS_PER_TOKEN + int(max_length * 0.25)
 
 
 def summarize_text(text: str, max_length: int = MAX_CHAR_COUNT) -> str:
@@ -15,12 +77,24 @@ def summarize_text(text: str, max_length: int = MAX_CHAR_COUNT) -> str:
     Summarize a block of text to fit within max_length characters,
     falling back to simple truncation if no API key is present
     or if the OpenAI call fails.
+
+    Summaries are cached on disk (see `summary_cache.py`), so the same
+    text is only ever sent once; truncation fallbacks are not cached.
     """
     if len(text) <= max_length:
         return text
 
+    cache = get_summary_cache()
+    key = summary_key(text, max_length, MODEL, PROMPT_VERSION)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        return cached
+    return _summarize_uncached(text, max_length)
+
+
+def _summarize_uncached(text: str, max_length: int) -> str:
+    """Summarize a text `summarize_text` found no cached summary for."""
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
-    print("🔑 api_key loaded:", repr(api_key))  # ← you should see your key!
     if not api_key:
         logging.warning("⚠️ falling back to truncation")
         truncated = text[: max_length - 3].rstrip()
@@ -32,22 +106,201 @@ def summarize_text(text: str, max_length: int = MAX_CHAR_COUNT) -> str:
             "You are a D&D assistant. Summarize the following spell description "
             f"into a single concise paragraph no more than {max_length} characters."
         )
-        resp = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text},
-            ],
-            temperature=0.7,
-            max_tokens=int(max_length * 0.25),
+        _tokens.acquire(estimate_tokens(text, max_length, system_prompt))
+        resp = send(
+            OPENAI_HOST,
+            lambda: openai.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": text},
+                ],
+                temperature=0.7,
+                max_tokens=int(max_length * 0.25),
+            ),
+            retry_on=(openai.APIConnectionError,),
         )
         summary = resp.choices[0].message.content.strip()
 
         if len(summary) > max_length:
             summary = summary[: max_length - 3].rstrip() + "..."
+        cache = get_summary_cache()
+        if cache is not None:
+            cache.put(summary_key(text, max_length, MODEL, PROMPT_VERSION), summary)
         return summary
 
     except Exception as e:
         logging.error(f"❌ OpenAI summarization failed: {e}")
         truncated = text[: max_length - 3].rstrip()
         return truncated + "..."
+
+
+def summarize_many(
+    texts: Iterable[str],
+    max_length: int = MAX_CHAR_COUNT,
+    concurrency: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> list:
+    """Summarize every text with up to `concurrency` requests in flight.
+
+    Results come back in the same order as `texts`. Short and cached
+    texts cost no request. The rest are packed into batched requests of
+    up to `batch_size` descriptions (see `summarize_batch`). Each text is
+    looked up in the cache once. Without an API key, or with a batch size
+    of 1, each text goes through `summarize_text` on its own. Requests stay within the budget set by
+    `configure_budget`.
+    """
+    texts = list(texts)
+    batch_size = batch_size or _batch_size
+    results: list = list(texts)
+    pending = [i for i, text in enumerate(texts) if len(text) > max_length]
+    batched = batch_size > 1 and os.getenv("OPENAI_API_KEY", "").strip()
+    if batched and pending:
+        cache = get_summary_cache()
+        if cache is not None:
+            uncached = []
+            for i in pending:
+                cached = cache.get(
+                    summary_key(texts[i], max_length, MODEL, PROMPT_VERSION)
+                )
+                if cached is None:
+                    uncached.append(i)
+                else:
+                    results[i] = cached
+            pending = uncached
+        batches = pack_batches([texts[i] for i in pending], max_length, batch_size)
+        jobs = [[pending[j] for j in batch] for batch in batches]
+    else:
+        jobs = [[i] for i in pending]
+
+    def run(rows: list) -> list:
+        if not batched:
+            return [summarize_text(texts[rows[0]], max_length)]
+        if len(rows) == 1:
+            return [_summarize_uncached(texts[rows[0]], max_length)]
+        return summarize_batch([texts[i] for i in rows], max_length)
+
+    workers = min(max(1, concurrency or _concurrency), len(jobs))
+    if workers <= 1:
+        outputs = [run(rows) for rows in jobs]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="summarize"
+        ) as pool:
+            outputs = list(pool.map(run, jobs))
+    for rows, summaries in zip(jobs, outputs):
+        for i, summary in zip(rows, summaries):
+            results[i] = summary
+    return results
+
+
+def pack_batches(texts: list, max_length: int, batch_size: int) -> list:
+    """Group text positions into consecutive batches for `summarize_batch`.
+
+    A batch holds at most `batch_size` texts, and its estimated prompt
+    and answer stay under BATCH_INPUT_TOKENS and BATCH_OUTPUT_TOKENS. A
+    text too large for any batch gets one of its own.
+    """
+    answer = int(max_length * 0.25) + BATCH_ITEM_OVERHEAD
+    batches: list = []
+    batch: list = []
+    used = 0
+    for i, text in enumerate(texts):
+        cost = len(text) // CHARS_PER_TOKEN + BATCH_ITEM_OVERHEAD
+        if batch and (
+            len(batch) >= batch_size
+            or used + cost > BATCH_INPUT_TOKENS
+            or (len(batch) + 1) * answer > BATCH_OUTPUT_TOKENS
+        ):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(i)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def parse_batch(content: str, count: int, max_length: int) -> dict:
+    """Read the summaries out of a batched answer, keyed by position.
+
+    Entries with an unknown id or a missing, empty or too long summary
+    are left out, so their texts can be summarized again on their own.
+
+    Raises:
+        ValueError: If the answer is not the expected JSON
+    """
+    data = json.loads(content)
+    entries = data.get("summaries") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("answer has no list of summaries")
+    summaries = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        position, summary = entry.get("id"), entry.get("summary")
+        if (
+            isinstance(position, int)
+            and 0 <= position < count
+            and isinstance(summary, str)
+            and 0 < len(summary.strip()) <= max_length
+        ):
+            summaries[position] = summary.strip()
+    return summaries
+
+
+def summarize_batch(texts: list, max_length: int = MAX_CHAR_COUNT) -> list:
+    """Summarize several texts with one chat completion.
+
+    The texts are sent as a JSON array of {"id", "text"} objects, and the
+    model answers with a JSON object of {"id", "summary"} entries. Valid
+    summaries are cached like `summarize_text`'s. The texts should
+    already have missed the cache. Any text whose summary is missing or
+    invalid, or all of them if the request fails, is sent again on its
+    own, without another cache lookup.
+    """
+    system_prompt = (
+        "You are a D&D assistant. Summarize each spell description into a "
+        f"single concise paragraph of no more than {max_length} characters. "
+        'The descriptions are a JSON array of {"id", "text"} objects. Answer '
+        'with a JSON object {"summaries": [{"id": <id>, "summary": <text>}]} '
+        "holding one entry for every id."
+    )
+    payload = json.dumps([{"id": i, "text": text} for i, text in enumerate(texts)])
+    answer_tokens = len(texts) * (int(max_length * 0.25) + BATCH_ITEM_OVERHEAD)
+    summaries: dict = {}
+    openai.api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    try:
+        _tokens.acquire(
+            (len(system_prompt) + len(payload)) // CHARS_PER_TOKEN + answer_tokens
+        )
+        resp = send(
+            OPENAI_HOST,
+            lambda: openai.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": payload},
+                ],
+                temperature=0.7,
+                max_tokens=answer_tokens,
+                response_format={"type": "json_object"},
+            ),
+            retry_on=(openai.APIConnectionError,),
+        )
+        summaries = parse_batch(resp.choices[0].message.content, len(texts), max_length)
+    except Exception as e:
+        logging.error(f"❌ Batched summarization of {len(texts)} texts failed: {e}")
+
+    cache = get_summary_cache()
+    results = []
+    for i, text in enumerate(texts):
+        if i not in summaries:
+            results.append(_summarize_uncached(text, max_length))
+            continue
+        if cache is not None:
+            cache.put(
+                summary_key(text, max_length, MODEL, PROMPT_VERSION), summaries[i]
+            )
+        results.append(summaries[i])
+    return results
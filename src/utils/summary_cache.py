@@ -0,0 +1,129 @@
+# src/utils/summary_cache.py
+
+"""Persistent cache of LLM spell summaries.
+
+Summaries are stored in a small SQLite database in the SRD store
+(data/store/summaries.sqlite; see `get_store_path`), so every
+environment shares them. An entry is keyed by a hash of the prompt
+version, model, length limit and source text, so changing any of these
+misses the cache. Rebuilding or re-rendering an unchanged deck makes no
+API calls.
+
+Each hit stamps the entry's `used` time, and stores evict the least
+recently used entries once the cache grows past `max_entries`.
+Lookups are counted as hits and misses for reporting.
+
+Set DMFORGE_SUMMARY_CACHE=off to bypass the cache.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.utils.paths import get_store_path
+
+DEFAULT_MAX_ENTRIES = 50_000
+CACHE_NAME = "summaries.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summaries_used ON summaries (used);
+"""
+
+
+def summary_key(text: str, max_length: int, model: str, prompt_version: int) -> str:
+    """Return the cache key for one summarization request."""
+    return hashlib.sha256(
+        f"{prompt_version}\n{model}\n{max_length}\n{text}".encode("utf-8")
+    ).hexdigest()
+
+
+class SummaryCache:
+    """A size-capped SQLite store of summaries at `path`."""
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary for a key (counting a hit or miss), or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT summary FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE summaries SET used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key: str, summary: str) -> None:
+        """Store a summary, evicting the oldest entries if over the cap."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+                (key, summary, time.time()),
+            )
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()
+            if count > self.max_entries:
+                # Drop down to 90% of the cap so eviction isn't paid on every put
+                self.conn.execute(
+                    "DELETE FROM summaries WHERE key IN ("
+                    "SELECT key FROM summaries ORDER BY used LIMIT ?)",
+                    (count - int(self.max_entries * 0.9),),
+                )
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Return this process's hits and misses and the number of entries."""
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self.lock:
+            self.conn.execute("DELETE FROM summaries")
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_cache: Optional[SummaryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Return the process-wide summary cache, or None if it is turned off.
+
+    The cache is reopened if the store folder changes (DMFORGE_STORE_DIR).
+    """
+    global _cache
+    if os.getenv("DMFORGE_SUMMARY_CACHE", "").lower() == "off":
+        return None
+    path = get_store_path(CACHE_NAME)
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = SummaryCache(path)
+        return _cache
@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(monkeypatch, tmp_path):
+    """Keep the shared SRD store out of the repo and separate per test."""
+    monkeypatch.setenv("DMFORGE_STORE_DIR", str(tmp_path / "store"))
@@ -3,6 +3,7 @@ from pathlib import Path
 import pytest
 
 from src.deck_forge.art import generate_art_for_deck
+from src.utils import http_cache
 
 DUMMY_CARD = {
     "title": "My Spell",
@@ -120,7 +121,7 @@ def test_successful_generation(tmp_path, monkeypatch, capsys):
     )
     monkeypatch.setattr(
         "src.deck_forge.art.requests.get",
-        lambda url: type("R", (object,), {"content": b"PNGDATA"}),
+        lambda url, timeout: type("R", (object,), {"content": b"PNGDATA"}),
     )
     # run
     generate_art_for_deck(
@@ -174,3 +175,30 @@ def write_minimal_deck(path: Path):
         }
     ]
     path.write_text(json.dumps({"cards": test_cards}, indent=2))
+
+
+def test_image_downloads_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "key")
+    deck = tmp_path / "deck.json"
+    deck.write_text(json.dumps({"cards": [DUMMY_CARD]}), encoding="utf-8")
+    cache = http_cache.configure("record", root=tmp_path / "http-cache")
+
+    class FakePost:
+        status_code = 200
+
+        def json(self):
+            return {"data": [{"url": "https://example.com/signed.png?sig=1"}]}
+
+    monkeypatch.setattr(
+        "src.deck_forge.art.requests.post", lambda *args, **kwargs: FakePost()
+    )
+    monkeypatch.setattr(
+        "src.deck_forge.art.requests.get",
+        lambda url, timeout: type("R", (object,), {"content": b"PNGDATA"}),
+    )
+    try:
+        generate_art_for_deck(deck, tmp_path / "art", version="v1")
+    finally:
+        http_cache.configure("off")
+    assert (tmp_path / "art" / "My_Spell_v1.png").read_bytes() == b"PNGDATA"
+    assert cache.size() == 0
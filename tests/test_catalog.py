@@ -0,0 +1,178 @@
+# tests/test_catalog.py
+
+import json
+import pytest
+from src.catalog.columns import SpellTable
+from src.catalog.spells import SpellCatalog, catalog_path, load_catalog
+from src.deck_forge.schema import spell_to_card
+
+SPELLS = [
+    {
+        "index": "bless",
+        "name": "Bless",
+        "level": 1,
+        "school": "Enchantment",
+        "classes": ["Cleric", "Paladin"],
+        "duration": "Concentration, up to 1 minute",
+        "desc": ["You bless up to three creatures."],
+    },
+    {
+        "index": "alarm",
+        "name": "Alarm",
+        "level": 1,
+        "school": "Abjuration",
+        "classes": ["Wizard", "Ranger"],
+        "duration": "8 hours",
+        "ritual": True,
+        "components": ["V", "S", "M"],
+        "casting_time": "1 minute",
+        "desc": ["You set an alarm."],
+    },
+    {
+        "index": "fireball",
+        "name": "Fireball",
+        "level": 3,
+        "school": "Evocation",
+        "classes": ["Wizard", "Sorcerer"],
+        "duration": "Instantaneous",
+        "components": ["V", "S"],
+        "casting_time": "1 action",
+        "desc": ["A bright streak flashes."],
+    },
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(SPELLS), encoding="utf-8")
+    return path
+
+
+def test_missing_source_returns_none(tmp_path):
+    assert SpellCatalog.open(tmp_path / "spells.json") is None
+
+
+def test_get_by_index_or_name(source):
+    with SpellCatalog.open(source) as catalog:
+        assert len(catalog) == 3
+        assert catalog.get("fireball")["name"] == "Fireball"
+        assert catalog.get("FIREBALL")["index"] == "fireball"
+        assert catalog.get("wish") is None
+    assert catalog_path(source).exists()
+
+
+def test_query_filters_keep_source_order(source):
+    with SpellCatalog.open(source) as catalog:
+        assert [s["index"] for s in catalog.query(classes=["wizard"])] == [
+            "alarm",
+            "fireball",
+        ]
+        assert [
+            s["index"] for s in catalog.query(levels=[1], schools=["ABJURATION"])
+        ] == ["alarm"]
+        assert [s["index"] for s in catalog.query(concentration=True)] == ["bless"]
+        assert [s["index"] for s in catalog.query(ritual=True)] == ["alarm"]
+        assert [s["index"] for s in catalog.query(limit=2)] == ["bless", "alarm"]
+
+
+def test_query_where_expression(source):
+    with SpellCatalog.open(source) as catalog:
+        assert [s["index"] for s in catalog.query(where="components!~M")] == [
+            "bless",
+            "fireball",
+        ]
+        assert [
+            s["index"]
+            for s in catalog.query(
+                classes=["wizard"], where='casting_time="1 minute" or level>2'
+            )
+        ] == ["alarm", "fireball"]
+        assert catalog.preview(where="not concentration")["count"] == 2
+        with pytest.raises(ValueError):
+            catalog.query(where="level<<3")
+
+
+def test_catalog_rebuilds_when_source_changes(source):
+    with SpellCatalog.open(source) as catalog:
+        assert catalog.get("shield") is None
+
+    source.write_text(
+        json.dumps(SPELLS + [{"index": "shield", "name": "Shield", "level": 1}]),
+        encoding="utf-8",
+    )
+    with SpellCatalog.open(source) as catalog:
+        assert len(catalog) == 4
+        assert catalog.get("shield")["level"] == 1
+
+
+def test_catalog_uses_index_for_class_lookups(source):
+    with SpellCatalog.open(source) as catalog:
+        plan = catalog.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT idx FROM spell_classes WHERE class = 'wizard'"
+        ).fetchall()
+    assert any("USING PRIMARY KEY" in row[-1] or "COVERING" in row[-1] for row in plan)
+
+
+def test_load_catalog_is_shared_until_source_changes(source):
+    first = load_catalog(source)
+    assert load_catalog(source) is first
+    assert first.get("bless") is first.all()[0]  # decoded once, shared
+
+    source.write_text(json.dumps(SPELLS[:1]), encoding="utf-8")
+    second = load_catalog(source)
+    assert second is not first
+    assert len(second) == 1
+
+
+def test_records_are_frozen(source):
+    spell = load_catalog(source).get("bless")
+    with pytest.raises(TypeError):
+        spell["level"] = 9
+    assert spell["classes"] == ("Cleric", "Paladin")
+
+    card = spell_to_card(spell, summarize=False)
+    assert card["title"] == "Bless"
+    assert card["description"] == "You bless up to three creatures."
+
+
+def test_filter_table_is_loaded_from_snapshot(source, monkeypatch):
+    with SpellCatalog.open(source):
+        pass
+    snapshot = catalog_path(source).with_suffix(".snapshot")
+    assert snapshot.exists()
+
+    def no_scan(conn):
+        raise AssertionError("table rebuilt from SQLite")
+
+    monkeypatch.setattr(SpellTable, "from_connection", staticmethod(no_scan))
+    with SpellCatalog.open(source) as catalog:
+        assert [s["index"] for s in catalog.query(classes=["wizard"])] == [
+            "alarm",
+            "fireball",
+        ]
+
+
+def test_unreadable_snapshot_falls_back_to_catalog(source):
+    with SpellCatalog.open(source):
+        pass
+    snapshot = catalog_path(source).with_suffix(".snapshot")
+    snapshot.write_bytes(b"garbage")
+    with SpellCatalog.open(source) as catalog:
+        assert [s["index"] for s in catalog.query(levels=[3])] == ["fireball"]
+    assert snapshot.read_bytes().startswith(b"DMFT")
+
+
+def test_preview_counts_without_building_cards(source):
+    with SpellCatalog.open(source) as catalog:
+        preview = catalog.preview(classes=["wizard"], samples=1)
+        assert preview["count"] == 2
+        assert preview["samples"] == ["Alarm"]
+        assert preview["facets"]["level"] == {1: 1, 3: 1}
+
+        assert catalog.preview(classes=["wizard"], levels=[2])["count"] == 0
+
+        ranked = catalog.preview(text="streak")
+        assert ranked["count"] == 1
+        assert ranked["samples"] == ["Fireball"]
+        assert ranked["facets"]["school"] == {"evocation": 1}
@@ -0,0 +1,150 @@
+# tests/test_cli_catalog.py
+
+import json
+
+from typer.testing import CliRunner
+
+from src.cli import app
+from src.cli.deck import deck_app
+from src.deck_forge.generate import open_spell_catalog
+
+runner = CliRunner()
+
+SPELLS = [
+    {
+        "index": "alarm",
+        "name": "Alarm",
+        "level": 1,
+        "school": "Abjuration",
+        "classes": ["Wizard"],
+        "ritual": True,
+    },
+    {
+        "index": "bless",
+        "name": "Bless",
+        "level": 1,
+        "school": "Enchantment",
+        "classes": ["Cleric"],
+        "duration": "Concentration, up to 1 minute",
+    },
+    {
+        "index": "shield",
+        "name": "Shield",
+        "level": 1,
+        "school": "Abjuration",
+        "classes": ["Wizard", "Sorcerer"],
+    },
+]
+
+
+def use_spells(monkeypatch, tmp_path):
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(SPELLS), encoding="utf-8")
+    monkeypatch.setattr("src.deck_forge.generate.get_data_path", lambda filename: path)
+
+
+def test_facets_reports_counts_and_samples(monkeypatch, tmp_path):
+    use_spells(monkeypatch, tmp_path)
+    result = runner.invoke(
+        app, ["catalog", "facets", "--class", "wizard", "--no-ritual"]
+    )
+    assert result.exit_code == 0
+    assert "1 matching spell(s)" in result.stdout
+    assert "Shield" in result.stdout
+    assert "Alarm" not in result.stdout
+
+
+def test_facets_missing_cache_exits(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "src.deck_forge.generate.get_data_path", lambda filename: tmp_path / filename
+    )
+    result = runner.invoke(app, ["catalog", "facets"])
+    assert result.exit_code == 1
+
+
+def test_build_dry_run_writes_nothing(monkeypatch, tmp_path):
+    use_spells(monkeypatch, tmp_path)
+    monkeypatch.setattr(
+        "src.cli.deck.generate_spell_deck",
+        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("built")),
+    )
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            deck_app, ["build", "--class", "wizard", "--level", "2", "--dry-run"]
+        )
+    assert result.exit_code == 0
+    assert "No matching spells found." in result.stdout
+
+    result = runner.invoke(deck_app, ["build", "--level", "1", "-n", "2", "--dry-run"])
+    assert "3 matching spell(s); a deck would include 2." in result.stdout
+
+
+def use_duplicate_walls(monkeypatch, tmp_path):
+    text = "A shimmering wall of force springs into existence around you and holds."
+    spells = SPELLS + [
+        {"index": "wall", "name": "Wall", "desc": [text]},
+        {"index": "wall-2", "name": "Homebrew Wall", "desc": [text + " Or not."]},
+    ]
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(spells), encoding="utf-8")
+    monkeypatch.setattr("src.deck_forge.generate.get_data_path", lambda filename: path)
+
+
+def test_duplicates_lists_clusters(monkeypatch, tmp_path):
+    use_duplicate_walls(monkeypatch, tmp_path)
+    result = runner.invoke(app, ["catalog", "duplicates"])
+    assert result.exit_code == 0
+    assert "Homebrew Wall" in result.stdout
+    assert "1 cluster(s)" in result.stdout
+
+
+def test_build_drops_duplicates_unless_asked(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "src.cli.deck.generate_spell_deck",
+        lambda *args, **kwargs: calls.append(kwargs["distinct"]) or "",
+    )
+    runner.invoke(deck_app, ["build"])
+    runner.invoke(deck_app, ["build", "--keep-duplicates"])
+    assert calls == [True, False]
+
+
+def test_build_dry_run_counts_the_cards_a_build_would_write(monkeypatch, tmp_path):
+    use_duplicate_walls(monkeypatch, tmp_path)
+    built = len(open_spell_catalog().query(distinct=True))
+    result = runner.invoke(deck_app, ["build", "--dry-run"])
+    assert f"{built} matching spell(s)" in result.stdout
+    assert "Homebrew Wall" not in result.stdout
+
+    result = runner.invoke(deck_app, ["build", "--dry-run", "--keep-duplicates"])
+    assert f"{built + 1} matching spell(s)" in result.stdout
+
+
+def test_related_lists_neighbours(monkeypatch, tmp_path):
+    spells = SPELLS + [
+        {"index": "ward", "name": "Ward", "desc": ["An alarm rings."]},
+        {"index": "bell", "name": "Bell", "desc": ["The alarm bell rings."]},
+    ]
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(spells), encoding="utf-8")
+    monkeypatch.setattr("src.deck_forge.generate.get_data_path", lambda filename: path)
+    result = runner.invoke(app, ["catalog", "related", "ward"])
+    assert result.exit_code == 0
+    assert "Bell" in result.stdout
+
+    result = runner.invoke(app, ["catalog", "related", "nope"])
+    assert result.exit_code == 1
+
+
+def test_where_expression_filters_and_reports_errors(monkeypatch, tmp_path):
+    use_spells(monkeypatch, tmp_path)
+    result = runner.invoke(
+        app, ["catalog", "facets", "--where", "class=wizard and not ritual"]
+    )
+    assert result.exit_code == 0
+    assert "1 matching spell(s)" in result.stdout
+    assert "Shield" in result.stdout
+
+    result = runner.invoke(deck_app, ["build", "--where", "level<", "--dry-run"])
+    assert result.exit_code == 1
+    assert "Invalid filter" in result.stdout
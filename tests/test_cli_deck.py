@@ -3,6 +3,8 @@
 import json
 from pathlib import Path
 
+import pytest
+
 from typer.testing import CliRunner
 
 from src.cli.deck import deck_app
@@ -21,7 +23,15 @@ def write_minimal_deck(path: Path):
 
 def test_build_success(monkeypatch):
     def fake_gen(
-        output_name, limit, class_filter, level_filter, school_filter, interactive
+        output_name,
+        limit,
+        class_filter,
+        level_filter,
+        school_filter,
+        interactive,
+        query=None,
+        distinct=False,
+        where=None,
     ):
         Path(output_name).write_text(
             json.dumps(
@@ -182,3 +192,20 @@ def test_art_invokes_generator(monkeypatch):
     assert captured["suffix"] == "bonus"
     assert captured["style"] == "elf"
     assert captured["version"] == "v2"
+
+
+@pytest.mark.parametrize("command", ["build", "compose", "render"])
+def test_summary_budget_options_apply_to_every_summarizing_command(
+    monkeypatch, tmp_path, command
+):
+    applied = []
+    monkeypatch.setattr(
+        "src.cli.deck.configure_budget", lambda **kwargs: applied.append(kwargs)
+    )
+    monkeypatch.setattr("src.cli.deck.generate_spell_deck", lambda **kwargs: None)
+    monkeypatch.setattr("src.cli.deck.compose_spell_deck", lambda **kwargs: None)
+    args = [command, "-j", "3", "--rpm", "60", "--tpm", "600", "--batch-size", "5"]
+    if command == "render":
+        args.append(str(tmp_path / "missing.json"))
+    runner.invoke(deck_app, args)
+    assert applied == [{"concurrency": 3, "rpm": 60, "tpm": 600, "batch_size": 5}]
@@ -1,5 +1,6 @@
 # tests/test_cli_fetch.py
 
+import threading
 import pytest
 from typer.testing import CliRunner
 
@@ -36,15 +37,15 @@ def test_single_flag_calls_only_that(monkeypatch, flags, expected_calls):
     # Patch the CLI-level imports in src.cli.fetch
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_spells",
-        lambda force=False: calls.append(("spells", force)),
+        lambda force=False, **kwargs: calls.append(("spells", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_traits",
-        lambda force=False: calls.append(("traits", force)),
+        lambda force=False, **kwargs: calls.append(("traits", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_features",
-        lambda force=False: calls.append(("features", force)),
+        lambda force=False, **kwargs: calls.append(("features", force)),
     )
 
     result = runner.invoke(app, ["fetch", "srd"] + flags)
@@ -60,15 +61,15 @@ def test_force_flag_passed_to_generator(monkeypatch):
     calls = []
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_traits",
-        lambda force=False: calls.append(("traits", force)),
+        lambda force=False, **kwargs: calls.append(("traits", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_spells",
-        lambda force=False: calls.append(("spells", force)),
+        lambda force=False, **kwargs: calls.append(("spells", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_features",
-        lambda force=False: calls.append(("features", force)),
+        lambda force=False, **kwargs: calls.append(("features", force)),
     )
 
     result = runner.invoke(app, ["fetch", "srd", "--traits", "--force"])
@@ -79,39 +80,80 @@ def test_force_flag_passed_to_generator(monkeypatch):
 def test_all_flag_calls_everything(monkeypatch):
     """
     The --all flag should invoke all three fetch functions with `force=True`.
+    They run concurrently, so only the set of calls is checked.
     """
     calls = []
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_spells",
-        lambda force=False: calls.append(("spells", force)),
+        lambda force=False, **kwargs: calls.append(("spells", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_traits",
-        lambda force=False: calls.append(("traits", force)),
+        lambda force=False, **kwargs: calls.append(("traits", force)),
     )
     monkeypatch.setattr(
         "src.cli.fetch.fetch_srd_features",
-        lambda force=False: calls.append(("features", force)),
+        lambda force=False, **kwargs: calls.append(("features", force)),
     )
 
     result = runner.invoke(app, ["fetch", "srd", "--all", "--force"])
     assert result.exit_code == 0
-    assert calls == [("spells", True), ("traits", True), ("features", True)]
+    assert sorted(calls) == [("features", True), ("spells", True), ("traits", True)]
     assert "✅ All requested content downloaded" in result.stdout
 
 
+def test_all_flag_runs_collections_concurrently(monkeypatch):
+    """
+    Each collection waits for the other two, which only works if all three run at once.
+    """
+    barrier = threading.Barrier(3, timeout=5)
+    seen = []
+
+    def fetcher(name):
+        def run(progress=None, **kwargs):
+            barrier.wait()
+            seen.append((name, progress is not None))
+
+        return run
+
+    for name in ("spells", "traits", "features"):
+        monkeypatch.setattr(f"src.cli.fetch.fetch_srd_{name}", fetcher(name))
+
+    result = runner.invoke(app, ["fetch", "srd", "--all"])
+    assert result.exit_code == 0
+    assert sorted(seen) == [("features", True), ("spells", True), ("traits", True)]
+
+
 def test_exception_propagates_and_logs(monkeypatch):
     """
     If a fetch function raises, the CLI should log an error and exit non-zero.
     """
 
-    def boom(force=False):
+    def boom(force=False, **kwargs):
         raise RuntimeError("boom")
 
     monkeypatch.setattr("src.cli.fetch.fetch_srd_spells", boom)
-    monkeypatch.setattr("src.cli.fetch.fetch_srd_traits", lambda force=False: None)
-    monkeypatch.setattr("src.cli.fetch.fetch_srd_features", lambda force=False: None)
+    monkeypatch.setattr(
+        "src.cli.fetch.fetch_srd_traits", lambda force=False, **kwargs: None
+    )
+    monkeypatch.setattr(
+        "src.cli.fetch.fetch_srd_features", lambda force=False, **kwargs: None
+    )
 
     result = runner.invoke(app, ["fetch", "srd", "--spells"])
     assert result.exit_code != 0
     assert "Failed to fetch content: boom" in result.stdout
+
+
+def test_local_imports_selected_kinds(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(
+        "src.cli.fetch.import_local",
+        lambda kind, **kwargs: calls.append((kind, kwargs["data_dir"])),
+    )
+
+    result = runner.invoke(
+        app, ["fetch", "local", "--spells", "--features", "--path", str(tmp_path)]
+    )
+    assert result.exit_code == 0
+    assert calls == [("spells", tmp_path), ("features", tmp_path)]
@@ -0,0 +1,103 @@
+# tests/test_columns.py
+
+import random
+from src.catalog.columns import SpellTable
+
+ROWS = [
+    # position, idx, level, school, concentration, ritual
+    (0, "bless", 1, "enchantment", 1, 0),
+    (2, "fireball", 3, "evocation", 0, 0),
+    (1, "alarm", 1, "abjuration", 0, 1),
+    (3, "wish", None, "conjuration", 0, 0),
+]
+CLASSES = [
+    ("cleric", "bless"),
+    ("paladin", "bless"),
+    ("wizard", "alarm"),
+    ("wizard", "fireball"),
+    ("sorcerer", "fireball"),
+    ("wizard", "not-in-catalog"),
+]
+
+
+def test_rows_are_ordered_by_position():
+    table = SpellTable(ROWS, CLASSES)
+    assert table.idx == ["bless", "alarm", "fireball", "wish"]
+    assert table.rows(table.all) == [0, 1, 2, 3]
+    assert table.row(2) == 2
+
+
+def test_select_ors_within_and_ands_across_facets():
+    table = SpellTable(ROWS, CLASSES)
+
+    def names(**filters):
+        return [table.idx[row] for row in table.rows(table.select(**filters))]
+
+    assert names(classes=["WIZARD"]) == ["alarm", "fireball"]
+    assert names(classes=["cleric", "sorcerer"]) == ["bless", "fireball"]
+    assert names(classes=["wizard"], levels=[1]) == ["alarm"]
+    assert names(schools=["Evocation", "Abjuration"]) == ["alarm", "fireball"]
+    assert names(concentration=False, ritual=False) == ["fireball", "wish"]
+    assert names(classes=["bard"]) == []
+    assert names(levels=[9]) == []
+
+
+def test_rows_respect_limit_across_sparse_bytes():
+    table = SpellTable([(i, f"s{i}", 1, "evocation", 0, 0) for i in range(1000)], [])
+    mask = sum(1 << row for row in (3, 64, 65, 900))
+    assert table.rows(mask) == [3, 64, 65, 900]
+    assert table.rows(mask, limit=2) == [3, 64]
+    assert table.positions(mask) == {3, 64, 65, 900}
+
+
+def test_select_matches_a_per_spell_predicate():
+    rng = random.Random(1)
+    rows, classes = [], []
+    for i in range(500):
+        rows.append(
+            (i, f"s{i}", rng.randint(0, 9), rng.choice("abc"), rng.random() < 0.5, 0)
+        )
+        classes += [(cls, f"s{i}") for cls in rng.sample("xyz", rng.randint(0, 2))]
+    table = SpellTable(rows, classes)
+    owners = {}
+    for cls, idx in classes:
+        owners.setdefault(idx, set()).add(cls)
+
+    expected = [
+        i
+        for i, (_, idx, level, school, conc, _) in enumerate(rows)
+        if owners.get(idx, set()) & {"x"} and level in (1, 2) and school != "c" and conc
+    ]
+    mask = table.select(
+        classes=["x"], levels=[1, 2], schools=["a", "b"], concentration=True
+    )
+    assert table.rows(mask) == expected
+
+
+def test_snapshot_round_trip_checks_fingerprint(tmp_path):
+    table = SpellTable(ROWS, CLASSES)
+    path = tmp_path / "spells.snapshot"
+    table.save(path, "v1")
+
+    loaded = SpellTable.load(path, "v1")
+    assert loaded.idx == table.idx
+    assert loaded.select(classes=["wizard"], levels=[1]) == table.select(
+        classes=["wizard"], levels=[1]
+    )
+    assert loaded.row(3) == 3
+    assert SpellTable.load(path, "v2") is None
+    assert SpellTable.load(tmp_path / "missing.snapshot", "v1") is None
+
+
+def test_facet_counts_follow_the_mask():
+    table = SpellTable(ROWS, CLASSES)
+    assert table.facet_counts == {
+        "class": {"cleric": 1, "paladin": 1, "sorcerer": 1, "wizard": 2},
+        "level": {None: 1, 1: 2, 3: 1},
+        "school": {"abjuration": 1, "conjuration": 1, "enchantment": 1, "evocation": 1},
+        "concentration": {True: 1, False: 3},
+    }
+    wizard = table.facets(table.select(classes=["wizard"]))
+    assert wizard["class"] == {"sorcerer": 1, "wizard": 2}
+    assert wizard["level"] == {1: 1, 3: 1}
+    assert wizard["concentration"] == {True: 0, False: 2}
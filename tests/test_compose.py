@@ -0,0 +1,120 @@
+# tests/test_compose.py
+
+import json
+import random
+import pytest
+from typer.testing import CliRunner
+from src.catalog.columns import SpellTable
+from src.catalog.compose import allocate, parse_constraints
+from src.cli.deck import deck_app
+
+runner = CliRunner()
+
+SCHOOLS = ["abjuration", "evocation", "illusion", "necromancy"]
+
+
+def make_table(count=2000, seed=1):
+    rng = random.Random(seed)
+    rows = [
+        (
+            i,
+            f"spell-{i}",
+            rng.randint(0, 9),
+            rng.choice(SCHOOLS),
+            int(rng.random() < 0.5),
+            int(rng.random() < 0.1),
+            "".join(rng.sample("vsm", rng.randint(1, 3))),
+            "1 action",
+        )
+        for i in range(count)
+    ]
+    return SpellTable(rows, [("wizard", f"spell-{i}") for i in range(0, count, 3)])
+
+
+def deck_rows(table, size=None, seed=0, **specs):
+    constraints = parse_constraints(table, table.all, **specs)
+    return allocate(table, table.all, constraints, size, seed)
+
+
+def matching(table, rows, bits):
+    return sum(bits >> row & 1 for row in rows)
+
+
+def test_quotas_and_limits_are_met():
+    table = make_table()
+    rows = deck_rows(
+        table,
+        quotas=["4:level=0", "6:level=1"],
+        at_most=["2:concentration"],
+        each=["1:school"],
+    )
+    assert len(rows) == 10
+    assert matching(table, rows, table.level_bits[0]) == 4
+    assert matching(table, rows, table.level_bits[1]) == 6
+    assert matching(table, rows, table.concentration_bits) <= 2
+    for bits in table.school_bits.values():
+        assert matching(table, rows, bits) >= 1
+
+
+def test_same_seed_same_deck_and_extra_slots_are_filled():
+    table = make_table()
+    specs = {"quotas": ["3:level=2"], "at_least": ["2:class=wizard"]}
+    first = deck_rows(table, size=8, seed=7, **specs)
+    assert first == deck_rows(table, size=8, seed=7, **specs)
+    assert first != deck_rows(table, size=8, seed=8, **specs)
+    assert len(first) == 8
+    assert matching(table, first, table.level_bits[2]) == 3
+    assert matching(table, first, table.class_bits[0]) >= 2
+
+
+def test_shared_spells_cover_several_minimums():
+    table = make_table()
+    rows = deck_rows(table, quotas=["2:level=3"], at_least=["2:ritual"], size=2)
+    assert len(rows) == 2
+    assert matching(table, rows, table.ritual_bits) == 2
+
+
+@pytest.mark.parametrize(
+    "specs, message",
+    [
+        ({"quotas": ["3:level=0"], "at_most": ["0:level=0"]}, "Cannot pick 3"),
+        ({"quotas": ["3:level=0", "3:level=1"], "size": 4}, "too small"),
+        ({"quotas": ["5000:level<=9"]}, "Cannot pick 5000"),
+        ({"quotas": ["level=0"]}, "Expected COUNT:EXPRESSION"),
+        ({"each": ["1:duration"]}, "'each' takes class, school or level"),
+        ({"at_most": ["0:level>=0"], "size": 3}, "Only 0 spell"),
+    ],
+)
+def test_impossible_requests_are_reported(specs, message):
+    table = make_table(200)
+    size = specs.pop("size", None)
+    with pytest.raises(ValueError, match=message):
+        deck_rows(table, size=size, **specs)
+
+
+def test_compose_command_writes_deck(monkeypatch, tmp_path):
+    spells = [
+        {
+            "index": f"s{i}",
+            "name": f"Spell {i}",
+            "level": i % 3,
+            "school": SCHOOLS[i % 4],
+            "desc": [f"Spell number {i}."],
+        }
+        for i in range(30)
+    ]
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(spells), encoding="utf-8")
+    monkeypatch.setattr("src.deck_forge.generate.get_data_path", lambda filename: path)
+    output = tmp_path / "deck.json"
+    args = ["compose", "--output", str(output), "--quota", "2:level=0"]
+    result = runner.invoke(
+        deck_app, args + ["--each", "1:school", "--size", "5", "--seed", "3"]
+    )
+    assert result.exit_code == 0, result.stdout
+    cards = json.loads(output.read_text())["cards"]
+    assert len(cards) == 5
+
+    result = runner.invoke(deck_app, ["compose", "--quota", "2:level=7"])
+    assert result.exit_code == 1
+    assert "Cannot compose deck" in result.stdout
@@ -0,0 +1,223 @@
+# tests/test_dedupe.py
+
+import json
+import os
+import random
+import subprocess
+import sys
+from src.catalog import dedupe
+from src.catalog.dedupe import find_clusters, shingles, signature
+from src.catalog.spells import SpellCatalog
+
+FIREBALL = (
+    "A bright streak flashes from your pointing finger to a point you choose "
+    "within range and then blossoms with a low roar into an explosion of flame. "
+    "Each creature in a 20-foot-radius sphere centered on that point must make "
+    "a Dexterity saving throw. A target takes 8d6 fire damage on a failed save, "
+    "or half as much damage on a successful one."
+)
+HOMEBREW_FIREBALL = FIREBALL.replace("low roar", "loud roar").replace("8d6", "8d8")
+SHIELD = (
+    "An invisible barrier of magical force appears and protects you. Until the "
+    "start of your next turn, you have a +5 bonus to AC."
+)
+
+
+def test_signatures_of_equal_sets_match_and_are_dense():
+    sig = signature(shingles(FIREBALL))
+    assert sig == signature(shingles(FIREBALL))
+    assert len(sig) == dedupe.NUM_HASHES
+    assert dedupe._EMPTY not in sig
+
+
+def test_reworded_copies_cluster_and_distinct_spells_do_not():
+    spells = [
+        (0, {"desc": [FIREBALL]}),
+        (1, {"desc": [SHIELD]}),
+        (2, {"desc": []}),
+        (3, {"desc": [HOMEBREW_FIREBALL]}),
+    ]
+    assert find_clusters(spells) == [[0, 3]]
+
+
+def test_only_bucketed_pairs_are_compared(monkeypatch):
+    rng = random.Random(3)
+    words = [f"w{i}" for i in range(2000)]
+    spells = [
+        (i, {"desc": [" ".join(rng.choice(words) for _ in range(60))]})
+        for i in range(400)
+    ]
+    compared = []
+    real = dedupe.jaccard
+    monkeypatch.setattr(
+        dedupe, "jaccard", lambda a, b: compared.append(1) or real(a, b)
+    )
+    assert find_clusters(spells) == []
+    assert len(compared) < 400  # far below the ~80k pairs of a full scan
+
+
+def test_catalog_keeps_first_of_each_cluster(tmp_path):
+    source = tmp_path / "spells.json"
+    source.write_text(
+        json.dumps(
+            [
+                {
+                    "index": "fireball",
+                    "name": "Fireball",
+                    "level": 3,
+                    "desc": [FIREBALL],
+                },
+                {"index": "shield", "name": "Shield", "level": 1, "desc": [SHIELD]},
+                {
+                    "index": "fire-ball",
+                    "name": "Fire Ball",
+                    "level": 3,
+                    "desc": [HOMEBREW_FIREBALL],
+                },
+            ]
+        ),
+        encoding="utf-8",
+    )
+    with SpellCatalog.open(source) as catalog:
+        assert [s["index"] for s in catalog.query(distinct=True)] == [
+            "fireball",
+            "shield",
+        ]
+        assert len(catalog.query()) == 3
+        assert catalog.preview(distinct=True)["count"] == 2
+        assert catalog.preview(distinct=True)["samples"] == ["Fireball", "Shield"]
+        assert catalog.preview(text="fire", distinct=True)["count"] == 1
+        # Ranked results keep the best-scoring copy instead
+        assert [s["index"] for s in catalog.query(text="fire", distinct=True)] == [
+            "fire-ball"
+        ]
+        assert [s["index"] for s in catalog.query(levels=[3], distinct=True)] == [
+            "fireball"
+        ]
+        assert [[s["index"] for s in c] for c in catalog.duplicates()] == [
+            ["fireball", "fire-ball"]
+        ]
+
+
+def test_identical_descriptions_cluster_without_pairwise_comparisons(monkeypatch):
+    compared = []
+    real = dedupe.jaccard
+    monkeypatch.setattr(
+        dedupe, "jaccard", lambda a, b: compared.append(1) or real(a, b)
+    )
+    spells = [(i, {"desc": ["A homebrew spell."]}) for i in range(300)]
+    assert find_clusters(spells) == [list(range(300))]
+    assert len(compared) < 300
+
+
+def test_shingles_are_stable_across_processes():
+    script = (
+        "from src.catalog.dedupe import shingles; "
+        "print(sorted(shingles('A bright streak flashes from your finger')))"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+    assert outputs == {
+        f"{sorted(shingles('A bright streak flashes from your finger'))}\n"
+    }
+
+
+def test_spell_matching_only_a_later_group_member_joins(monkeypatch):
+    # a ~ b and b ~ c, but a and c are too far apart to match directly
+    words = [f"w{i}" for i in range(100)]
+    b = words[:95] + ["x1", "x2", "x3", "x4", "x5"]
+    c = b[:85] + ["y1", "y2", "y3", "y4", "y5"] + b[90:]
+    texts = [" ".join(w) for w in (words, b, c)]
+    sets = [shingles(t) for t in texts]
+    assert dedupe.jaccard(sets[0], sets[1]) >= dedupe.THRESHOLD
+    assert dedupe.jaccard(sets[1], sets[2]) >= dedupe.THRESHOLD
+    assert dedupe.jaccard(sets[0], sets[2]) < dedupe.THRESHOLD
+    # One shared bucket, with a first so c meets a before b
+    monkeypatch.setattr(dedupe, "signature", lambda s: (0,) * dedupe.NUM_HASHES)
+    spells = [(i, {"desc": [t]}) for i, t in enumerate(texts)]
+    assert find_clusters(spells) == [[0, 1, 2]]
+
+
+# SRD 5.1 texts of the Dominate spells, which differ only in a few words
+_DOMINATE_BODY = [
+    "While the {target} is charmed, you have a telepathic link with it as long as "
+    "the two of you are on the same plane of existence. You can use this telepathic "
+    "link to issue commands to the creature while you are conscious (no action "
+    "required), which it does its best to obey. You can specify a simple and general "
+    'course of action, such as "Attack that creature," "Run over there," or "Fetch '
+    "that object.\" If the creature completes the order and doesn't receive further "
+    "direction from you, it defends and preserves itself to the best of its ability.",
+    "You can use your action to take total and precise control of the target. Until "
+    "the end of your next turn, the creature takes only the actions you choose, and "
+    "doesn't do anything that you don't allow it to do. During this time, you can "
+    "also cause the creature to use a reaction, but this requires you to use your "
+    "own reaction as well.",
+    "Each time the {target} takes damage, it makes a new wisdom saving throw against "
+    "the spell. If the saving throw succeeds, the spell ends.",
+]
+
+
+def _dominate(index, level, who, target, higher):
+    opening = (
+        f"You attempt to beguile a {who} that you can see within range. It must "
+        "succeed on a wisdom saving throw or be charmed by you for the duration. If "
+        "you or creatures that are friendly to you are fighting it, it has advantage "
+        "on the saving throw."
+    )
+    return {
+        "index": index,
+        "name": index.replace("-", " ").title(),
+        "level": level,
+        "desc": [opening] + [p.format(target=target) for p in _DOMINATE_BODY],
+        "higher_level": [higher],
+    }
+
+
+DOMINATE = [
+    _dominate(
+        "dominate-beast",
+        4,
+        "creature",
+        "creature",
+        "When you cast this spell with a 5th-level spell slot, the duration is "
+        "concentration, up to 10 minutes.",
+    ),
+    _dominate(
+        "dominate-person",
+        5,
+        "humanoid",
+        "target",
+        "When you cast this spell using a 6th-level spell slot, the duration is "
+        "concentration, up to 10 minutes.",
+    ),
+    _dominate(
+        "dominate-monster",
+        8,
+        "creature",
+        "creature",
+        "When you cast this spell with a 9th-level spell slot, the duration is "
+        "concentration, up to 8 hours.",
+    ),
+]
+
+
+def test_srd_dominate_spells_are_not_duplicates():
+    sets = [shingles(" ".join(spell["desc"])) for spell in DOMINATE]
+    assert dedupe.jaccard(sets[0], sets[1]) >= dedupe.THRESHOLD  # same wording
+    assert find_clusters(enumerate(DOMINATE)) == []
+
+
+def test_default_distinct_decks_keep_every_dominate_spell(tmp_path):
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps(DOMINATE), encoding="utf-8")
+    with SpellCatalog.open(source) as catalog:
+        assert len(catalog.query(distinct=True)) == 3
@@ -0,0 +1,103 @@
+# tests/test_fetch_graphql.py
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.fetch.srd import fetch_srd_spells, fetch_srd_features, normalize_feature
+
+SPELLS = [
+    {
+        "index": f"spell-{i:02}",
+        "name": f"Spell {i}",
+        "level": i % 10,
+        "school": {"name": "Evocation"},
+        "classes": [{"name": "Wizard"}],
+        "desc": [f"Description {i}."],
+        "range": "60 feet",
+        "duration": "Instantaneous",
+        "components": ["V", "S"],
+        "casting_time": "1 action",
+    }
+    for i in range(25)
+]
+
+FEATURES = [
+    {
+        "index": "rage",
+        "name": "Rage",
+        "level": 1,
+        "desc": ["In battle, you fight with primal ferocity."],
+        "class": {"index": "barbarian", "name": "Barbarian"},
+        "subclass": None,
+    }
+]
+
+
+class FakeGraphQL(BaseHTTPRequestHandler):
+    """Serve `{collection(skip, limit)}` queries from in-memory lists."""
+
+    collections = {"spells": SPELLS, "features": FEATURES}
+    queries = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.queries.append(body)
+        name = next(n for n in self.collections if f"{n}(" in body["query"])
+        skip = body["variables"].get("skip") or 0
+        limit = body["variables"]["limit"]
+        # Return pages in reverse index order to prove the client sorts
+        items = sorted(self.collections[name], key=lambda r: r["index"], reverse=True)
+        payload = json.dumps({"data": {name: items[skip : skip + limit]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def graphql_server(monkeypatch, tmp_path):
+    FakeGraphQL.queries = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGraphQL)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        "src.fetch.srd.BASE_URL", f"http://127.0.0.1:{server.server_address[1]}"
+    )
+    monkeypatch.setattr("src.fetch.srd.GRAPHQL_PAGE_SIZE", 10)
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+    yield server
+    server.shutdown()
+
+
+def test_graphql_spells_are_paged_and_normalized(graphql_server, tmp_path):
+    fetch_srd_spells(force=True, transport="graphql")
+
+    # 25 records with page size 10 → 3 queries, no REST calls
+    assert len(FakeGraphQL.queries) == 3
+    data = json.loads((tmp_path / "spells.json").read_text())
+    assert [s["index"] for s in data] == [s["index"] for s in SPELLS]
+    assert data[0]["school"] == "Evocation"
+    assert data[0]["classes"] == ["Wizard"]
+
+
+def test_graphql_sync_keeps_unchanged_cache(graphql_server, tmp_path):
+    fetch_srd_spells(force=True, transport="graphql")
+    spells_file = tmp_path / "spells.json"
+    before = spells_file.stat().st_mtime_ns
+
+    fetch_srd_spells(sync=True, transport="graphql")
+
+    assert spells_file.stat().st_mtime_ns == before
+
+
+def test_graphql_features_are_normalized(graphql_server, tmp_path):
+    fetch_srd_features(force=True, transport="graphql")
+    data = json.loads((tmp_path / "features.json").read_text())
+    assert data == [normalize_feature(feature) for feature in FEATURES]
+    assert data[0]["class"] == "Barbarian"
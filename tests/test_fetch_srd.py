@@ -4,7 +4,57 @@ import json
 from src.fetch.srd import fetch_srd_spells
 from src.fetch.srd import fetch_srd_traits
 from src.fetch.srd import fetch_srd_features
-from unittest.mock import patch, Mock
+import pytest
+import requests
+from src.fetch.srd import BASE_URL, normalize_feature
+from src.utils.storage import read_json
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b""
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+class FakeSession:
+    """Route GET requests by URL so results don't depend on call order.
+
+    Detail routes get an ETag derived from their body and answer 304 when
+    the request carries a matching If-None-Match header.
+    """
+
+    def __init__(self, routes):
+        self.routes = {f"{BASE_URL}{path}": body for path, body in routes.items()}
+        self.calls = []
+        self.sent_headers = {}
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(url)
+        self.sent_headers[url] = headers or {}
+        body = self.routes[url]
+        etag = f'W/"{len(json.dumps(body))}-{hash(json.dumps(body)) & 0xFFFF}"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(None, status_code=304, headers={"ETag": etag})
+        return FakeResponse(body, headers={"ETag": etag})
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def _install(routes):
+        session = FakeSession(routes)
+        monkeypatch.setattr("src.fetch.srd.get_session", lambda: session)
+        return session
+
+    return _install
 
 
 def mock_index_response():
@@ -31,14 +81,15 @@ def mock_spell_detail(index):
     }
 
 
-@patch("src.fetch.srd.requests.get")
-def test_fetch_srd_creates_cache(mock_get, tmp_path, monkeypatch):
+def test_fetch_srd_creates_cache(fake_session, tmp_path, monkeypatch):
     # Setup mocked responses
-    mock_get.side_effect = [
-        Mock(status_code=200, json=lambda: mock_index_response()),
-        Mock(status_code=200, json=lambda: mock_spell_detail("fireball")),
-        Mock(status_code=200, json=lambda: mock_spell_detail("mage-hand")),
-    ]
+    fake_session(
+        {
+            "/api/spells": mock_index_response(),
+            "/api/spells/fireball": mock_spell_detail("fireball"),
+            "/api/spells/mage-hand": mock_spell_detail("mage-hand"),
+        }
+    )
 
     monkeypatch.setenv("DMFORGE_ENV", "test")
     monkeypatch.setattr(
@@ -61,8 +112,8 @@ def test_fetch_srd_creates_cache(mock_get, tmp_path, monkeypatch):
     assert "desc" in spell and isinstance(spell["desc"], list)
 
 
-@patch("src.fetch.srd.requests.get")
-def test_fetch_skips_if_not_forced(mock_get, tmp_path, monkeypatch):
+def test_fetch_skips_if_not_forced(fake_session, tmp_path, monkeypatch):
+    session = fake_session({})
     monkeypatch.setenv("DMFORGE_ENV", "test")
     test_file = tmp_path / "spells.json"
     test_file.write_text("[]")  # simulate existing cache
@@ -72,7 +123,7 @@ def test_fetch_skips_if_not_forced(mock_get, tmp_path, monkeypatch):
     fetch_srd_spells(force=False)
 
     # No API call should have been made if file exists and not forced
-    mock_get.assert_not_called()
+    assert session.calls == []
 
 
 def mock_trait_index():
@@ -92,13 +143,14 @@ def mock_trait_detail(index):
     }
 
 
-@patch("src.fetch.srd.requests.get")
-def test_fetch_traits_creates_file(mock_get, tmp_path, monkeypatch):
-    mock_get.side_effect = [
-        Mock(status_code=200, json=lambda: mock_trait_index()),
-        Mock(status_code=200, json=lambda: mock_trait_detail("darkvision")),
-        Mock(status_code=200, json=lambda: mock_trait_detail("dwarven-toughness")),
-    ]
+def test_fetch_traits_creates_file(fake_session, tmp_path, monkeypatch):
+    fake_session(
+        {
+            "/api/traits": mock_trait_index(),
+            "/api/traits/darkvision": mock_trait_detail("darkvision"),
+            "/api/traits/dwarven-toughness": mock_trait_detail("dwarven-toughness"),
+        }
+    )
 
     monkeypatch.setenv("DMFORGE_ENV", "test")
     monkeypatch.setattr(
@@ -114,8 +166,8 @@ def test_fetch_traits_creates_file(mock_get, tmp_path, monkeypatch):
     assert data[0]["index"] == "darkvision"
 
 
-@patch("src.fetch.srd.requests.get")
-def test_traits_skipped_if_not_forced(mock_get, tmp_path, monkeypatch):
+def test_traits_skipped_if_not_forced(fake_session, tmp_path, monkeypatch):
+    session = fake_session({})
     monkeypatch.setenv("DMFORGE_ENV", "test")
     test_file = tmp_path / "traits.json"
     test_file.write_text("[]")  # simulate existing file
@@ -124,7 +176,50 @@ def test_traits_skipped_if_not_forced(mock_get, tmp_path, monkeypatch):
 
     fetch_srd_traits(force=False)
 
-    mock_get.assert_not_called()
+    assert session.calls == []
+
+
+def test_traits_are_normalized_and_compressed(fake_session, tmp_path, monkeypatch):
+    detail = mock_trait_detail("darkvision")
+    detail["races"] = [{"index": "dwarf", "name": "Dwarf", "url": "/api/races/dwarf"}]
+    detail["proficiencies"] = []
+    fake_session(
+        {
+            "/api/traits": {"results": mock_trait_index()["results"][:1]},
+            "/api/traits/darkvision": detail,
+        }
+    )
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+
+    fetch_srd_traits(force=True, compress=True)
+
+    assert not (tmp_path / "traits.json").exists()
+    assert (tmp_path / "traits.json.br").exists()
+    assert read_json(tmp_path / "traits.json") == [
+        {
+            "index": "darkvision",
+            "name": "Darkvision",
+            "races": ["Dwarf"],
+            "subraces": [],
+            "desc": ["This is the darkvision trait."],
+        }
+    ]
+
+
+def test_normalize_feature_keeps_names_only():
+    raw = mock_feature_detail("rage")
+    raw["class"] = {"index": "barbarian", "name": "Barbarian", "url": "/api/x"}
+    raw["prerequisites"] = []
+    assert normalize_feature(raw) == {
+        "index": "rage",
+        "name": "Rage",
+        "level": 1,
+        "class": "Barbarian",
+        "subclass": None,
+        "desc": ["This is the rage feature."],
+    }
 
 
 def mock_feature_index():
@@ -145,13 +240,14 @@ def mock_feature_detail(index):
     }
 
 
-@patch("src.fetch.srd.requests.get")
-def test_fetch_features_creates_file(mock_get, tmp_path, monkeypatch):
-    mock_get.side_effect = [
-        Mock(status_code=200, json=lambda: mock_feature_index()),
-        Mock(status_code=200, json=lambda: mock_feature_detail("channel-divinity")),
-        Mock(status_code=200, json=lambda: mock_feature_detail("rage")),
-    ]
+def test_fetch_features_creates_file(fake_session, tmp_path, monkeypatch):
+    fake_session(
+        {
+            "/api/features": mock_feature_index(),
+            "/api/features/channel-divinity": mock_feature_detail("channel-divinity"),
+            "/api/features/rage": mock_feature_detail("rage"),
+        }
+    )
 
     monkeypatch.setenv("DMFORGE_ENV", "test")
     monkeypatch.setattr(
@@ -168,8 +264,8 @@ def test_fetch_features_creates_file(mock_get, tmp_path, monkeypatch):
     assert data[0]["level"] == 1
 
 
-@patch("src.fetch.srd.requests.get")
-def test_features_skipped_if_not_forced(mock_get, tmp_path, monkeypatch):
+def test_features_skipped_if_not_forced(fake_session, tmp_path, monkeypatch):
+    session = fake_session({})
     monkeypatch.setenv("DMFORGE_ENV", "test")
     output_file = tmp_path / "features.json"
     output_file.write_text("[]")  # simulate existing cache
@@ -178,4 +274,168 @@ def test_features_skipped_if_not_forced(mock_get, tmp_path, monkeypatch):
 
     fetch_srd_features(force=False)
 
-    mock_get.assert_not_called()
+    assert session.calls == []
+
+
+SPELL_ROUTES = {
+    "/api/spells": mock_index_response(),
+    "/api/spells/fireball": mock_spell_detail("fireball"),
+    "/api/spells/mage-hand": mock_spell_detail("mage-hand"),
+}
+
+
+def test_full_fetch_writes_manifest(fake_session, tmp_path, monkeypatch):
+    fake_session(SPELL_ROUTES)
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+
+    fetch_srd_spells(force=True)
+
+    manifest = json.loads((tmp_path / "spells.manifest.json").read_text())
+    entry = manifest["resources"]["fireball"]
+    assert entry["url"].endswith("/api/spells/fireball")
+    assert entry["etag"] and entry["sha256"]
+
+
+def test_other_env_adopts_cache_without_network(fake_session, tmp_path, monkeypatch):
+    session = fake_session(SPELL_ROUTES)
+    for env in ("dev", "prod"):
+        (tmp_path / env).mkdir()
+
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / "dev" / filename
+    )
+    fetch_srd_spells()
+    calls = len(session.calls)
+
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / "prod" / filename
+    )
+    fetch_srd_spells()
+
+    assert len(session.calls) == calls
+    prod, dev = tmp_path / "prod" / "spells.json", tmp_path / "dev" / "spells.json"
+    assert prod.read_bytes() == dev.read_bytes()
+    assert prod.stat().st_ino == dev.stat().st_ino
+
+
+def test_progress_task_tracks_records(fake_session, tmp_path, monkeypatch):
+    from rich.progress import Progress
+
+    fake_session(SPELL_ROUTES)
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+
+    with Progress(disable=True) as progress:
+        fetch_srd_spells(force=True, progress=progress)
+
+    (task,) = progress.tasks
+    assert task.description == "spells"
+    assert task.total == task.completed == 2
+
+
+def test_sync_sends_conditional_requests_and_keeps_file(
+    fake_session, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+    fake_session(SPELL_ROUTES)
+    fetch_srd_spells(force=True)
+    spells_file = tmp_path / "spells.json"
+    before = spells_file.stat().st_mtime_ns
+
+    session = fake_session(SPELL_ROUTES)
+    fetch_srd_spells(sync=True)
+
+    detail_url = f"{BASE_URL}/api/spells/fireball"
+    assert "If-None-Match" in session.sent_headers[detail_url]
+    assert spells_file.stat().st_mtime_ns == before
+
+
+def test_sync_rewrites_only_changed_records(fake_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+    fake_session(SPELL_ROUTES)
+    fetch_srd_spells(force=True)
+
+    changed = mock_spell_detail("mage-hand")
+    changed["range"] = "60 feet"
+    routes = {
+        "/api/spells": {
+            "results": [
+                {"index": "mage-hand", "url": "/api/spells/mage-hand"},
+                {"index": "shield", "url": "/api/spells/shield"},
+            ]
+        },
+        "/api/spells/mage-hand": changed,
+        "/api/spells/shield": mock_spell_detail("shield"),
+    }
+    fake_session(routes)
+    fetch_srd_spells(sync=True)
+
+    data = json.loads((tmp_path / "spells.json").read_text())
+    assert [s["index"] for s in data] == ["mage-hand", "shield"]
+    assert data[0]["range"] == "60 feet"
+    manifest = json.loads((tmp_path / "spells.manifest.json").read_text())
+    assert set(manifest["resources"]) == {"mage-hand", "shield"}
+
+
+class FlakySession(FakeSession):
+    """Answer 500 for one URL."""
+
+    def __init__(self, routes, broken):
+        super().__init__(routes)
+        self.broken = f"{BASE_URL}{broken}"
+
+    def get(self, url, headers=None, **kwargs):
+        if url == self.broken:
+            self.calls.append(url)
+            return FakeResponse({"error": "boom"}, status_code=500)
+        return super().get(url, headers=headers, **kwargs)
+
+
+def test_failed_fetch_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+    flaky = FlakySession(SPELL_ROUTES, broken="/api/spells/mage-hand")
+    monkeypatch.setattr("src.fetch.srd.get_session", lambda: flaky)
+
+    fetch_srd_spells(force=True)
+
+    checkpoint = tmp_path / "spells.partial.jsonl"
+    assert not (tmp_path / "spells.json").exists()
+    lines = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert [line["index"] for line in lines] == ["fireball"]
+
+    healthy = FakeSession(SPELL_ROUTES)
+    monkeypatch.setattr("src.fetch.srd.get_session", lambda: healthy)
+    fetch_srd_spells()
+
+    assert f"{BASE_URL}/api/spells/fireball" not in healthy.calls
+    data = json.loads((tmp_path / "spells.json").read_text())
+    assert [s["index"] for s in data] == ["fireball", "mage-hand"]
+    assert not checkpoint.exists()
+
+
+def test_features_error_is_not_swallowed(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(
+        "src.fetch.srd.get_data_path", lambda filename: tmp_path / filename
+    )
+    routes = {
+        "/api/features": mock_feature_index(),
+        "/api/features/channel-divinity": mock_feature_detail("channel-divinity"),
+        "/api/features/rage": mock_feature_detail("rage"),
+    }
+    flaky = FlakySession(routes, broken="/api/features/rage")
+    monkeypatch.setattr("src.fetch.srd.get_session", lambda: flaky)
+
+    fetch_srd_features(force=True)
+
+    assert "Failed to fetch SRD features" in capsys.readouterr().out
+    assert not (tmp_path / "features.json").exists()
+    assert (tmp_path / "features.partial.jsonl").exists()
@@ -0,0 +1,92 @@
+# tests/test_filters.py
+
+import pytest
+from src.catalog.columns import SpellTable
+from src.catalog.filters import compile_filter
+
+ROWS = [
+    # position, idx, level, school, concentration, ritual, components, casting
+    (0, "bless", 1, "enchantment", 1, 0, "vsm", "1 action"),
+    (1, "alarm", 1, "abjuration", 0, 1, "vsm", "1 minute"),
+    (2, "fireball", 3, "evocation", 0, 0, "vsm", "1 action"),
+    (3, "shield", 1, "abjuration", 0, 0, "vs", "1 reaction"),
+    (4, "fire-bolt", 0, "evocation", 0, 0, "vs", "1 action"),
+    (5, "wish", None, "conjuration", 0, 0, "v", "1 action"),
+]
+CLASSES = [
+    ("cleric", "bless"),
+    ("wizard", "alarm"),
+    ("wizard", "fireball"),
+    ("sorcerer", "fireball"),
+    ("wizard", "shield"),
+    ("sorcerer", "fire-bolt"),
+]
+
+
+@pytest.fixture(scope="module")
+def table():
+    return SpellTable(ROWS, CLASSES)
+
+
+def names(table, expression):
+    return [table.idx[row] for row in table.rows(compile_filter(expression)(table))]
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("level<=1", ["bless", "alarm", "shield", "fire-bolt"]),
+        ("level>0 and level<3", ["bless", "alarm", "shield"]),
+        ("level!=1", ["fireball", "fire-bolt", "wish"]),
+        ("level=0,3", ["fireball", "fire-bolt"]),
+        ("not concentration and ritual", ["alarm"]),
+        (
+            "ritual=false and concentration=no",
+            ["fireball", "shield", "fire-bolt", "wish"],
+        ),
+        ("components!~M", ["shield", "fire-bolt", "wish"]),
+        ("components~vs and components!~m", ["shield", "fire-bolt"]),
+        ("components=V", ["wish"]),
+        ("class=WIZARD,cleric", ["bless", "alarm", "fireball", "shield"]),
+        ("class!=wizard", ["bless", "fire-bolt", "wish"]),
+        (
+            "school~evoc or school=abjuration",
+            ["alarm", "fireball", "shield", "fire-bolt"],
+        ),
+        ('casting_time="1 action" and not class=sorcerer', ["bless", "wish"]),
+        ("casting_time~reaction", ["shield"]),
+        (
+            "level<=3 and not concentration and components!~M",
+            ["shield", "fire-bolt"],
+        ),
+        ("(class=sorcerer or ritual) and level>=1", ["alarm", "fireball"]),
+        ("not (level<=1 or school=conjuration)", ["fireball"]),
+    ],
+)
+def test_expressions_compile_to_bitmaps(table, expression, expected):
+    assert names(table, expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression, message",
+    [
+        ("level<=", "Expected a value but found the end"),
+        ("lvl=1", "Unknown field 'lvl'"),
+        ("level~1", "Operator '~' does not apply to 'level'"),
+        ("level<1,2", "takes a single level"),
+        ("components~X", "Components are V, S and M"),
+        ("ritual=maybe", "Expected true or false"),
+        ("(level=1", "Expected \\) but found the end"),
+        ("level=1 ritual", "Expected 'and', 'or' or the end but found 'ritual'"),
+        ("level=1 & ritual", "Unexpected '&'"),
+        ("level", "Expected an operator"),
+        ("and ritual", "Expected a field"),
+    ],
+)
+def test_invalid_expressions_are_rejected(expression, message):
+    with pytest.raises(ValueError, match=message):
+        compile_filter(expression)
+
+
+def test_compiled_filters_are_cached():
+    assert compile_filter("level<=3") is compile_filter("level<=3")
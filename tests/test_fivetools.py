@@ -0,0 +1,192 @@
+# tests/test_fivetools.py
+
+import json
+import pytest
+from src.fetch.fivetools import (
+    import_local,
+    iter_features,
+    iter_spells,
+    iter_traits,
+    normalize_5etools_spell,
+    resolve_source_path,
+)
+
+FIREBALL = {
+    "name": "Fireball",
+    "source": "PHB",
+    "level": 3,
+    "school": "V",
+    "time": [{"number": 1, "unit": "action"}],
+    "range": {"type": "point", "distance": {"type": "feet", "amount": 150}},
+    "components": {"v": True, "s": True, "m": "a tiny ball of bat guano"},
+    "duration": [{"type": "instant"}],
+    "entries": ["Each creature takes {@damage 8d6} fire damage."],
+    "entriesHigherLevel": [
+        {
+            "type": "entries",
+            "name": "At Higher Levels",
+            "entries": ["The damage increases by {@scaledamage 8d6|3-9|1d6}."],
+        }
+    ],
+}
+
+BLESS = {
+    "name": "Bless",
+    "source": "PHB",
+    "level": 1,
+    "school": "E",
+    "time": [{"number": 1, "unit": "action"}],
+    "range": {"type": "point", "distance": {"type": "feet", "amount": 30}},
+    "components": {"v": True, "s": True, "m": "holy water"},
+    "duration": [
+        {
+            "type": "timed",
+            "duration": {"type": "minute", "amount": 1},
+            "concentration": True,
+        }
+    ],
+    "entries": ["You bless up to three creatures."],
+}
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    root = tmp_path / "5etools" / "data"
+    spells = root / "spells"
+    spells.mkdir(parents=True)
+    (spells / "index.json").write_text(
+        json.dumps({"PHB": "spells-phb.json", "XGE": "spells-xge.json"})
+    )
+    (spells / "spells-phb.json").write_text(json.dumps({"spell": [FIREBALL, BLESS]}))
+    (spells / "spells-xge.json").write_text(
+        json.dumps(
+            {
+                "spell": [
+                    dict(FIREBALL, source="XGE"),
+                    dict(BLESS, name="Ice Knife", source="XGE"),
+                ]
+            }
+        )
+    )
+    (spells / "sources.json").write_text(
+        json.dumps(
+            {
+                "PHB": {
+                    "Fireball": {"class": [{"name": "Wizard"}, {"name": "Sorcerer"}]},
+                    "Bless": {"class": [{"name": "Cleric"}]},
+                }
+            }
+        )
+    )
+    (root / "races.json").write_text(
+        json.dumps(
+            {
+                "race": [
+                    {
+                        "name": "Dwarf",
+                        "entries": [
+                            {"type": "entries", "name": "Age", "entries": ["Old."]},
+                            {
+                                "type": "entries",
+                                "name": "Darkvision",
+                                "entries": ["You see in the dark."],
+                            },
+                        ],
+                    },
+                    {
+                        "name": "Elf",
+                        "entries": [
+                            {
+                                "type": "entries",
+                                "name": "Darkvision",
+                                "entries": ["You see in the dark."],
+                            }
+                        ],
+                    },
+                ]
+            }
+        )
+    )
+    classes = root / "class"
+    classes.mkdir()
+    (classes / "class-barbarian.json").write_text(
+        json.dumps(
+            {
+                "classFeature": [
+                    {
+                        "name": "Rage",
+                        "className": "Barbarian",
+                        "level": 1,
+                        "entries": ["In battle, you fight with primal ferocity."],
+                    }
+                ]
+            }
+        )
+    )
+    return root
+
+
+def test_normalize_matches_api_shape():
+    spell = normalize_5etools_spell(
+        FIREBALL, {"Fireball": {"class": [{"name": "Wizard"}]}}
+    )
+    assert spell == {
+        "index": "fireball",
+        "name": "Fireball",
+        "level": 3,
+        "school": "Evocation",
+        "classes": ["Wizard"],
+        "desc": [
+            "Each creature takes 8d6 fire damage.",
+            "At Higher Levels. The damage increases by 8d6.",
+        ],
+        "range": "150 feet",
+        "duration": "Instantaneous",
+        "components": ["V", "S", "M"],
+        "casting_time": "1 action",
+        "concentration": False,
+        "ritual": False,
+    }
+
+
+def test_concentration_duration():
+    bless = normalize_5etools_spell(BLESS)
+    assert bless["duration"] == "Concentration, up to 1 minute"
+    assert bless["concentration"] is True
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_iter_spells_keeps_file_order(mirror, workers):
+    spells = list(iter_spells(mirror, workers=workers))
+    assert [s["name"] for s in spells] == ["Fireball", "Bless", "Fireball", "Ice Knife"]
+    assert spells[0]["classes"] == ["Wizard", "Sorcerer"]
+
+
+def test_traits_and_features(mirror):
+    traits = list(iter_traits(mirror))
+    assert [t["index"] for t in traits] == ["darkvision"]
+    assert traits[0]["races"] == ["Dwarf", "Elf"]
+
+    features = list(iter_features(mirror, workers=1))
+    assert features[0]["index"] == "barbarian-rage"
+    assert features[0]["class"] == "Barbarian"
+
+
+def test_import_local_writes_deduplicated_cache(mirror, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.fetch.fivetools.get_data_path", lambda filename: tmp_path / filename
+    )
+    import_local("spells", data_dir=mirror, workers=1)
+    data = json.loads((tmp_path / "spells.json").read_text())
+    assert [s["index"] for s in data] == ["fireball", "bless", "ice-knife"]
+
+
+def test_resolve_source_path_is_relative_to_config(tmp_path):
+    config = tmp_path / "config" / "srd5e.json"
+    config.parent.mkdir()
+    config.write_text(
+        json.dumps({"sources": [{"name": "5etools-mirror", "path": "../mirror"}]})
+    )
+    assert resolve_source_path(config_path=config) == (tmp_path / "mirror").resolve()
+    with pytest.raises(ValueError):
+        resolve_source_path("missing", config_path=config)
@@ -9,7 +9,7 @@ import src.deck_forge.generate as G
 # A simple stub for spell_to_card to ensure cards always generate
 @pytest.fixture(autouse=True)
 def patch_spell_to_card(monkeypatch):
-    def stub_spell_to_card(spell):
+    def stub_spell_to_card(spell, summarize=True):
         return {
             "title": spell.get("name", spell.get("index")),
             "level": spell.get("level"),
@@ -42,6 +42,21 @@ def test_fetch_srd_spells_no_file(tmp_path, monkeypatch, capsys):
     assert "❌ spells.json not found" in out
 
 
+@pytest.mark.parametrize(
+    "config",
+    [
+        "{not json",
+        '{"sources": [{"name": "srd"}]}',
+        '{"sources": [{"name": "a", "path": "x.json"}, {"name": "a", "path": "y.json"}]}',
+    ],
+)
+def test_broken_sources_config_is_reported(spell_file, capsys, config):
+    spell_file.with_name("sources.json").write_text(config, encoding="utf-8")
+    assert G.open_spell_catalog() is None
+    assert G.generate_spell_deck(output_name="deck.json") is None
+    assert "❌ Invalid sources.json" in capsys.readouterr().out
+
+
 def test_generate_spell_deck_empty(monkeypatch):
     monkeypatch.setattr(G, "fetch_srd_spells", lambda: [])
     assert G.generate_spell_deck(output_name="deck.json") is None
@@ -107,6 +122,22 @@ def test_generate_spell_deck_interactive_bad(spell_file, monkeypatch, capsys):
     assert "❌ Invalid input" in out
 
 
+def test_generate_spell_deck_interactive_offers_related(spell_file, monkeypatch):
+    spells = [
+        {"index": "a", "name": "A", "level": 0, "school": "S", "desc": ["Fire bolt"]},
+        {"index": "b", "name": "B", "level": 1, "school": "S", "desc": ["Ice wall"]},
+        {"index": "c", "name": "C", "level": 1, "school": "S", "desc": ["Fire ray"]},
+    ]
+    spell_file.write_text(json.dumps(spells), encoding="utf-8")
+    answers = iter(["1", "1"])
+    monkeypatch.setattr(typer, "prompt", lambda msg, **kwargs: next(answers))
+    path = G.generate_spell_deck(
+        output_name="deck.json", level_filter="0", interactive=True
+    )
+    deck = json.loads(Path(path).read_text())
+    assert [card["title"] for card in deck["cards"]] == ["A", "C"]
+
+
 def test_deck_json_structure(spell_file):
     spells = [{"index": "x", "name": "X", "level": 0, "school": "S", "classes": []}]
     spell_file.write_text(json.dumps(spells), encoding="utf-8")
@@ -115,3 +146,30 @@ def test_deck_json_structure(spell_file):
     assert set(deck.keys()) == {"cards"}
     card = deck["cards"][0]
     assert {"title", "level", "school"}.issubset(card.keys())
+
+
+def test_write_spell_deck_summarizes_long_cards_in_one_pass(monkeypatch, tmp_path):
+    def card(spell, summarize=True):
+        assert summarize is False
+        return {
+            "title": spell["name"],
+            "description": spell["desc"],
+            "summary": spell["long"],
+        }
+
+    batches = []
+    monkeypatch.setattr(G, "spell_to_card", card)
+    monkeypatch.setattr(
+        G,
+        "summarize_many",
+        lambda texts: batches.append(list(texts)) or [t.upper() for t in batches[-1]],
+    )
+    spells = [
+        {"name": "A", "desc": "long a", "long": True},
+        {"name": "B", "desc": "short", "long": False},
+        {"name": "C", "desc": "long c", "long": True},
+    ]
+    path = G.write_spell_deck(spells, str(tmp_path / "deck.json"))
+    cards = json.loads(path.read_text())["cards"]
+    assert batches == [["long a", "long c"]]
+    assert [c["description"] for c in cards] == ["LONG A", "short", "LONG C"]
@@ -0,0 +1,157 @@
+# tests/test_http.py
+
+import threading
+import time
+import pytest
+import requests
+from src.utils.http import (
+    MAX_HOST_CONCURRENCY,
+    AdaptiveLimit,
+    TokenBucket,
+    _retry_after,
+    fetch_many,
+    get_session,
+    get_stats,
+    reset_session,
+    reset_stats,
+    send,
+    shared_budget,
+)
+
+
+class SlowSession:
+    """Earlier URLs answer slower, so completion order is reversed."""
+
+    def __init__(self, count):
+        self.count = count
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        position = int(url.rsplit("/", 1)[-1])
+        time.sleep(0.002 * (self.count - position))
+        with self.lock:
+            self.active -= 1
+        return url
+
+
+def test_fetch_many_preserves_input_order():
+    urls = [f"http://stub/{i}" for i in range(12)]
+    results = list(fetch_many(urls, concurrency=4, session=SlowSession(len(urls))))
+    assert results == urls
+
+
+def test_fetch_many_bounds_concurrency():
+    session = SlowSession(20)
+    list(fetch_many([f"http://stub/{i}" for i in range(20)], 3, session))
+    assert 1 <= session.peak <= 3
+
+
+def test_shared_budget_bounds_requests_across_fetches():
+    session = SlowSession(10)
+    urls = [f"http://stub/{i}" for i in range(10)]
+    with shared_budget(2):
+        threads = [
+            threading.Thread(target=lambda: list(fetch_many(urls, 4, session)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert 1 <= session.peak <= 2
+
+
+def test_get_session_is_shared():
+    reset_session()
+    assert get_session() is get_session()
+    reset_session()
+
+
+class FlakyResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_send_retries_429_and_counts(monkeypatch):
+    reset_stats()
+    monkeypatch.setattr("src.utils.http.BACKOFF_BASE", 0)
+    replies = iter([FlakyResponse(429, {"Retry-After": "0"}), FlakyResponse(200)])
+
+    response = send("api.test", lambda: next(replies))
+
+    assert response.status_code == 200
+    stats = get_stats("api.test")
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    assert stats["throttled"] == 1
+
+
+def test_send_gives_up_and_raises(monkeypatch):
+    reset_stats()
+    monkeypatch.setattr("src.utils.http.BACKOFF_BASE", 0)
+
+    def down():
+        raise requests.ConnectionError("down")
+
+    with pytest.raises(requests.ConnectionError):
+        send("down.test", down, max_retries=2)
+    assert get_stats("down.test")["requests"] == 3
+    assert get_stats("down.test")["failures"] == 1
+
+
+def test_send_does_not_retry_client_errors():
+    reset_stats()
+    response = send("api.test", lambda: FlakyResponse(404))
+    assert response.status_code == 404
+    assert get_stats()["retries"] == 0
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_adaptive_limit_shrinks_on_congestion_and_recovers():
+    limit = AdaptiveLimit(initial=8)
+    limit.acquire()
+    limit.release(congested=True)
+    assert limit.limit == 4
+    for _ in range(20):
+        limit.acquire()
+        limit.release(congested=False)
+    assert limit.limit > 4
+
+
+def test_retry_after_http_date():
+    assert _retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert _retry_after({"Retry-After": "3"}) == 3.0
+    assert _retry_after({}) is None
+
+
+def test_token_bucket_meters_weighted_amounts():
+    bucket = TokenBucket(rate=1000, burst=100)
+    assert bucket.acquire(100) == 0
+    assert bucket.acquire(50) > 0  # the bucket was empty
+    start = time.monotonic()
+    bucket.acquire(10_000)  # larger than the burst: waits for a full bucket
+    assert time.monotonic() - start < 1
+
+
+def test_session_pools_fit_every_request_in_flight():
+    reset_session()
+    adapter = get_session().get_adapter("https://example.com")
+    assert adapter._pool_maxsize >= MAX_HOST_CONCURRENCY
+    # A bigger concurrency grows the pools of the same session
+    session = get_session(pool_size=MAX_HOST_CONCURRENCY * 2)
+    assert session is get_session()
+    assert session.get_adapter("https://example.com")._pool_maxsize == 64
+    reset_session()
@@ -0,0 +1,128 @@
+# tests/test_http_cache.py
+
+import pytest
+import requests
+from src.utils import http_cache
+from src.utils.http import request
+from src.utils.http_cache import CacheMiss, HTTPCache, request_key
+
+
+class RecordingSession:
+    """Answers every GET/POST with a body derived from the URL."""
+
+    def __init__(self, bodies=None):
+        self.bodies = bodies or {}
+        self.calls = []
+
+    def _respond(self, url, status=200, **kwargs):
+        self.calls.append(url)
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.headers["Content-Type"] = "application/json"
+        response._content = self.bodies.get(url, url.encode())
+        return response
+
+    def get(self, url, **kwargs):
+        return self._respond(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._respond(url, **kwargs)
+
+
+class OfflineSession:
+    def get(self, url, **kwargs):
+        raise AssertionError(f"network used for {url}")
+
+    post = get
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    yield tmp_path / "http-cache"
+    http_cache.configure("off")
+
+
+def test_record_then_replay_offline(cache_dir):
+    http_cache.configure("record", root=cache_dir)
+    session = RecordingSession()
+    first = request("GET", "http://stub/api/spells/fireball", session)
+    again = request("GET", "http://stub/api/spells/fireball", session)
+    assert session.calls == ["http://stub/api/spells/fireball"]
+    assert again.content == first.content
+    assert again.headers["content-type"] == "application/json"
+
+    http_cache.configure("replay", root=cache_dir)
+    replayed = request("GET", "http://stub/api/spells/fireball", OfflineSession())
+    assert replayed.status_code == 200
+    assert replayed.content == b"http://stub/api/spells/fireball"
+
+    with pytest.raises(CacheMiss):
+        request("GET", "http://stub/api/spells/shield", OfflineSession())
+
+
+def test_post_bodies_are_part_of_the_key(cache_dir):
+    http_cache.configure("record", root=cache_dir)
+    session = RecordingSession()
+    request("POST", "http://stub/graphql", session, json={"skip": 0})
+    request("POST", "http://stub/graphql", session, json={"skip": 10})
+    request("POST", "http://stub/graphql", session, json={"skip": 0})
+    assert len(session.calls) == 2
+
+
+def test_identical_bodies_share_one_blob(cache_dir):
+    http_cache.configure("record", root=cache_dir)
+    session = RecordingSession({"http://a/1": b"same", "http://b/2": b"same"})
+    request("GET", "http://a/1", session)
+    request("GET", "http://b/2", session)
+    assert len(list((cache_dir / "entries").glob("*/*.json"))) == 2
+    assert len(list((cache_dir / "blobs").glob("*/*"))) == 1
+
+
+def test_errors_and_revalidations_are_not_served_from_cache(cache_dir):
+    http_cache.configure("record", root=cache_dir)
+    session = RecordingSession()
+    request("GET", "http://stub/missing", session, status=404)
+    request("GET", "http://stub/missing", session, status=404)
+    request("GET", "http://stub/x", session)
+    request("GET", "http://stub/x", session, headers={"If-None-Match": '"v1"'})
+    assert session.calls.count("http://stub/missing") == 2
+    assert session.calls.count("http://stub/x") == 2
+
+
+def test_refreshing_cache_refetches_and_overwrites(cache_dir):
+    session = RecordingSession()
+    http_cache.configure("record", root=cache_dir)
+    request("GET", "http://stub/x", session)
+    session.bodies["http://stub/x"] = b"new"
+    http_cache.configure("record", root=cache_dir, refresh=True)
+    assert request("GET", "http://stub/x", session).content == b"new"
+    assert session.calls.count("http://stub/x") == 2
+
+    http_cache.configure("record", root=cache_dir)
+    assert request("GET", "http://stub/x", session).content == b"new"
+    assert session.calls.count("http://stub/x") == 2
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = HTTPCache(tmp_path, max_bytes=250)
+    session = RecordingSession()
+    keys = []
+    for i in range(3):
+        url = f"http://stub/{i}"
+        session.bodies[url] = bytes([i]) * 100
+        keys.append(request_key("GET", url))
+        cache.put(keys[-1], session.get(url))
+        if i == 1:
+            # Touch the first entry so the second one is least recently used
+            assert cache.get(keys[0]) is not None
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+    assert cache.size() <= 250
+
+
+def test_unknown_mode_is_rejected(cache_dir):
+    with pytest.raises(ValueError):
+        http_cache.configure("sometimes", root=cache_dir)
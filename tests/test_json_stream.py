@@ -0,0 +1,72 @@
+# tests/test_json_stream.py
+
+import json
+import pytest
+from src.utils import json_stream
+from src.utils.json_stream import deck_format, has_items, iter_cards, write_cards
+
+CARDS = [{"title": f"Card {i}", "level": i, "desc": ["x" * 50]} for i in range(40)]
+
+
+@pytest.fixture(autouse=True)
+def tiny_chunks(monkeypatch):
+    # Force values to straddle chunk boundaries
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", 7)
+
+
+@pytest.mark.parametrize(
+    "name, text",
+    [
+        ("deck.json", json.dumps({"cards": CARDS}, indent=2)),
+        ("deck.json", json.dumps({"title": "meta", "cards": CARDS})),
+        ("deck.json", json.dumps(CARDS)),
+        ("deck.jsonl", "\n".join(json.dumps(card) for card in CARDS) + "\n\n"),
+    ],
+)
+def test_iter_cards_reads_every_shape(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    assert list(iter_cards(path)) == CARDS
+
+
+def test_iter_cards_is_lazy(tmp_path):
+    path = tmp_path / "deck.json"
+    # Truncated mid-deck: the first cards still come out before the error
+    path.write_text(json.dumps({"cards": CARDS})[:500], encoding="utf-8")
+    cards = iter_cards(path)
+    assert next(cards) == CARDS[0]
+    with pytest.raises(ValueError):
+        list(cards)
+
+
+def test_object_root_without_cards(tmp_path):
+    path = tmp_path / "deck.json"
+    path.write_text(json.dumps({"name": "Solo", "n": 12345}), encoding="utf-8")
+    assert list(iter_cards(path)) == []
+    assert list(iter_cards(path, whole_root=True)) == [{"name": "Solo", "n": 12345}]
+    assert not has_items(path)
+    path.write_text(json.dumps({"name": "Deck", "cards": []}), encoding="utf-8")
+    assert has_items(path)
+
+
+def test_scalar_root_is_rejected(tmp_path):
+    path = tmp_path / "deck.json"
+    path.write_text("123", encoding="utf-8")
+    assert deck_format(path) == ""
+    with pytest.raises(ValueError):
+        list(iter_cards(path))
+
+
+@pytest.mark.parametrize("fmt", ["object", "list", "lines"])
+def test_write_cards_round_trips_in_place(tmp_path, fmt):
+    path = tmp_path / ("deck.jsonl" if fmt == "lines" else "deck.json")
+    write_cards(path, CARDS, fmt)
+    assert deck_format(path) == fmt
+
+    count = write_cards(path, ({**c, "seen": True} for c in iter_cards(path)), fmt)
+    assert count == len(CARDS)
+    assert list(iter_cards(path)) == [{**c, "seen": True} for c in CARDS]
+    if fmt == "object":
+        assert path.read_text() == json.dumps(
+            {"cards": [{**c, "seen": True} for c in CARDS]}, indent=2
+        )
@@ -0,0 +1,124 @@
+# tests/test_merge.py
+
+import json
+import os
+import pytest
+from typer.testing import CliRunner
+from src.catalog import merge
+from src.catalog.merge import canonical_key, catalog_source, merge_sources
+from src.cli import app
+
+runner = CliRunner()
+
+SRD = [
+    {"index": "acid-arrow", "name": "Acid Arrow", "level": 2, "desc": ["SRD text"]},
+    {"index": "bless", "name": "Bless", "level": 1, "desc": ["Bless text"]},
+]
+HOMEBREW = [
+    {"name": "ACID ARROW", "level": 3, "desc": ["House rule"], "classes": []},
+    {"name": "Frost Lance", "level": 2, "desc": ["Homebrew only"]},
+]
+FIVETOOLS = {
+    "spell": [
+        {
+            "name": "Melf's Acid Arrow",
+            "level": 2,
+            "school": "V",
+            "entries": ["A shimmering green arrow."],
+            "classes": {"fromClassList": [{"name": "Wizard"}]},
+        }
+    ]
+}
+
+
+def test_canonical_key_ignores_case_punctuation_and_accents():
+    assert canonical_key("Melf’s Acid Arrow") == "melfs-acid-arrow"
+    assert canonical_key("melfs  acid-arrow!") == "melfs-acid-arrow"
+    assert canonical_key("Évard's Black Tentacles") == "evards-black-tentacles"
+
+
+def test_merge_applies_precedence_and_records_provenance():
+    merged = merge_sources(
+        [("homebrew", HOMEBREW), ("srd", SRD)], precedence={"desc": ["srd"]}
+    )
+    assert [s["index"] for s in merged] == ["acid-arrow", "frost-lance", "bless"]
+    arrow = merged[0]
+    assert arrow["level"] == 3  # homebrew wins by default
+    assert arrow["desc"] == ["SRD text"]  # but srd wins descriptions
+    assert arrow["name"] == "ACID ARROW"
+    assert arrow["provenance"] == {
+        "name": "homebrew",
+        "level": "homebrew",
+        "desc": "srd",
+        "index": "srd",
+    }
+    assert "classes" not in arrow  # empty values never win
+
+
+@pytest.fixture
+def env_dir(tmp_path):
+    (tmp_path / "spells.json").write_text(json.dumps(SRD), encoding="utf-8")
+    (tmp_path / "homebrew.json").write_text(
+        json.dumps({"spells": HOMEBREW}), encoding="utf-8"
+    )
+    (tmp_path / "spells-xge.json").write_text(json.dumps(FIVETOOLS), encoding="utf-8")
+    config = {
+        "sources": [
+            {"name": "homebrew", "path": "homebrew.json"},
+            {"name": "xge", "path": "spells-xge.json", "format": "5etools"},
+            {"name": "srd", "path": "spells.json"},
+            {"name": "later", "path": "not-yet.json"},
+        ],
+        "precedence": {"desc": ["srd"]},
+    }
+    (tmp_path / "sources.json").write_text(json.dumps(config), encoding="utf-8")
+    return tmp_path
+
+
+def test_catalog_source_merges_once_until_an_input_changes(env_dir, monkeypatch):
+    merged_file = catalog_source(env_dir / "spells.json")
+    assert merged_file == env_dir / "merged.json"
+    spells = {s["index"]: s for s in json.loads(merged_file.read_text())}
+    assert set(spells) == {"acid-arrow", "frost-lance", "bless", "melfs-acid-arrow"}
+    assert spells["melfs-acid-arrow"]["provenance"]["school"] == "xge"
+
+    calls = []
+    monkeypatch.setattr(merge, "merge_sources", lambda *a, **k: calls.append(1) or [])
+    catalog_source(env_dir / "spells.json")
+    assert calls == []
+
+    homebrew = env_dir / "homebrew.json"
+    homebrew.write_text(json.dumps({"spells": HOMEBREW[:1]}), encoding="utf-8")
+    os.utime(homebrew, ns=(1, 1))
+    catalog_source(env_dir / "spells.json")
+    assert calls == [1]
+
+
+def test_without_config_the_spells_cache_is_used(tmp_path):
+    assert catalog_source(tmp_path / "spells.json") == tmp_path / "spells.json"
+
+
+def test_merge_command_reports_sources(env_dir, monkeypatch):
+    monkeypatch.setattr(
+        "src.cli.catalog.get_data_path", lambda filename: env_dir / filename
+    )
+    result = runner.invoke(app, ["catalog", "merge"])
+    assert result.exit_code == 0
+    assert "4 spell(s)" in result.stdout
+    assert "homebrew" in result.stdout
+
+
+def test_merge_command_rejects_bad_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.cli.catalog.get_data_path", lambda filename: tmp_path / filename
+    )
+    result = runner.invoke(app, ["catalog", "merge"])
+    assert result.exit_code == 1
+
+    (tmp_path / "sources.json").write_text(
+        json.dumps({"sources": [{"name": "x", "path": "x", "format": "xml"}]}),
+        encoding="utf-8",
+    )
+    result = runner.invoke(app, ["catalog", "merge"])
+    assert result.exit_code == 1
+    assert "Unknown format" in result.stdout
@@ -0,0 +1,143 @@
+# tests/test_related.py
+
+import json
+import math
+import pytest
+from src.catalog import related
+from src.catalog.related import nearest_neighbors
+from src.catalog.spells import SpellCatalog
+
+SPELLS = [
+    {"index": "fire-bolt", "name": "Fire Bolt", "desc": ["Hurl a mote of fire."]},
+    {"index": "shield", "name": "Shield", "desc": ["A barrier of magical force."]},
+    {
+        "index": "fireball",
+        "name": "Fireball",
+        "desc": ["An explosion of fire engulfs creatures; fire damage."],
+    },
+    {"index": "mage-armor", "name": "Mage Armor", "desc": ["Magical force wards."]},
+    {"index": "fire-storm", "name": "Fire Storm", "desc": ["A storm of fire."]},
+    {"index": "lonely", "name": "Lonely", "desc": ["Nothing else mentions this."]},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps(SPELLS), encoding="utf-8")
+    with SpellCatalog.open(source) as catalog:
+        yield catalog
+
+
+def test_neighbors_are_ranked_by_cosine_similarity():
+    vectors = {
+        0: {"fire": 0.8, "bolt": 0.6},
+        1: {"fire": 1.0},
+        2: {"bolt": 1.0},
+        3: {"ice": 1.0},
+    }
+    neighbors = nearest_neighbors(vectors, k=2)
+    assert neighbors[0] == [(1, 0.8), (2, 0.6)]
+    assert neighbors[1] == [(0, 0.8)]
+    assert 3 not in neighbors
+
+
+def test_related_spells_share_description_terms(catalog):
+    names = [spell["name"] for spell in catalog.related("fireball", 2)]
+    assert set(names) == {"Fire Bolt", "Fire Storm"}
+    assert [s["name"] for s in catalog.related("Shield", 1)] == ["Mage Armor"]
+    assert catalog.related("lonely") == []
+    assert catalog.related("nope") == []
+
+
+def test_lookups_do_no_similarity_work(catalog, monkeypatch):
+    monkeypatch.setattr(
+        related, "nearest_neighbors", lambda *a, **k: pytest.fail("recomputed")
+    )
+    assert catalog.related("fire-bolt")
+
+
+FIREBALL = (
+    "A bright streak flashes from your pointing finger to a point you choose "
+    "within range and then blossoms with a low roar into an explosion of flame. "
+    "Each creature in a 20-foot-radius sphere centered on that point must make a "
+    "dexterity saving throw. A target takes 8d6 fire damage on a failed save, or "
+    "half as much damage on a successful one. The fire spreads around corners. It "
+    "ignites flammable objects in the area that aren't being worn or carried."
+)
+DELAYED_BLAST_FIREBALL = (
+    "A beam of yellow light flashes from your pointing finger, then condenses to "
+    "linger at a chosen point within range as a glowing bead for the duration. "
+    "When the spell ends, either because your concentration is broken or because "
+    "you decide to end it, the bead blossoms with a low roar into an explosion of "
+    "flame that spreads around corners. Each creature in a 20-foot-radius sphere "
+    "centered on that point must make a dexterity saving throw. A creature takes "
+    "fire damage equal to the total accumulated damage on a failed save, or half "
+    "as much damage on a successful one."
+)
+SANCTUARY = (
+    "You ward a creature within range against attack. Until the spell ends, any "
+    "creature who targets the warded creature with an attack or a harmful spell "
+    "must first make a wisdom saving throw. On a failed save, the creature must "
+    "choose a new target or lose the attack or spell. This spell doesn't protect "
+    "the warded creature from area effects, such as the explosion of a fireball."
+)
+
+
+def test_srd_fireball_and_delayed_blast_fireball_rank_first(tmp_path):
+    spells = [spell for spell in SPELLS if spell["index"] != "fireball"] + [
+        {"index": "fireball", "name": "Fireball", "desc": [FIREBALL]},
+        {
+            "index": "delayed-blast-fireball",
+            "name": "Delayed Blast Fireball",
+            "desc": [DELAYED_BLAST_FIREBALL],
+        },
+        {"index": "sanctuary", "name": "Sanctuary", "desc": [SANCTUARY]},
+    ]
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps(spells), encoding="utf-8")
+    with SpellCatalog.open(source) as catalog:
+        assert [s["name"] for s in catalog.related("fireball", 1)] == [
+            "Delayed Blast Fireball"
+        ]
+        assert [s["name"] for s in catalog.related("delayed-blast-fireball", 1)] == [
+            "Fireball"
+        ]
+
+
+def test_large_catalogs_prune_postings(monkeypatch):
+    monkeypatch.setattr(related, "EXACT_LIMIT", 2)
+    monkeypatch.setattr(related, "MAX_POSTINGS", 1)
+    vectors = {0: {"fire": 1.0}, 1: {"fire": 0.9}, 2: {"fire": 0.5}}
+    # Only the heaviest posting of "fire" (spell 0) is kept
+    assert nearest_neighbors(vectors) == {1: [(0, 0.9)], 2: [(0, 0.5)]}
+
+
+def test_small_catalogs_are_not_pruned():
+    # Spell 1 matches spell 0 exactly, but on every shared term 40 other
+    # spells carry more weight; pruned postings would drop spell 1 entirely
+    terms = [f"t{j}" for j in range(13)]
+    weight = 1 / math.sqrt(len(terms))
+    vectors = {0: dict.fromkeys(terms, weight), 1: dict.fromkeys(terms, weight)}
+    for j, term in enumerate(terms):
+        for i in range(40):
+            vectors[len(vectors)] = {term: 0.9, f"u{j}-{i}": math.sqrt(1 - 0.81)}
+    assert len(vectors) <= related.EXACT_LIMIT
+    assert nearest_neighbors(vectors, k=1)[0][0][0] == 1
+
+
+def test_small_catalogs_keep_common_terms(tmp_path):
+    # "arcane" is in every spell, past the document-frequency cut-off that
+    # only larger catalogs apply; it is all these spells have in common
+    spells = [
+        {
+            "index": f"spell-{i}",
+            "name": f"Spell {i}",
+            "desc": ["Arcane " + "".join(chr(97 + int(d)) for d in f"{i:02}") * 3],
+        }
+        for i in range(40)
+    ]
+    source = tmp_path / "spells.json"
+    source.write_text(json.dumps(spells), encoding="utf-8")
+    with SpellCatalog.open(source) as catalog:
+        assert len(catalog.related("spell-0", 3)) == 3
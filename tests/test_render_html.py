@@ -30,3 +30,14 @@ def test_render_card_html(tmp_path):
     html = output_path.read_text(encoding="utf-8")
     assert "Fireball" in html
     assert "assets/css/default.css" in html or "file:///" in html  # CSS is injected
+
+
+def test_dict_root_without_cards_writes_nothing(tmp_path, caplog):
+    deck_path = tmp_path / "deck.json"
+    output_path = tmp_path / "deck.html"
+    deck_path.write_text(json.dumps({"title": "Not a deck"}), encoding="utf-8")
+
+    render_card_html(deck_path, output_path)
+
+    assert not output_path.exists()
+    assert "JSON root must be a dict with a 'cards' key or a list." in caplog.text
@@ -0,0 +1,89 @@
+# tests/test_search.py
+
+import json
+import pytest
+from src.catalog.search import tokenize
+from src.catalog.spells import SpellCatalog
+import src.deck_forge.generate as G
+
+SPELLS = [
+    {
+        "index": "burning-hands",
+        "name": "Burning Hands",
+        "level": 1,
+        "school": "Evocation",
+        "classes": ["Wizard"],
+        "desc": [
+            "A thin sheet of flames shoots forth in a 15-foot cone.",
+            "Each creature takes 3d6 fire damage.",
+        ],
+    },
+    {
+        "index": "fireball",
+        "name": "Fireball",
+        "level": 3,
+        "school": "Evocation",
+        "classes": ["Wizard", "Sorcerer"],
+        "desc": ["Each creature in a 20-foot-radius sphere takes 8d6 fire damage."],
+    },
+    {
+        "index": "cone-of-cold",
+        "name": "Cone of Cold",
+        "level": 5,
+        "school": "Evocation",
+        "classes": ["Sorcerer"],
+        "desc": ["A blast of cold air erupts. Each creature takes 8d8 cold damage."],
+    },
+    {
+        "index": "bless",
+        "name": "Bless",
+        "level": 1,
+        "school": "Enchantment",
+        "classes": ["Cleric"],
+        "desc": ["You bless up to three creatures of your choice."],
+    },
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "spells.json"
+    path.write_text(json.dumps(SPELLS), encoding="utf-8")
+    return path
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("The Creatures of the 15-foot cones!") == [
+        "creature",
+        "15",
+        "foot",
+        "cone",
+    ]
+
+
+def test_ranked_results(source):
+    with SpellCatalog.open(source) as catalog:
+        ranked = [s["index"] for s in catalog.query(text="fire damage cone")]
+        assert ranked[0] == "burning-hands"
+        assert set(ranked) == {"burning-hands", "fireball", "cone-of-cold"}
+        assert [s["index"] for s in catalog.query(text="fireball")] == ["fireball"]
+        assert catalog.query(text="necrotic") == []
+        assert catalog.query(text="the of") == []
+
+
+def test_text_combines_with_filters_and_limit(source):
+    with SpellCatalog.open(source) as catalog:
+        found = catalog.query(text="cold fire", classes=["sorcerer"], limit=1)
+        assert [s["index"] for s in found] == ["cone-of-cold"]
+
+
+def test_deck_build_query(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(G, "get_data_path", lambda _: source)
+    monkeypatch.setattr(
+        G, "spell_to_card", lambda spell, summarize=True: {"title": spell["name"]}
+    )
+    path = G.generate_spell_deck(
+        output_name=str(tmp_path / "deck.json"), query="bless creatures"
+    )
+    cards = json.loads(path.read_text())["cards"]
+    assert cards[0]["title"] == "Bless"
@@ -0,0 +1,35 @@
+# tests/test_storage.py
+
+import json
+import pytest
+from src.utils.storage import cached_file, read_json, write_json_array
+
+RECORDS = [{"index": "fireball", "level": 3}, {"index": "shield", "level": 1}]
+
+
+def test_plain_output_matches_json_dumps(tmp_path):
+    path = tmp_path / "spells.json"
+    assert write_json_array(path, iter(RECORDS)) == 2
+    assert path.read_text() == json.dumps(RECORDS, indent=2)
+    assert read_json(path) == RECORDS
+
+
+def test_compressed_round_trip_replaces_plain_file(tmp_path):
+    path = tmp_path / "traits.json"
+    write_json_array(path, RECORDS)
+
+    assert write_json_array(path, iter(RECORDS), compress=True) == 2
+    assert not path.exists()
+    assert cached_file(path) == tmp_path / "traits.json.br"
+    assert read_json(path) == RECORDS
+
+    # Writing uncompressed again drops the stale .br copy
+    write_json_array(path, RECORDS[:1])
+    assert cached_file(path) == path
+    assert read_json(path) == RECORDS[:1]
+
+
+def test_read_json_missing(tmp_path):
+    assert cached_file(tmp_path / "features.json") is None
+    with pytest.raises(FileNotFoundError):
+        read_json(tmp_path / "features.json")
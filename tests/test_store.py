@@ -0,0 +1,47 @@
+# tests/test_store.py
+
+import json
+from src.fetch.store import adopt, blob_path, env_manifest_path, publish
+from src.utils.storage import write_json_array
+
+
+def test_publish_links_env_file_to_blob(tmp_path):
+    dev = tmp_path / "dev" / "spells.json"
+    write_json_array(dev, [{"index": "fireball"}])
+
+    digest = publish(dev)
+
+    blob = blob_path(digest)
+    assert blob.read_bytes() == dev.read_bytes()
+    assert dev.stat().st_ino == blob.stat().st_ino  # hardlinked, not copied
+    manifest = json.loads(env_manifest_path(dev).read_text())
+    assert manifest["files"]["spells.json"]["sha256"] == digest
+
+
+def test_new_env_adopts_without_copying(tmp_path):
+    dev = tmp_path / "dev" / "traits.json.br"
+    dev.parent.mkdir()
+    dev.write_bytes(b"compressed")
+    digest = publish(dev)
+
+    prod = tmp_path / "prod" / "traits.json"
+    prod.parent.mkdir()
+    adopted = adopt(prod)
+
+    assert adopted == prod.with_name("traits.json.br")
+    assert adopted.stat().st_ino == blob_path(digest).stat().st_ino
+    assert adopt(tmp_path / "prod" / "features.json") is None
+
+
+def test_rewrite_does_not_touch_shared_blob(tmp_path):
+    dev = tmp_path / "dev" / "spells.json"
+    prod = tmp_path / "prod" / "spells.json"
+    write_json_array(dev, [{"index": "fireball"}])
+    digest = publish(dev)
+    prod.parent.mkdir()
+    adopt(prod)
+
+    write_json_array(prod, [{"index": "shield"}])
+
+    assert json.loads(dev.read_text()) == [{"index": "fireball"}]
+    assert json.loads(blob_path(digest).read_text()) == [{"index": "fireball"}]
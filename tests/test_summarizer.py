@@ -1,9 +1,22 @@
 # tests/test_summarizer.py
 
+import json
 import os
 import logging
+import threading
+import time
 import openai
-from src.utils.summarizer import summarize_text, MAX_CHAR_COUNT
+import pytest
+import src.utils.summarizer as summarizer
+from src.utils.summary_cache import get_summary_cache
+from src.utils.http import TokenBucket
+from src.utils.summarizer import (
+    MAX_CHAR_COUNT,
+    configure_budget,
+    pack_batches,
+    summarize_many,
+    summarize_text,
+)
 from src.deck_forge.schema import spell_to_card
 
 # Configure logging capture
@@ -97,3 +110,134 @@ def test_spell_to_card_summary_flag_and_description(monkeypatch):
     card = spell_to_card(spell, summarize=True)
     assert card["summary"] is True
     assert card["description"] == "Fake summary."
+
+
+def test_summarize_many_keeps_order_and_caps_requests_in_flight(monkeypatch):
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+
+    def fake_summarize(text, max_length=None):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.002 * (20 - int(text.split()[0])))  # later texts finish first
+        with lock:
+            in_flight[0] -= 1
+        return f"summary {text.split()[0]}"
+
+    monkeypatch.setattr(summarizer, "summarize_text", fake_summarize)
+    texts = [f"{i} " + "x" * MAX_CHAR_COUNT for i in range(20)]
+    assert summarize_many(texts, concurrency=4, batch_size=1) == [
+        f"summary {i}" for i in range(20)
+    ]
+    assert 1 < in_flight[1] <= 4
+
+
+def test_summarize_text_spends_token_budget(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    monkeypatch.setenv("DMFORGE_SUMMARY_CACHE", "off")
+    spent = []
+    monkeypatch.setattr(
+        summarizer,
+        "_tokens",
+        type("B", (), {"acquire": lambda self, n: spent.append(n)})(),
+    )
+
+    class FakeResponse:
+        choices = [type("C", (), {"message": type("M", (), {"content": "Short."})})]
+
+    monkeypatch.setattr(openai.chat.completions, "create", lambda **kw: FakeResponse())
+    assert summarize_text("D" * 400, max_length=100) == "Short."
+    assert summarize_text("tiny", max_length=100) == "tiny"
+    assert len(spent) == 1 and spent[0] > 100 + 25
+
+
+def test_configure_budget_sets_token_rate(monkeypatch):
+    monkeypatch.setattr(summarizer, "_tokens", TokenBucket(1000))
+    monkeypatch.setattr(summarizer, "_concurrency", summarizer._concurrency)
+    configure_budget(concurrency=3, tpm=6000)
+    assert summarizer._concurrency == 3
+    assert summarizer._tokens.rate == 100
+    assert summarizer._tokens.burst == 6000
+
+
+@pytest.fixture
+def batch_openai(monkeypatch):
+    """Fake chat API answering batched requests with one summary per id."""
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    calls = []
+    tamper = {}
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if "response_format" not in kwargs:
+            content = "Single summary."
+        else:
+            items = json.loads(kwargs["messages"][1]["content"])
+            answer = {
+                "summaries": [
+                    {"id": item["id"], "summary": f"Summary {item['text'][:3]}"}
+                    for item in items
+                ]
+            }
+            content = tamper.get("edit", json.dumps)(answer)
+        message = type("M", (), {"content": content})
+        return type("R", (), {"choices": [type("C", (), {"message": message})]})
+
+    monkeypatch.setattr(openai.chat.completions, "create", create)
+    return calls, tamper
+
+
+LONG_TEXTS = [f"{i:03d} " + "x" * MAX_CHAR_COUNT for i in range(45)]
+
+
+def test_batched_summaries_cut_requests_and_keep_order(batch_openai):
+    calls, _ = batch_openai
+    expected = [f"Summary {i:03d}" for i in range(45)]
+    assert summarize_many(["short"] + LONG_TEXTS, batch_size=20) == ["short"] + expected
+    assert len(calls) == 3
+    assert all(call["response_format"] == {"type": "json_object"} for call in calls)
+    # Batched summaries are cached like single ones
+    assert summarize_many(LONG_TEXTS, batch_size=20) == expected
+    assert summarize_text(LONG_TEXTS[7]) == "Summary 007"
+    assert len(calls) == 3
+
+
+def test_invalid_batch_entries_fall_back_per_item(batch_openai):
+    calls, tamper = batch_openai
+
+    def edit(answer):
+        entries = answer["summaries"]
+        entries[2]["summary"] = "y" * (MAX_CHAR_COUNT + 1)  # too long
+        del entries[1]  # missing
+        return json.dumps(answer)
+
+    tamper["edit"] = edit
+    result = summarize_many(LONG_TEXTS[:4], batch_size=4)
+    assert result == [
+        "Summary 000",
+        "Single summary.",
+        "Single summary.",
+        "Summary 003",
+    ]
+    assert len(calls) == 3
+    # Fallbacks don't look the cache up a second time
+    cache = get_summary_cache()
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_unreadable_batch_answer_falls_back_for_every_item(batch_openai, caplog):
+    calls, tamper = batch_openai
+    tamper["edit"] = lambda answer: "not json"
+    assert summarize_many(LONG_TEXTS[:3], batch_size=3) == ["Single summary."] * 3
+    assert len(calls) == 4
+    assert "Batched summarization of 3 texts failed" in caplog.text
+
+
+def test_pack_batches_respects_size_and_token_limits(monkeypatch):
+    texts = ["a" * 400] * 7
+    assert pack_batches(texts, 100, 3) == [[0, 1, 2], [3, 4, 5], [6]]
+    monkeypatch.setattr(summarizer, "BATCH_INPUT_TOKENS", 250)
+    assert pack_batches(texts, 100, 10) == [[0, 1], [2, 3], [4, 5], [6]]
+    monkeypatch.setattr(summarizer, "BATCH_OUTPUT_TOKENS", 40)
+    assert pack_batches(texts, 100, 10) == [[i] for i in range(7)]
@@ -0,0 +1,84 @@
+# tests/test_summary_cache.py
+
+import itertools
+import openai
+import pytest
+from src.utils import summary_cache
+from src.utils.summarizer import MAX_CHAR_COUNT, summarize_text
+from src.utils.summary_cache import SummaryCache, get_summary_cache, summary_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = itertools.count(1)
+    monkeypatch.setattr(summary_cache.time, "time", lambda: next(ticks))
+
+
+def test_key_covers_text_length_model_and_prompt():
+    key = summary_key("Fireball", 100, "gpt", 1)
+    assert key == summary_key("Fireball", 100, "gpt", 1)
+    assert key != summary_key("Fireball!", 100, "gpt", 1)
+    assert key != summary_key("Fireball", 120, "gpt", 1)
+    assert key != summary_key("Fireball", 100, "other", 1)
+    assert key != summary_key("Fireball", 100, "gpt", 2)
+
+
+def test_hits_misses_and_lru_eviction(tmp_path, clock):
+    cache = SummaryCache(tmp_path / "summaries.sqlite", max_entries=3)
+    assert cache.get("a") is None
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"  # a is now the most recently used
+    cache.put("d", "D")  # over the cap: evict down to 2 entries
+    assert len(cache) == 2
+    assert cache.get("b") is None and cache.get("c") is None
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 3}
+
+    reopened = SummaryCache(tmp_path / "summaries.sqlite")
+    assert reopened.get("d") == "D"
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    calls = []
+
+    class FakeChoice:
+        message = type("M", (), {"content": "Cached summary"})
+
+    class FakeResponse:
+        choices = [FakeChoice()]
+
+    monkeypatch.setattr(
+        openai.chat.completions,
+        "create",
+        lambda *args, **kwargs: calls.append(kwargs) or FakeResponse(),
+    )
+    return calls
+
+
+def test_repeated_summaries_make_one_call(fake_openai):
+    text = "D" * (MAX_CHAR_COUNT + 10)
+    assert summarize_text(text) == "Cached summary"
+    assert summarize_text(text) == "Cached summary"
+    assert len(fake_openai) == 1
+    summarize_text(text, max_length=MAX_CHAR_COUNT + 5)
+    assert len(fake_openai) == 2
+    assert get_summary_cache().hits == 1
+
+
+def test_fallbacks_are_not_cached(monkeypatch, fake_openai):
+    text = "E" * (MAX_CHAR_COUNT + 10)
+    monkeypatch.delenv("OPENAI_API_KEY")
+    assert summarize_text(text).endswith("...")
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    assert summarize_text(text) == "Cached summary"
+
+
+def test_cache_can_be_turned_off(monkeypatch, fake_openai):
+    monkeypatch.setenv("DMFORGE_SUMMARY_CACHE", "off")
+    assert get_summary_cache() is None
+    text = "F" * (MAX_CHAR_COUNT + 10)
+    summarize_text(text)
+    summarize_text(text)
+    assert len(fake_openai) == 2